@@ -1,3 +1,4 @@
+import atexit
 import logging
 from flask import Flask
 from app.models.ai_manager import AIManager
@@ -27,6 +28,8 @@ def create_app():
         raise RuntimeError("Failed to initialize AIManager")
 
     logger.info("✅ AIManager initialized successfully.")
+    # Stops the background processor and file watcher and persists the vector store on exit
+    atexit.register(ai_manager.shutdown)
     app.config["AI_MANAGER"] = ai_manager  # 🔧 For use in /api/projects/list
 
     # Attach to route module
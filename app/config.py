@@ -47,6 +47,57 @@ class Config:
         self.model_path = self.constants.get("model_paths", {}).get("Prime", None)
         self.lite_model_path = self.constants.get("model_paths", {}).get("Lite", None)
         self.EMBEDDING_MODEL_PATH = self.constants.get("model_paths", {}).get("Embedding", os.getenv("EMBEDDING_MODEL_PATH"))
+        self.embedding_model = self.constants.get("embedding_model", "all-mpnet-base-v2")
+        self.embedding_batch_size = self.constants.get("embedding_batch_size", 32)
+        self.embedding_workers = self.constants.get("embedding_workers", 1)
+        self.embedding_normalize = self.constants.get("embedding_normalize", False)
+        self.embedding_cache_dir = self.constants.get("embedding_cache_dir", str(VECTORDB_DIR / "embedding_cache"))
+        self.embedding_cache_max_entries = self.constants.get("embedding_cache_max_entries", 100000)
+        self.embedding_cache_flush_seconds = self.constants.get("embedding_cache_flush_seconds", 30.0)
+        self.query_cache_size = self.constants.get("query_cache_size", 512)
+        self.retrieval_cache_ttl = self.constants.get("retrieval_cache_ttl", 300)
+        self.inference_queue_size = self.constants.get("inference_queue_size", 64)
+        self.prefix_cache_states = self.constants.get("prefix_cache_states", 4)
+        self.startup_workers = self.constants.get("startup_workers", 4)
+        self.use_mlock = self.constants.get("use_mlock", False)
+        self.model_ram_budget_mb = self.constants.get("model_ram_budget_mb", 8192)
+        self.extract_workers = self.constants.get("extract_workers", None)
+        self.conversion_workers = self.constants.get("conversion_workers", 1)
+        self.conversion_queue_size = self.constants.get("conversion_queue_size", 4)
+        self.conversion_piece_workers = self.constants.get("conversion_piece_workers", 1)
+        self.stream_extract_min_mb = self.constants.get("stream_extract_min_mb", 32)
+        self.chunk_max_tokens = self.constants.get("chunk_max_tokens", 256)
+        self.hybrid_search = self.constants.get("hybrid_search", True)
+        self.rrf_k = self.constants.get("rrf_k", 60)
+        self.hybrid_candidates = self.constants.get("hybrid_candidates", 4)
+        self.lexical_common_term_ratio = self.constants.get("lexical_common_term_ratio", 0.1)
+        self.vector_store_max_open = self.constants.get("vector_store_max_open", 4)
+        self.tier_weights = self.constants.get("tier_weights", {})
+        self.retrieval_token_budget = self.constants.get("retrieval_token_budget", 1024)
+        self.vector_backend = self.constants.get("vector_backend", "chroma")
+        self.vector_index = self.constants.get("vector_index", "ivf")
+        self.ivf_nlist = self.constants.get("ivf_nlist", None)
+        self.ivf_nprobe = self.constants.get("ivf_nprobe", 8)
+        self.ivf_min_rows = self.constants.get("ivf_min_rows", 4096)
+        self.vector_dtype = self.constants.get("vector_dtype", "float32")
+        self.vector_keep_float32 = self.constants.get("vector_keep_float32", True)
+        self.vector_rerank_factor = self.constants.get("vector_rerank_factor", 4)
+        self.bulk_ingest_batch_size = self.constants.get("bulk_ingest_batch_size", 256)
+        self.bulk_ingest_checkpoint_batches = self.constants.get("bulk_ingest_checkpoint_batches", 8)
+        self.bulk_ingest_retries = self.constants.get("bulk_ingest_retries", 2)
+        self.bulk_ingest_index_save_checkpoints = self.constants.get("bulk_ingest_index_save_checkpoints", 8)
+        self.code_analysis_workers = self.constants.get("code_analysis_workers", None)
+        self.code_summary_workers = self.constants.get("code_summary_workers", 1)
+        self.code_analysis_queue_size = self.constants.get("code_analysis_queue_size", 8)
+        self.code_analysis_pool_min_files = self.constants.get("code_analysis_pool_min_files", 64)
+        self.snapshot_hash_workers = self.constants.get("snapshot_hash_workers", None)
+        self.file_watcher_enabled = self.constants.get("file_watcher_enabled", True)
+        self.file_watcher_backend = self.constants.get("file_watcher_backend", "auto")
+        self.file_watcher_debounce_seconds = self.constants.get("file_watcher_debounce_seconds", 2.0)
+        self.file_watcher_max_delay_seconds = self.constants.get("file_watcher_max_delay_seconds", 30.0)
+        self.file_watcher_poll_seconds = self.constants.get("file_watcher_poll_seconds", 5.0)
+        self.code_summary_cache_size = self.constants.get("code_summary_cache_size", 50000)
+        self.code_analysis_ordered = self.constants.get("code_analysis_ordered", False)
         self.status_file = self.constants.get("status_file", None)
         self.llm_backend = self.constants.get("llm_backend", None)
         self.lite_backend = self.constants.get("lite_backend", None)
@@ -88,6 +139,9 @@ class Config:
             "n_threads": self.n_threads,
             "llm_backend": self.llm_backend,
             "lite_backend": self.lite_backend,
+            "embedding_model": self.embedding_model,
+            "embedding_batch_size": self.embedding_batch_size,
+            "embedding_workers": self.embedding_workers,
             "paths": {
                 "KNOWLEDGE_DIR": str(self.KNOWLEDGE_DIR),
                 "PERSONAS_DIR": str(self.PERSONAS_DIR),
@@ -1,6 +1,6 @@
 import logging
+import threading
 from datetime import datetime
-from llama_cpp import Llama
 
 from app.config import Config
 from app.cognition.inner_monologue import process_thought
@@ -9,6 +9,7 @@ from app.memory.status_tracker import GAIAStatus
 from app.utils.code_analyzer import CodeAnalyzer
 from app.utils.background.background_tasks import BackgroundTask
 from app.utils.background.task_queue import TaskQueue
+from app.utils.background.processor import BackgroundProcessor
 from app.memory.conversation.manager import ConversationManager
 from app.behavior.persona_manager import PersonaManager
 from app.behavior.persona_adapter import PersonaAdapter
@@ -20,6 +21,11 @@ from app.ethics.ethical_sentinel import EthicalSentinel
 from app.cognition.self_reflection import run_self_reflection
 from app.ethics.core_identity_guardian import CoreIdentityGuardian
 from app.utils.context import get_context_for_task
+from app.cognition.agent_core import AgentCore
+from app.models.inference_scheduler import InferenceScheduler, SchedulerFull, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from app.models.prefix_cache import PrefixCachedLLM, build_persona_prefix, prefix_key
+from app.utils.startup import StartupManager
+from app.models.model_pool import ModelPool
 
 logger = logging.getLogger("GAIA")
 
@@ -33,7 +39,7 @@ class AIManager:
 
         self.persona_manager = PersonaManager(self.config.personas_dir)
         self.vector_store_manager = VectorStoreManager(config=self.config)
-        self.doc_processor = DocumentProcessor(self.vector_store_manager)
+        self.doc_processor = DocumentProcessor(self.config, vector_store_manager=self.vector_store_manager)
         self.code_analyzer = CodeAnalyzer(config=self.config)
         self.background_processor = BackgroundTask(self)
         self.self_reflection = run_self_reflection(config)
@@ -43,13 +49,27 @@ class AIManager:
         self.identity_guardian = CoreIdentityGuardian(config)
         self.ethical_sentinel = EthicalSentinel(self.identity_guardian)
         self.llm = None
+        self.lite_llm = None
+        self.prefix_llm = None
+        self.model_pool = None
         self.current_persona_name = None
         self.current_persona = None
         self.status = {"initialized": False}
         self.task_queue = TaskQueue()
+        # Drains task_queue when idle; its FileWatcher queues re-analysis/re-embedding of changed files
+        self.background_worker = BackgroundProcessor(self.config, task_queue=self.task_queue,
+                                                     task_handler=self.background_processor)
+        self.background_worker.ai_manager = self
+        self.background_worker.conversation_manager = self.conversation_manager
+        self.scheduler = InferenceScheduler(max_queue=getattr(config, "inference_queue_size", 64))
+        self.startup = StartupManager(max_workers=getattr(config, "startup_workers", 4))
+        self.vector_store = None
+        self._project_lock = threading.Lock()
+        self._vector_store_loaded = False
         self.initialized = False
 
-    def generate_response(self, user_prompt: str) -> str:
+    def generate_response(self, user_prompt: str, session_id: str = "default") -> str:
+        self.startup.require("llm", "vector_store")
         if not self.llm:
             logger.warning("🛑 LLM not loaded.")
             return "I'm still initializing..."
@@ -77,12 +97,45 @@ class AIManager:
             instructions=instructions,
             payload=user_prompt,
             identity_intro=self.identity_guardian.identity.get("preamble", ""),
-            llm=self.llm,
+            llm=self.llm.for_session(session_id),
             reflect=True,
             context=get_context_for_task("chat", config=self.config),
             config=self.config
         )
 
+    def stream_response(self, user_prompt: str, session_id: str = "default"):
+        """
+        Streaming counterpart of generate_response.
+        Yields AgentCore events (token, interruption_start, correction_start, action_*, ...)
+        as they are produced. Closing the generator cancels the in-flight generation.
+        """
+        self.startup.require("llm", "vector_store")
+        if not self.llm:
+            logger.warning("🛑 LLM not loaded.")
+            yield {"type": "error", "message": "I'm still initializing..."}
+            return
+
+        if not self.current_persona:
+            logger.warning("🛑 No active persona set.")
+            yield {"type": "error", "message": "I'm missing my persona setup."}
+            return
+
+        persona = self.current_persona
+        instructions = persona.instructions if hasattr(persona, "instructions") else []
+        traits = persona.traits if hasattr(persona, "traits") else {}
+
+        if not self.ethical_sentinel.run_full_safety_check(traits, instructions, user_prompt):
+            yield {"type": "error", "message": "⚠️ Request denied due to safety or identity constraints."}
+            return
+
+        logger.info("🧠 Streaming turn through AgentCore")
+        agent = AgentCore(self)
+        agent.model_pool = {
+            name: model.for_session(session_id) if model else None
+            for name, model in agent.model_pool.items()
+        }
+        yield from agent.run_turn(user_prompt)
+
     def initialize(self):
         logger.info("Initializing AIManager components...")
         try:
@@ -106,41 +159,93 @@ class AIManager:
             self.session_manager.initialize_session(persona_name)
             logger.info("✅ Session initialized")
 
-            self.doc_processor.load_and_preprocess_data(self.config.core_docs_path)
-            logger.info("✅ Core docs loaded and embedded")
-
-            try:
-                self.llm = Llama(
-                    model_path=self.config.model_path,
-                    n_gpu_layers=self.config.n_gpu_layers,
-                    n_ctx=self.config.max_tokens,
-                    n_batch=self.config.n_batch,
-                    use_mlock=True,
-                    verbose=True
-                )
-                logger.info("🧠 Hermes (llama.cpp) model loaded successfully.")
-
-                self.vector_store_manager.initialize_store()
-                self.vector_store = self.vector_store_manager.vector_store
-                logger.info("✅ Vector store initialized and assigned.")
-
-            except Exception as e:
-                logger.exception(f"❌ Failed to load Hermes model: {e}")
+            # Heavy components load concurrently; the web server does not wait for them
+            self.startup.add("core_docs", self._load_core_docs)
+            self.startup.add("embeddings", self._load_embeddings)
+            self.vector_store = self.startup.add("vector_store", self._load_vector_store)
+            self.startup.add("llm", self._load_llm)
+            self.startup.add("background", self._start_background)
 
             self.status["initialized"] = True
             self.initialized = True
-            logger.info(f"🎯 Initialization complete. Persona: {self.current_persona_name}, Project: {self.project_manager.active_project}")
+            logger.info(f"🎯 Initialization started. Persona: {self.current_persona_name}, Project: {self.project_manager.active_project}")
             self.initiative_loop.start()
             return True
         except Exception as e:
             logger.exception(f"❌ AIManager failed to initialize: {e}")
             return False
 
+    def _load_core_docs(self):
+        documents = self.doc_processor.load_and_preprocess_data(self.config.core_docs_path)
+        logger.info("✅ Core docs loaded and embedded")
+        return documents
+
+    def _load_embeddings(self):
+        return self.vector_store_manager.embeddings.model
+
+    def _load_vector_store(self):
+        while True:
+            project_name = self.project_manager.active_project
+            self.vector_store_manager.use_project(project_name)
+            with self._project_lock:
+                # switch_project only defers to us until this flag is set, so re-check under the lock
+                if self.project_manager.active_project == project_name:
+                    self._vector_store_loaded = True
+                    break
+            logger.info(f"🔁 Project changed to {self.project_manager.active_project} while the vector store loaded; reloading")
+        logger.info("✅ Vector store initialized and assigned.")
+        return self.vector_store_manager.vector_store
+
+    def _start_background(self):
+        # Queued tasks embed into the vector store, so start draining only once it is loaded
+        if not self.startup.wait_for("vector_store"):
+            raise RuntimeError("vector store failed to load; background processing not started")
+        self.background_worker.start()
+        return self.background_worker
+
+    def switch_project(self, project_name: str) -> bool:
+        """
+        Switch the active project: project paths, its vector collection and the persona prefix cache key.
+        The embedding model and LLMs stay loaded.
+        """
+        if project_name not in self.project_manager.list_available_projects():
+            logger.warning(f"⚠️ Unknown project: {project_name}")
+            return False
+        with self._project_lock:
+            self.project_manager.set_active_project(project_name)
+            # While the vector_store stage is still loading it picks up the new project when it finishes
+            if self._vector_store_loaded:
+                self.vector_store_manager.use_project(project_name)
+        self._activate_persona_prefix()
+        logger.info(f"📁 Project switched to: {project_name}")
+        return True
+
+    def _load_llm(self):
+        self.model_pool = ModelPool.from_config(self.config)
+        self.model_pool.warm()
+        logger.info(f"🧠 Model pool ready: {self.model_pool.stats()['loaded']}")
+
+        # All inference goes through the scheduler; chat outranks background work.
+        # Chat runs on Prime; reflection, observation and summarisation run on Lite.
+        self.prefix_llm = PrefixCachedLLM(self.model_pool.get("prime"),
+                                          max_states=getattr(self.config, "prefix_cache_states", 4))
+        self.scheduler.start()
+        self.llm = self.scheduler.bind(self.prefix_llm, PRIORITY_INTERACTIVE)
+        self.lite_llm = self.scheduler.bind(self.model_pool.get(self.model_pool.route("reflection")), PRIORITY_INTERACTIVE)
+        background_llm = self.scheduler.bind(self.model_pool.get(self.model_pool.route("summarize")),
+                                             PRIORITY_BACKGROUND, session_id="background")
+        self._activate_persona_prefix()
+        self.code_analyzer.llm = background_llm
+        self.doc_processor.llm = background_llm
+        self.config.model_pool = {"prime": self.llm, "lite": self.lite_llm}
+        return self.llm
+
     def set_persona(self, persona_name):
         persona = self.persona_manager.set_persona(persona_name)
         if persona:
             self.current_persona = PersonaAdapter(persona, self.config)
             self.current_persona_name = persona_name
+            self._activate_persona_prefix()
             logger.info(f"✅ Persona switched to: {persona_name}")
             return True
         logger.warning(f"⚠️ Failed to switch to persona: {persona_name}")
@@ -149,11 +254,41 @@ class AIManager:
     def get_persona(self):
         return self.current_persona
 
+    def _activate_persona_prefix(self):
+        """Queue loading (or building) the cached llama state for the current persona prefix."""
+        if not self.prefix_llm or not self.current_persona:
+            return
+        instructions = getattr(self.current_persona, "instructions", [])
+        prefix_text = build_persona_prefix(self.identity_guardian.identity.get("preamble", ""), instructions)
+        if not prefix_text:
+            return
+        key = prefix_key(self.current_persona_name, self.project_manager.active_project, prefix_text)
+        try:
+            self.scheduler.submit(self.prefix_llm.activate, (key, prefix_text), session_id="prefix")
+        except SchedulerFull:
+            # Fall back to lazy evaluation on the next matching prompt
+            self.prefix_llm.register(key, prefix_text)
+
+    def reload_persona(self) -> bool:
+        """Re-read the active persona from disk (e.g. after its files changed) and refresh its prefix cache."""
+        name = self.current_persona_name
+        if not name:
+            return False
+        loaded_persona = self.persona_manager.set_persona(name)
+        if not loaded_persona:
+            logger.warning(f"⚠️ Failed to reload persona: {name}")
+            return False
+        self.current_persona = PersonaAdapter(loaded_persona, self.config)
+        self._activate_persona_prefix()
+        logger.info(f"🎭 Persona reloaded: {name}")
+        return True
+
     def summarize_conversation(self):
         logger.info("Triggering conversation summarization...")
         return self.background_processor.process_conversation_task({"action": "summarize"})
 
     def embed_documents(self, doc_paths):
+        self.startup.require("vector_store")
         logger.info("Embedding documents via DocumentProcessor...")
         return self.doc_processor.embed_documents(doc_paths)
 
@@ -178,5 +313,11 @@ class AIManager:
 
     def shutdown(self):
         logger.info("Shutting down AIManager...")
+        self.background_worker.stop()
         self.vector_store_manager.persist()
+        self.vector_store_manager.embeddings.shutdown()
+        self.scheduler.stop()
+        self.startup.shutdown()
+        if self.model_pool:
+            self.model_pool.close()
         logger.info("Shutdown complete.")
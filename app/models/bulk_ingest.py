@@ -0,0 +1,125 @@
+"""
+models/bulk_ingest.py
+
+Checkpoint file and helpers for VectorStoreManager.bulk_ingest.
+A checkpoint records how many documents of a named job's stream have been
+committed (embedded, stored and persisted), so an interrupted job can resume
+from the last committed batch instead of starting over. It also carries the
+vector IDs of a source file whose chunks straddle a commit, until the whole
+file is committed and can go into the embedding manifest.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger("GAIA.BulkIngest")
+
+CHECKPOINT_VERSION = 1
+
+
+def document_id(doc: Document) -> str:
+    """
+    Stable vector ID for a document, so replaying a batch overwrites instead of duplicating.
+    Chunks from MarkdownChunker get the same ID DocumentProcessor.embed_documents uses.
+    """
+    meta = doc.metadata or {}
+    source = meta.get("source_path") or meta.get("source") or ""
+    chunk_hash = meta.get("chunk_hash") or hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+    return hashlib.sha1(f"{source}\0{chunk_hash}".encode("utf-8")).hexdigest()
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to `size` items without materializing the iterable."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def skip_committed(stream: Iterator[Document], checkpoint: "IngestCheckpoint", id_fn) -> bool:
+    """
+    Advance `stream` past the documents a checkpoint already committed.
+
+    Returns:
+        bool: False if the stream is shorter or its last committed document has a
+        different ID, i.e. the input changed since the checkpoint was written
+    """
+    if not checkpoint.committed:
+        return True
+    last = None
+    for last in islice(stream, checkpoint.committed - 1, checkpoint.committed):
+        pass
+    return last is not None and id_fn(last) == checkpoint.last_id
+
+
+class IngestCheckpoint:
+    """Progress of one bulk ingest job, stored as JSON next to the vector store."""
+
+    def __init__(self, path: str, job: str):
+        self.path = path
+        self.job = job
+        self.committed = 0
+        self.batches = 0
+        self.last_id: Optional[str] = None
+        # source_path -> {"size", "mtime_ns", "ids"} for files not yet in the embedding manifest
+        self.files: Dict[str, Dict] = {}
+        self.started = time.time()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CHECKPOINT_VERSION or data.get("job") != self.job:
+                logger.warning(f"⚠️ Ignoring incompatible ingest checkpoint: {self.path}")
+                return
+            self.committed = data.get("committed", 0)
+            self.batches = data.get("batches", 0)
+            self.last_id = data.get("last_id")
+            self.files = data.get("files", {})
+            self.started = data.get("started", self.started)
+            logger.info(f"⏯️ Resuming ingest job '{self.job}' after {self.committed} documents")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load ingest checkpoint {self.path}: {e}")
+
+    def save(self):
+        """Atomically record the committed position."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": CHECKPOINT_VERSION,
+                "job": self.job,
+                "committed": self.committed,
+                "batches": self.batches,
+                "last_id": self.last_id,
+                "files": self.files,
+                "started": self.started,
+                "updated": time.time(),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Remove the checkpoint once the job has finished."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.committed = 0
+        self.batches = 0
+        self.last_id = None
+        self.files = {}
+
+    def to_dict(self) -> Dict:
+        return {"job": self.job, "committed": self.committed, "batches": self.batches}
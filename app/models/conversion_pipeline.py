@@ -0,0 +1,257 @@
+"""
+models/conversion_pipeline.py
+
+Staged pipeline for turning raw campaign files into structured markdown:
+
+    extract (process pool) -> bounded queue -> LLM convert (threads) -> bounded queue -> ledger
+
+CPU-bound extraction runs in worker processes while the LLM converts earlier
+files. Files above a size threshold skip the pool and are streamed paragraph by
+paragraph straight into the converter, and converted pieces are written to disk
+as they are produced, so neither the text nor the markdown of a file is ever
+held in memory at once. Bounded queues provide backpressure so a fast extractor
+cannot pile up text in memory. A ledger of finished files lets an interrupted
+run resume without redoing work.
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("GAIA.ConversionPipeline")
+
+_DONE = object()
+
+
+def _extract(filepath: str) -> Tuple[str, Optional[str]]:
+    """Process-pool entry point: extract text from one raw file."""
+    from app.models.document import DocumentProcessor
+
+    return filepath, DocumentProcessor(None).extract_text_from_file(filepath)
+
+
+class ConversionLedger:
+    """Records converted source files (by mtime/size) so restarts skip finished work."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to load conversion ledger: {e}")
+
+    def is_done(self, filepath: str) -> bool:
+        entry = self.entries.get(filepath)
+        if not entry:
+            return False
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return False
+        return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+    def mark_done(self, filepath: str, output_path: str):
+        stat = os.stat(filepath)
+        with self._lock:
+            self.entries[filepath] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "output": output_path,
+                "converted_at": datetime.now().isoformat(),
+            }
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+
+class StageStats:
+    """Item counts and busy time for one pipeline stage."""
+
+    def __init__(self):
+        self.items = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool = True):
+        with self._lock:
+            self.busy_seconds += seconds
+            if ok:
+                self.items += 1
+            else:
+                self.failed += 1
+
+    def as_dict(self, wall_seconds: float) -> dict:
+        return {
+            "items": self.items,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_sec": round(self.items / wall_seconds, 3) if wall_seconds else 0.0,
+        }
+
+
+class ConversionPipeline:
+    """
+    Runs raw files through extract -> convert -> write with bounded queues between stages.
+    """
+
+    def __init__(self, processor, output_path: str, extract_workers: Optional[int] = None,
+                 convert_workers: int = 1, queue_size: int = 4, stream_min_mb: float = 32):
+        """
+        Args:
+            processor: DocumentProcessor providing iter_markdown_conversion and save_markdown_stream
+            output_path: Directory for converted markdown (also holds the ledger)
+            extract_workers: Extraction processes (defaults to CPU count)
+            convert_workers: Concurrent LLM conversion threads
+            queue_size: Capacity of each inter-stage queue
+            stream_min_mb: Files at least this large are streamed into the converter
+        """
+        self.processor = processor
+        self.output_path = output_path
+        self.extract_workers = extract_workers or multiprocessing.cpu_count()
+        self.convert_workers = max(1, convert_workers)
+        self.queue_size = max(1, queue_size)
+        self.stream_min_bytes = int(stream_min_mb * 1024 * 1024)
+        self.streamed = 0
+        self.ledger = ConversionLedger(os.path.join(output_path, ".conversion_ledger.json"))
+        self.stats = {name: StageStats() for name in ("extract", "convert", "write")}
+
+    def _convert_loop(self, convert_queue: "queue.Queue", write_queue: "queue.Queue"):
+        while True:
+            item = convert_queue.get()
+            if item is _DONE:
+                break
+            filepath, text = item
+            output_filepath = self._output_filepath(filepath)
+            start = time.perf_counter()
+            pieces = self.processor.save_markdown_stream(output_filepath, self.processor.iter_markdown_conversion(text))
+            self.stats["convert"].record(time.perf_counter() - start, ok=bool(pieces))
+            if not pieces:
+                logger.warning(f"⚠️ Could not convert {os.path.basename(filepath)} to markdown")
+                continue
+            write_queue.put((filepath, output_filepath))
+
+    def _output_filepath(self, filepath: str) -> str:
+        filename = os.path.basename(filepath)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(self.output_path, f"converted_{os.path.splitext(filename)[0]}_{timestamp}.md")
+
+    def _should_stream(self, filepath: str) -> bool:
+        try:
+            return os.path.getsize(filepath) >= self.stream_min_bytes
+        except OSError:
+            return False
+
+    def _write_loop(self, write_queue: "queue.Queue"):
+        """Record files whose markdown is fully on disk, so a restart skips them."""
+        while True:
+            item = write_queue.get()
+            if item is _DONE:
+                break
+            filepath, output_filepath = item
+            start = time.perf_counter()
+            try:
+                self.ledger.mark_done(filepath, output_filepath)
+                ok = True
+            except Exception as e:
+                logger.error(f"❌ Failed to record {os.path.basename(filepath)} in the ledger: {e}", exc_info=True)
+                ok = False
+            self.stats["write"].record(time.perf_counter() - start, ok=ok)
+
+    def run(self, filepaths: List[str]) -> dict:
+        """
+        Convert the given raw files, skipping ones already recorded in the ledger.
+
+        Returns:
+            dict: Per-stage throughput statistics
+        """
+        started = time.perf_counter()
+        pending = [p for p in filepaths if not self.ledger.is_done(p)]
+        skipped = len(filepaths) - len(pending)
+        if skipped:
+            logger.info(f"⏭️ Skipping {skipped} already converted files")
+
+        convert_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        write_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        converters = [
+            threading.Thread(target=self._convert_loop, args=(convert_queue, write_queue),
+                             name=f"gaia-convert-{i}", daemon=True)
+            for i in range(self.convert_workers)
+        ]
+        writer = threading.Thread(target=self._write_loop, args=(write_queue,), name="gaia-writer", daemon=True)
+        for thread in converters + [writer]:
+            thread.start()
+
+        max_inflight = self.extract_workers + self.queue_size
+        try:
+            with ProcessPoolExecutor(max_workers=self.extract_workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                inflight = deque()
+                submitted_at = {}
+                paths = iter(pending)
+                exhausted = False
+                while inflight or not exhausted:
+                    while not exhausted and len(inflight) < max_inflight:
+                        path = next(paths, None)
+                        if path is None:
+                            exhausted = True
+                            break
+                        logger.info(f"📥 Processing raw file: {path}")
+                        if self._should_stream(path):
+                            # The converter pulls paragraphs lazily; extraction cost lands in the convert stage
+                            try:
+                                paragraphs = self.processor.iter_text_from_file(path)
+                            except ValueError as e:
+                                logger.warning(f"⚠️ {e}")
+                                self.stats["extract"].record(0.0, ok=False)
+                                continue
+                            self.streamed += 1
+                            self.stats["extract"].record(0.0)
+                            convert_queue.put((path, paragraphs))
+                            continue
+                        future = pool.submit(_extract, path)
+                        submitted_at[future] = time.perf_counter()
+                        inflight.append(future)
+                    if not inflight:
+                        break
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        inflight.remove(future)
+                        elapsed = time.perf_counter() - submitted_at.pop(future)
+                        try:
+                            filepath, text = future.result()
+                        except Exception as e:
+                            logger.error(f"❌ Extraction worker failed: {e}", exc_info=True)
+                            self.stats["extract"].record(elapsed, ok=False)
+                            continue
+                        self.stats["extract"].record(elapsed, ok=bool(text))
+                        if not text:
+                            logger.warning(f"⚠️ Could not extract text from {filepath}")
+                            continue
+                        convert_queue.put((filepath, text))  # blocks when the LLM falls behind
+        finally:
+            for _ in converters:
+                convert_queue.put(_DONE)
+            for thread in converters:
+                thread.join()
+            write_queue.put(_DONE)
+            writer.join()
+
+        wall = time.perf_counter() - started
+        report = {name: stage.as_dict(wall) for name, stage in self.stats.items()}
+        report.update({"files": len(filepaths), "skipped": skipped, "streamed": self.streamed, "wall_seconds": round(wall, 3)})
+        logger.info(f"📊 Raw conversion finished: {report}")
+        return report
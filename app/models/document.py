@@ -1,81 +1,143 @@
 import os
+import hashlib
 import logging
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Iterable, Iterator, Optional, List, Union
 from datetime import datetime
 
-from striprtf.striprtf import rtf_to_text
-from docx import Document as DocxDocument
 from langchain_core.documents import Document
 from langchain_community.document_loaders import TextLoader
 
+from app.models.embedding_manifest import EmbeddingManifest, hash_content
+from app.models.conversion_pipeline import ConversionPipeline
+from app.utils.text_splitting import HEADING_RE, iter_paragraphs, make_token_counter, split_by_tokens
+from app.utils.text_extraction import iter_file_paragraphs
+from app.utils.markdown_chunker import MarkdownChunker
+
 logger = logging.getLogger("GAIA")
 
+MARKDOWN_PROMPT = """Convert the following text into a structured markdown document:
+
+{text}
+
+Create a logical organization with appropriate headers and formatting. 
+Use # for primary headers, ## for secondary headers, etc.
+Avoid including embedded HTML, links, or code blocks unless the text requires it.
+
+Markdown Output:
+"""
+
+
+def _normalize_heading(text: str) -> str:
+    return " ".join(text.lower().split()).strip(" :#")
+
+
+class _MarkdownMerger:
+    """
+    Reduce step for piecewise conversion: keeps the first piece's document title,
+    demotes later pieces that restart at title level, and drops headings repeated
+    across piece boundaries.
+    """
+
+    def __init__(self):
+        self.title = None  # (level, normalized text)
+        self.last_heading = {}  # level -> normalized text
+        self.pieces = 0
+
+    def add(self, markdown: str) -> str:
+        lines = markdown.splitlines()
+        levels = []
+        for line in lines:
+            match = HEADING_RE.match(line)
+            if match:
+                levels.append((len(match.group(1)), _normalize_heading(match.group(2))))
+
+        shift = 0
+        if self.pieces == 0:
+            if levels and sum(1 for level, _ in levels if level == levels[0][0]) == 1:
+                self.title = levels[0]
+        elif self.title:
+            # The repeated title is dropped below, so it must not count towards the piece's top level
+            body_levels = [level for level, key in levels if key != self.title[1]]
+            piece_min = min(body_levels, default=self.title[0] + 1)
+            if piece_min <= self.title[0]:
+                shift = self.title[0] + 1 - piece_min
+
+        merged = []
+        for line in lines:
+            match = HEADING_RE.match(line)
+            if not match:
+                merged.append(line)
+                continue
+            key = _normalize_heading(match.group(2))
+            if self.pieces > 0 and self.title and key == self.title[1]:
+                continue  # repeated document title
+            level = min(6, len(match.group(1)) + shift)
+            if self.pieces > 0 and not merged and self.last_heading.get(level) == key:
+                continue  # section continued from the previous piece
+            self.last_heading[level] = key
+            for deeper in [l for l in self.last_heading if l > level]:
+                del self.last_heading[deeper]
+            merged.append(f"{'#' * level} {match.group(2)}")
+
+        self.pieces += 1
+        return "\n".join(merged).strip()
+
+
 class DocumentProcessor:
     """
     Handles loading, preprocessing, and converting documents into structured markdown or LangChain document objects.
     Used for both initial data ingestion and markdown embedding during boot.
     """
 
-    def __init__(self, config, llm=None):
+    def __init__(self, config, llm=None, vector_store_manager=None):
         """
         Initialize with configuration and optional LLM for markdown conversion.
 
         Args:
             config: Configuration object
             llm: Optional language model for structured conversion
+            vector_store_manager: Optional VectorStoreManager used by embed_documents
         """
         self.config = config
         self.llm = llm
+        self.vector_store_manager = vector_store_manager
+        self.chunker = MarkdownChunker.from_config(config)
+        self.last_conversion_stats = None
 
     def extract_text_from_file(self, filepath: str) -> Optional[str]:
-        """Extract text content from .txt, .md, .docx, or .rtf files."""
-        _, ext = os.path.splitext(filepath)
+        """Extract text content from .txt, .md, .docx, or .rtf files (paragraphs joined by blank lines)."""
         try:
-            if ext.lower() in [".txt", ".md"]:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return f.read()
-            elif ext.lower() == ".rtf":
-                return self._extract_rtf(filepath)
-            elif ext.lower() == ".docx":
-                return self._extract_docx(filepath)
-            else:
-                logger.warning(f"Unsupported file format: {ext}")
-                return None
+            text = "\n\n".join(self.iter_text_from_file(filepath))
+            return text or None
+        except ValueError as e:
+            logger.warning(str(e))
+            return None
         except Exception as e:
             logger.error(f"Error extracting text from {filepath}: {e}")
             return None
 
-    def _extract_rtf(self, filepath: str) -> Optional[str]:
-        """Extract text from RTF files with utf-8 and latin-1 fallback."""
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return rtf_to_text(f.read())
-        except UnicodeDecodeError:
-            try:
-                with open(filepath, 'r', encoding='latin-1') as f:
-                    return rtf_to_text(f.read())
-            except Exception as e:
-                logger.error(f"Error extracting RTF with latin-1 encoding: {e}")
-                return None
-        except Exception as e:
-            logger.error(f"Error extracting RTF with utf-8 encoding: {e}")
-            return None
+    def iter_text_from_file(self, filepath: str) -> Iterator[str]:
+        """
+        Stream paragraphs from a .txt, .md, .docx, or .rtf file without loading it whole.
 
-    def _extract_docx(self, filepath: str) -> Optional[str]:
-        """Extract text from Microsoft Word .docx files."""
-        try:
-            doc = DocxDocument(filepath)
-            return "\n".join(para.text for para in doc.paragraphs)
-        except Exception as e:
-            logger.error(f"Error extracting DOCX: {e}")
-            return None
+        The result can be passed straight to iter_markdown_conversion.
 
-    def convert_to_markdown(self, text: str) -> Optional[str]:
+        Raises:
+            ValueError: for unsupported file formats
         """
-        Convert plain text to structured markdown using the LLM.
+        return iter_file_paragraphs(filepath)
+
+    def convert_to_markdown(self, text: Union[str, Iterable[str]]) -> Optional[str]:
+        """
+        Convert plain text to structured markdown using the LLM, returned as one string.
+
+        Meant for small inputs, since the whole result is held in memory; large
+        inputs go through iter_markdown_conversion and save_markdown_stream instead.
 
         Args:
-            text: Raw extracted text
+            text: Raw extracted text, or an iterable of paragraphs
 
         Returns:
             str or None: Markdown string, or None on failure
@@ -84,18 +146,62 @@ class DocumentProcessor:
             logger.error("LLM not available for markdown conversion")
             return None
 
-        prompt = f"""Convert the following text into a structured markdown document:
+        parts = list(self.iter_markdown_conversion(text))
+        return "\n\n".join(parts) if parts else None
 
-{text}
+    def _conversion_budget(self, count) -> int:
+        """Input tokens per piece: the context is shared between the text and its markdown output."""
+        n_ctx = getattr(self.config, "max_tokens", 512) or 512
+        overhead = count(MARKDOWN_PROMPT.format(text=""))
+        return max(64, (n_ctx - overhead) // 2)
 
-Create a logical organization with appropriate headers and formatting. 
-Use # for primary headers, ## for secondary headers, etc.
-Avoid including embedded HTML, links, or code blocks unless the text requires it.
+    def iter_markdown_conversion(self, text: Union[str, Iterable[str]]) -> Iterator[str]:
+        """
+        Map-reduce markdown conversion with bounded memory.
 
-Markdown Output:
-"""
+        The input is packed into token-bounded pieces, each piece is converted
+        independently (optionally several at once), and the results are merged in
+        order so heading levels stay consistent and repeated headers are dropped.
+
+        Args:
+            text: Raw extracted text, or an iterable of paragraphs (consumed lazily)
+
+        Yields:
+            str: Merged markdown for each converted piece, in document order
+        """
+        count = make_token_counter(self.llm)
+        budget = self._conversion_budget(count)
+        paragraphs = iter_paragraphs(text) if isinstance(text, str) else text
+        pieces = split_by_tokens(paragraphs, budget, count)
+        merger = _MarkdownMerger()
+
+        workers = max(1, getattr(self.config, "conversion_piece_workers", 1) or 1)
+        failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            window = deque()
+            for piece in pieces:
+                window.append(executor.submit(self._convert_piece, piece, budget))
+                if len(window) > workers:
+                    result = window.popleft().result()
+                    failed += result is None
+                    if result:
+                        yield merger.add(result)
+            while window:
+                result = window.popleft().result()
+                failed += result is None
+                if result:
+                    yield merger.add(result)
+
+        if failed:
+            logger.warning(f"⚠️ {failed} of {merger.pieces + failed} pieces failed markdown conversion and were dropped")
+
+    def _convert_piece(self, text: str, max_tokens: int) -> Optional[str]:
+        """Convert one piece of text with a single LLM call."""
+        prompt = MARKDOWN_PROMPT.format(text=text)
         try:
-            result = self.llm(prompt)
+            result = self.llm(prompt, max_tokens=max_tokens)
+            if isinstance(result, dict):
+                result = result["choices"][0]["text"]
             if not result or len(result.strip()) < 10:
                 logger.warning("⚠️ LLM returned empty or too-short markdown")
                 return None
@@ -117,6 +223,33 @@ Markdown Output:
             logger.error(f"Error during markdown conversion: {e}")
             return None
 
+    def save_markdown_stream(self, filepath: str, pieces: Iterable[str]) -> int:
+        """
+        Write markdown pieces to `filepath` as they are produced, through a
+        temporary file that is renamed into place once the last piece is written.
+
+        Returns:
+            int: Pieces written (0 when nothing was converted; no file is left behind)
+        """
+        tmp_path = filepath + ".part"
+        written = 0
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for piece in pieces:
+                    f.write(f"\n\n{piece}" if written else piece)
+                    written += 1
+            if written:
+                os.replace(tmp_path, filepath)
+                logger.info(f"📄 Saved markdown to {filepath}")
+            else:
+                os.remove(tmp_path)
+            return written
+        except Exception as e:
+            logger.error(f"Error saving markdown to {filepath}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return 0
+
     def save_markdown(self, filepath: str, content: str) -> bool:
         """Write markdown content to file."""
         try:
@@ -154,32 +287,26 @@ Markdown Output:
 
         return documents
 
-    def process_raw_data(self) -> None:
-        """Process raw input files in `raw_data_path` into markdown documents."""
+    def process_raw_data(self, files: Optional[List[str]] = None) -> None:
+        """Process raw input files in `raw_data_path` (or just `files`) into markdown documents."""
         if not self.llm:
             logger.error("LLM not available for raw data processing")
             return
 
         try:
-            for filename in os.listdir(self.config.raw_data_path):
-                filepath = os.path.join(self.config.raw_data_path, filename)
-                logger.info(f"📥 Processing raw file: {filepath}")
-
-                raw_text = self.extract_text_from_file(filepath)
-                if not raw_text:
-                    logger.warning(f"⚠️ Could not extract text from {filepath}")
-                    continue
-
-                markdown_content = self.convert_to_markdown(raw_text)
-                if not markdown_content:
-                    logger.warning(f"⚠️ Could not convert {filename} to markdown")
-                    continue
-
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_filename = f"converted_{os.path.splitext(filename)[0]}_{timestamp}.md"
-                output_filepath = os.path.join(self.config.output_path, output_filename)
-
-                self.save_markdown(output_filepath, markdown_content)
+            raw_path = self.config.raw_data_path
+            if files is None:
+                files = [os.path.join(raw_path, filename) for filename in sorted(os.listdir(raw_path))]
+            filepaths = [filepath for filepath in files if os.path.isfile(filepath)]
+            pipeline = ConversionPipeline(
+                self,
+                output_path=self.config.output_path,
+                extract_workers=getattr(self.config, "extract_workers", None),
+                convert_workers=getattr(self.config, "conversion_workers", 1),
+                queue_size=getattr(self.config, "conversion_queue_size", 4),
+                stream_min_mb=getattr(self.config, "stream_extract_min_mb", 32),
+            )
+            self.last_conversion_stats = pipeline.run(filepaths)
         except Exception as e:
             logger.error(f"Error processing raw data: {e}")
 
@@ -199,51 +326,165 @@ Markdown Output:
             logger.error(f"Error getting document info for {filepath}: {e}")
             return None
 
+    def _load_markdown_document(self, filepath: str, tier: Optional[str] = None,
+                                project: Optional[str] = None,
+                                content: Optional[str] = None) -> Optional[Document]:
+        """Wrap a single markdown file in a Document with tier/project metadata."""
+        try:
+            if content is None:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            if not content.strip():
+                logger.warning(f"Empty file skipped: {filepath}")
+                return None
+
+            metadata = {
+                "filename": os.path.basename(filepath),
+                "source_path": filepath,
+                "tier": tier or "unspecified",
+                "project": project or "global"
+            }
+            logger.info(f"📘 Loaded document with metadata: {metadata}")
+            return Document(page_content=content, metadata=metadata)
+        except Exception as e:
+            logger.error(f"Failed to load file {filepath}: {e}")
+            return None
+
     def process_documents(self, directory: str, tier: Optional[str] = None, project: Optional[str] = None) -> List[Document]:
-        """Load and wrap markdown documents from a directory with metadata."""
-        documents = []
+        """Load markdown documents from a directory and split them into section-aligned chunks with metadata."""
+        return list(self.iter_chunk_documents(directory, tier, project))
+
+    def iter_chunk_documents(self, directory: str, tier: Optional[str] = None,
+                             project: Optional[str] = None) -> Iterator[Document]:
+        """
+        Lazily chunk the markdown files of a directory, one file in memory at a time.
+        Files are visited in sorted order so a resumed bulk ingest sees the same stream.
+        """
         if not os.path.isdir(directory):
             logger.warning(f"Directory not found or invalid: {directory}")
-            return documents
+            return
 
         try:
-            for filename in os.listdir(directory):
-                if filename.endswith(".md"):
-                    filepath = os.path.join(directory, filename)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            if not content.strip():
-                                logger.warning(f"Empty file skipped: {filepath}")
-                                continue
-
-                            metadata = {
-                                "filename": filename,
-                                "source_path": filepath,
-                                "tier": tier or "unspecified",
-                                "project": project or "global"
-                            }
-                            documents.append(Document(page_content=content, metadata=metadata))
-                            logger.info(f"📘 Loaded document with metadata: {metadata}")
-                    except Exception as e:
-                        logger.error(f"Failed to load file {filepath}: {e}")
+            filenames = sorted(os.listdir(directory))
         except Exception as e:
             logger.error(f"Error accessing directory {directory}: {e}")
+            return
+        for filename in filenames:
+            if filename.endswith(".md"):
+                doc = self._load_markdown_document(os.path.join(directory, filename), tier, project)
+                if doc:
+                    yield from self.chunker.create_documents(doc.page_content, doc.metadata)
+
+    def _manifest_path(self) -> str:
+        """Manifest lives next to the active project's collection, so each project tracks its own files."""
+        if self.vector_store_manager:
+            return self.vector_store_manager.manifest_path()
+        return os.path.join(self.config.vectordb_path, "embedding_manifest.json")
+
+    @staticmethod
+    def _chunk_id(filepath: str, chunk_hash: str) -> str:
+        """Deterministic vector ID for a chunk; unchanged chunks keep their ID across file edits."""
+        return hashlib.sha1(f"{filepath}\0{chunk_hash}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, path: Optional[str] = None, files: Optional[List[str]] = None) -> int:
+        """
+        Incrementally embed markdown files from `structured/` via the vector store.
 
-        return documents
+        Only files that are new or whose content changed since the last run are
+        chunked, and within a changed file only chunks whose content hash is new
+        are embedded. Vectors for chunks that disappeared (or for deleted files)
+        are removed by ID, so repeated runs never duplicate vectors.
+
+        Args:
+            path: Directory to embed (defaults to config.structured_path)
+            files: Only these markdown files (e.g. from the file watcher); the
+                directory is not listed and missing files have their vectors removed.
+                A path ending in a separator stands for every embedded file under it.
 
-    def embed_documents(self) -> int:
-        """Reads all markdown files from `structured/`, embeds them via the vector store."""
-        path = self.config.structured_path
-        documents = self.process_documents(path, tier="2_semantic")
-        if not documents:
+        Returns:
+            int: Number of chunks embedded in this run
+        """
+        path = path or self.config.structured_path
+        if not self.vector_store_manager:
+            logger.error("Vector store manager not available for embedding")
+            return 0
+        if not os.path.isdir(path):
+            logger.warning(f"Directory not found or invalid: {path}")
             return 0
-        self.vector_store_manager.add_documents(documents)
-        return len(documents)
 
-    def generate_artifacts(self) -> int:
-        """Processes raw documents and converts them into markdown in the output directory."""
-        self.process_raw_data()
+        manifest = EmbeddingManifest(self._manifest_path())
+        project = self.vector_store_manager.active_project
+        present = set()
+        embedded = 0
+        stale_ids: List[str] = []
+
+        if files is None:
+            candidates = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".md")]
+        else:
+            expanded = []
+            for entry in files:
+                if entry.endswith(os.sep):
+                    expanded.extend(p for p in manifest.paths() if p.startswith(entry))
+                else:
+                    expanded.append(entry)
+            candidates = sorted(f for f in expanded if f.endswith(".md"))
+
+        for filepath in candidates:
+            if files is not None and not os.path.exists(filepath):
+                logger.info(f"🗑️ Removing vectors for deleted file: {filepath}")
+                stale_ids.extend(manifest.forget(filepath))
+                continue
+            present.add(filepath)
+            try:
+                stat = os.stat(filepath)
+                if manifest.is_unchanged(filepath, stat):
+                    continue
+
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                content_hash = hash_content(content)
+                entry = manifest.get(filepath)
+                if entry and entry["hash"] == content_hash:
+                    manifest.touch(filepath, stat)
+                    continue
+
+                old_ids = set(manifest.forget(filepath))
+                doc = self._load_markdown_document(filepath, tier="2_semantic", project=project, content=content)
+                if not doc:
+                    stale_ids.extend(old_ids)
+                    continue
+
+                chunks = self.chunker.create_documents(doc.page_content, doc.metadata)
+                ids = [self._chunk_id(filepath, chunk.metadata["chunk_hash"]) for chunk in chunks]
+                new = [(chunk, chunk_id) for chunk, chunk_id in zip(chunks, ids) if chunk_id not in old_ids]
+                if new and not self.vector_store_manager.add_documents([c for c, _ in new], ids=[i for _, i in new]):
+                    stale_ids.extend(old_ids)
+                    continue
+                manifest.record(filepath, stat, content_hash, ids)
+                stale_ids.extend(old_ids - set(ids))
+                embedded += len(new)
+            except Exception as e:
+                logger.error(f"❌ Failed to embed {filepath}: {e}", exc_info=True)
+
+        # A partial (files=...) run cannot tell unlisted files from deleted ones
+        if files is None:
+            for filepath in manifest.paths():
+                if filepath.startswith(os.path.join(path, "")) and filepath not in present:
+                    logger.info(f"🗑️ Removing vectors for deleted file: {filepath}")
+                    stale_ids.extend(manifest.forget(filepath))
+
+        if stale_ids:
+            self.vector_store_manager.delete_documents(stale_ids)
+        if embedded or stale_ids:
+            self.vector_store_manager.persist()
+
+        manifest.save()
+        logger.info(f"🧬 Embedding pass complete: {embedded} embedded, {len(stale_ids)} stale vectors removed")
+        return embedded
+
+    def generate_artifacts(self, files: Optional[List[str]] = None) -> int:
+        """Processes raw documents (all, or only `files`) and converts them into markdown in the output directory."""
+        self.process_raw_data(files)
         files = os.listdir(self.config.output_path)
         return len([f for f in files if f.endswith(".md")])
         """
@@ -0,0 +1,226 @@
+"""
+models/embedding_cache.py
+
+On-disk embedding cache keyed by (model, normalized chunk text hash).
+Vectors live in a memory-mapped float32 matrix; an index file maps keys to rows
+and keeps LRU order so the cache can be bounded by entry count.
+
+Rows are recycled before the index is rewritten, so every row also carries a
+tag (hash of its key and vector) in tags.bin. A lookup whose tag does not match
+is a miss, so an index left behind by a crash can never return another text's vector.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("GAIA.EmbeddingCache")
+
+INDEX_VERSION = 2
+TAG_BYTES = 16
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially reformatted chunks share a cache entry."""
+    return " ".join(text.split())
+
+
+def row_tag(key: str, vector: np.ndarray) -> bytes:
+    """Checksum binding a row's vector to the key it was stored under."""
+    data = np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+    return hashlib.blake2b(key.encode("utf-8") + data, digest_size=TAG_BYTES).digest()
+
+
+class EmbeddingCache:
+    """
+    Size-bounded, persistent cache of embedding vectors.
+    One cache directory per model identity; rows are recycled in LRU order once full.
+    """
+
+    def __init__(self, cache_dir: str, model_id: str, max_entries: int = 100_000, flush_seconds: float = 30.0):
+        """
+        Args:
+            cache_dir: Root directory for cache files
+            model_id: Identity of the embedding model (name + options)
+            max_entries: Maximum number of cached vectors
+            flush_seconds: Minimum interval between flushes triggered by maybe_flush()
+        """
+        self.model_id = model_id
+        self.max_entries = max(1, int(max_entries))
+        self.flush_seconds = flush_seconds
+        self.dir = os.path.join(cache_dir, hashlib.sha1(model_id.encode("utf-8")).hexdigest()[:16])
+        self.matrix_path = os.path.join(self.dir, "vectors.f32")
+        self.index_path = os.path.join(self.dir, "index.json")
+        self.tags_path = os.path.join(self.dir, "tags.bin")
+        self.dim: Optional[int] = None
+        self.capacity = 0
+        self.rows: "OrderedDict[str, int]" = OrderedDict()
+        self.free_rows: List[int] = []
+        self.matrix: Optional[np.memmap] = None
+        self.tags: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        os.makedirs(self.dir, exist_ok=True)
+        self._load()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def _load(self):
+        if not all(os.path.exists(path) for path in (self.index_path, self.matrix_path, self.tags_path)):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") != INDEX_VERSION or index.get("model_id") != self.model_id:
+                logger.warning("⚠️ Embedding cache index mismatch; starting fresh.")
+                return
+            self.dim = index["dim"]
+            self.capacity = index["capacity"]
+            self.rows = OrderedDict((k, r) for k, r in index["entries"])
+            self.free_rows = index.get("free_rows", [])
+            self._open_files()
+            logger.info(f"🗃️ Embedding cache loaded: {len(self.rows)} vectors ({self.model_id})")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load embedding cache: {e}")
+            self.dim, self.capacity, self.matrix, self.tags = None, 0, None, None
+            self.rows, self.free_rows = OrderedDict(), []
+
+    def _open_files(self):
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+",
+                                shape=(self.capacity, self.dim))
+        self.tags = np.memmap(self.tags_path, dtype=np.uint8, mode="r+", shape=(self.capacity, TAG_BYTES))
+
+    def _grow(self, needed: int):
+        """Extend the backing file so at least `needed` rows fit (up to max_entries)."""
+        new_capacity = min(self.max_entries, max(needed, self.capacity * 2, 1024))
+        if new_capacity <= self.capacity:
+            return
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.tags.flush()
+            self.matrix, self.tags = None, None
+        for path, row_bytes in ((self.matrix_path, self.dim * 4), (self.tags_path, TAG_BYTES)):
+            with open(path, "ab") as f:
+                f.truncate(new_capacity * row_bytes)
+        self.free_rows.extend(range(self.capacity, new_capacity))
+        self.capacity = new_capacity
+        self._open_files()
+
+    def _allocate_row(self) -> int:
+        if not self.free_rows:
+            self._grow(self.capacity + 1)
+        if self.free_rows:
+            return self.free_rows.pop()
+        # Full: evict the least recently used entry and reuse its row
+        _, row = self.rows.popitem(last=False)
+        return row
+
+    def get_many(self, keys: List[str]) -> Dict[int, np.ndarray]:
+        """
+        Look up cached vectors.
+
+        Args:
+            keys: Cache keys (see `key`)
+
+        Returns:
+            dict: Position in `keys` -> vector copy, for hits only
+        """
+        found = {}
+        with self._lock:
+            if self.matrix is None:
+                self.misses += len(keys)
+                return found
+            for i, key in enumerate(keys):
+                row = self.rows.get(key)
+                if row is None:
+                    continue
+                vector = np.array(self.matrix[row])
+                if self.tags[row].tobytes() != row_tag(key, vector):
+                    # The row was reused for another key after the index was last written
+                    del self.rows[key]
+                    self.free_rows.append(row)
+                    self.rejected += 1
+                    self._dirty = True
+                    continue
+                self.rows.move_to_end(key)
+                found[i] = vector
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """Store vectors for the given keys, evicting LRU entries when full."""
+        if not keys:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                logger.warning(f"⚠️ Embedding dim changed ({self.dim} -> {vectors.shape[1]}); not caching.")
+                return
+            for key, vector in zip(keys, vectors):
+                row = self.rows.get(key)
+                if row is None:
+                    row = self._allocate_row()
+                self.matrix[row] = vector
+                self.tags[row] = np.frombuffer(row_tag(key, self.matrix[row]), dtype=np.uint8)
+                self.rows[key] = row
+                self.rows.move_to_end(key)
+            self._dirty = True
+
+    def maybe_flush(self):
+        """
+        Flush if `flush_seconds` passed since the last flush.
+        flush() rewrites the whole index, so bulk embedding calls this per batch instead.
+        Entries lost to a crash before the next flush are only cache misses.
+        """
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Write the matrix and index to disk."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._dirty or self.matrix is None:
+                return
+            try:
+                self.matrix.flush()
+                self.tags.flush()
+                tmp_path = self.index_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({
+                        "version": INDEX_VERSION,
+                        "model_id": self.model_id,
+                        "dim": self.dim,
+                        "capacity": self.capacity,
+                        "entries": list(self.rows.items()),
+                        "free_rows": self.free_rows,
+                    }, f)
+                os.replace(tmp_path, self.index_path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"❌ Failed to flush embedding cache: {e}", exc_info=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.rows),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "rejected": self.rejected,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
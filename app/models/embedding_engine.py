@@ -0,0 +1,224 @@
+"""
+models/embedding_engine.py
+
+Batched, multi-process embedding engine used by VectorStoreManager.
+Splits inputs into fixed-size batches, shards them across a process pool on
+multi-core CPUs, and returns float32 NumPy matrices that go straight into the store.
+"""
+
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.models.embedding_cache import EmbeddingCache
+
+logger = logging.getLogger("GAIA.EmbeddingEngine")
+
+DEFAULT_EMBEDDING_MODEL = "all-mpnet-base-v2"
+
+# Per-process model handle for pool workers (set by _init_worker)
+_worker_model = None
+_worker_normalize = False
+
+
+def _load_model(model_name: str, threads: Optional[int] = None):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        torch.set_num_threads(threads)
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _init_worker(model_name: str, normalize: bool, threads: int):
+    """Load one model copy per worker process."""
+    global _worker_model, _worker_normalize
+    _worker_model = _load_model(model_name, threads)
+    _worker_normalize = normalize
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    return _worker_model.encode(
+        texts,
+        batch_size=len(texts),
+        convert_to_numpy=True,
+        normalize_embeddings=_worker_normalize,
+        show_progress_bar=False,
+    ).astype(np.float32, copy=False)
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    LangChain-compatible embedding function with batching and optional process-level parallelism.
+    Small requests (queries, single batches) are encoded in-process; larger ones are
+    sharded across `workers` processes, each with its own model copy.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, batch_size: int = 32,
+                 workers: int = 1, normalize: bool = False, threads: Optional[int] = None,
+                 cache_dir: Optional[str] = None, cache_max_entries: int = 100_000,
+                 cache_flush_seconds: float = 30.0):
+        """
+        Args:
+            model_name: SentenceTransformers model name or local path
+            batch_size: Number of texts per encode call
+            workers: Number of worker processes (1 disables the pool)
+            normalize: L2-normalize output vectors
+            threads: Torch threads for the in-process model (defaults to all cores)
+            cache_dir: Directory for the persistent embedding cache (None disables it)
+            cache_max_entries: Maximum number of cached vectors
+            cache_flush_seconds: Minimum interval between cache index writes while encoding
+        """
+        self.model_name = model_name
+        self.batch_size = max(1, int(batch_size))
+        self.workers = max(1, int(workers))
+        self.normalize = normalize
+        self.threads = threads
+        self.cache = None
+        if cache_dir:
+            try:
+                self.cache = EmbeddingCache(cache_dir, f"{model_name}|normalize={normalize}",
+                                            cache_max_entries, cache_flush_seconds)
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding cache disabled: {e}")
+        self._model = None
+        self._pool = None
+        self._lock = threading.Lock()
+        self._stats = {"chunks": 0, "batches": 0, "seconds": 0.0, "last_chunks_per_sec": 0.0}
+
+    @classmethod
+    def from_config(cls, config) -> "EmbeddingEngine":
+        return cls(
+            model_name=getattr(config, "embedding_model", DEFAULT_EMBEDDING_MODEL),
+            batch_size=getattr(config, "embedding_batch_size", 32),
+            workers=getattr(config, "embedding_workers", 1),
+            normalize=getattr(config, "embedding_normalize", False),
+            threads=getattr(config, "n_threads", None),
+            cache_dir=getattr(config, "embedding_cache_dir", None),
+            cache_max_entries=getattr(config, "embedding_cache_max_entries", 100_000),
+            cache_flush_seconds=getattr(config, "embedding_cache_flush_seconds", 30.0),
+        )
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                logger.info(f"🧬 Loading embedding model: {self.model_name}")
+                self._model = _load_model(self.model_name, self.threads)
+            return self._model
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                cores = multiprocessing.cpu_count()
+                per_worker = max(1, cores // self.workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.normalize, per_worker),
+                )
+                logger.info(f"🧵 Embedding pool started: {self.workers} workers x {per_worker} threads")
+            return self._pool
+
+    def _encode_local(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a list of texts, serving repeated chunks from the embedding cache.
+
+        Args:
+            texts: Input strings
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(texts), dim)
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not self.cache:
+            return self._encode_uncached(texts)
+
+        keys = [self.cache.key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = [i for i in range(len(texts)) if i not in cached]
+        if not missing:
+            return np.vstack([cached[i] for i in range(len(texts))])
+
+        fresh = self._encode_uncached([texts[i] for i in missing])
+        self.cache.put_many([keys[i] for i in missing], fresh)
+        self.cache.maybe_flush()
+        if not cached:
+            return fresh
+
+        vectors = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+        for i, vector in cached.items():
+            vectors[i] = vector
+        vectors[missing] = fresh
+        return vectors
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        start = time.perf_counter()
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.workers > 1 and len(batches) > 1:
+            vectors = np.vstack(list(self._get_pool().map(_encode_batch, batches)))
+        else:
+            vectors = self._encode_local(texts)
+        elapsed = time.perf_counter() - start
+
+        self._record(len(texts), len(batches), elapsed)
+        return vectors
+
+    def _record(self, chunks: int, batches: int, elapsed: float):
+        rate = chunks / elapsed if elapsed > 0 else 0.0
+        with self._lock:
+            self._stats["chunks"] += chunks
+            self._stats["batches"] += batches
+            self._stats["seconds"] += elapsed
+            self._stats["last_chunks_per_sec"] = rate
+        if chunks >= self.batch_size:
+            logger.info(f"⚡ Embedded {chunks} chunks in {elapsed:.2f}s ({rate:.1f} chunks/sec)")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode_local([text])[0].tolist()
+
+    def stats(self) -> dict:
+        """Return cumulative throughput statistics."""
+        with self._lock:
+            seconds = self._stats["seconds"]
+            return {
+                "model": self.model_name,
+                "batch_size": self.batch_size,
+                "workers": self.workers,
+                "chunks": self._stats["chunks"],
+                "batches": self._stats["batches"],
+                "seconds": round(seconds, 3),
+                "chunks_per_sec": round(self._stats["chunks"] / seconds, 2) if seconds else 0.0,
+                "last_chunks_per_sec": round(self._stats["last_chunks_per_sec"], 2),
+                "cache": self.cache.stats() if self.cache else None,
+            }
+
+    def shutdown(self):
+        """Flush the cache and stop the worker pool, if one was started."""
+        if self.cache:
+            self.cache.flush()
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                logger.info("🛑 Embedding pool stopped.")
@@ -0,0 +1,113 @@
+"""
+models/embedding_manifest.py
+
+Persistent manifest of embedded markdown files.
+Records (mtime, size, content hash, chunk IDs) per file so that re-embedding
+only touches files that were added, changed, or removed since the last run.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("GAIA.EmbeddingManifest")
+
+MANIFEST_VERSION = 1
+
+
+def hash_content(content: str) -> str:
+    """Return a stable content hash for a document body."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class EmbeddingManifest:
+    """
+    Tracks which files have been embedded and the vector IDs they produced.
+    A file is considered unchanged when its (mtime, size) match the manifest;
+    otherwise its content hash decides whether it needs to be re-embedded.
+    """
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self.entries: Dict[str, Dict] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Load the manifest from disk, starting empty if missing or unreadable."""
+        if not os.path.exists(self.manifest_path):
+            self.entries = {}
+            return
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                logger.warning("⚠️ Embedding manifest version mismatch; starting fresh.")
+                self.entries = {}
+            else:
+                self.entries = data.get("files", {})
+            logger.debug(f"🗃️ Embedding manifest loaded: {len(self.entries)} files")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load embedding manifest: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Atomically write the manifest back to disk if it changed."""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            tmp_path = self.manifest_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+            logger.debug(f"💾 Embedding manifest saved: {len(self.entries)} files")
+        except Exception as e:
+            logger.error(f"❌ Failed to save embedding manifest: {e}", exc_info=True)
+
+    def get(self, path: str) -> Optional[Dict]:
+        return self.entries.get(path)
+
+    def is_unchanged(self, path: str, stat: os.stat_result) -> bool:
+        """Cheap check: True if size and mtime match the recorded entry."""
+        entry = self.entries.get(path)
+        return bool(entry) and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+    def touch(self, path: str, stat: os.stat_result):
+        """Refresh stat fields for a file whose content hash did not change."""
+        entry = self.entries.get(path)
+        if entry:
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._dirty = True
+
+    def record(self, path: str, stat: os.stat_result, content_hash: str, chunk_ids: List[str]):
+        """Record a freshly embedded file and the vector IDs it produced."""
+        self.record_entry(path, stat.st_size, stat.st_mtime_ns, content_hash, chunk_ids)
+
+    def record_entry(self, path: str, size: int, mtime_ns: int, content_hash: Optional[str], chunk_ids: List[str]):
+        """
+        Record an embedded file from stat fields captured earlier (e.g. by a bulk ingest).
+        A None `content_hash` means the content is unknown, so any stat change re-embeds the file.
+        """
+        self.entries[path] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "hash": content_hash,
+            "chunk_ids": list(chunk_ids),
+        }
+        self._dirty = True
+
+    def forget(self, path: str) -> List[str]:
+        """Drop a file from the manifest, returning its previously stored chunk IDs."""
+        entry = self.entries.pop(path, None)
+        if entry is None:
+            return []
+        self._dirty = True
+        return entry.get("chunk_ids", [])
+
+    def paths(self) -> List[str]:
+        return list(self.entries.keys())
@@ -0,0 +1,294 @@
+"""
+models/inference_scheduler.py
+
+Single-worker inference scheduler in front of the llama.cpp model.
+All LLM calls are queued here so one model instance can serve several chat
+sessions and background jobs without racing:
+  - bounded queue (callers get SchedulerFull instead of piling up)
+  - strict priority: interactive chat before background work
+  - round-robin between sessions within a priority level
+  - streaming jobs can be cancelled mid-generation (e.g. client disconnect)
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("GAIA.InferenceScheduler")
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+_STREAM_END = object()
+
+
+class SchedulerFull(RuntimeError):
+    """Raised when the inference queue is at capacity."""
+
+
+class JobCancelled(RuntimeError):
+    """Raised when waiting on a job that was cancelled."""
+
+
+class InferenceJob:
+    """A queued LLM call. Blocking jobs expose `result()`, streaming jobs are iterated."""
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict, session_id: str, priority: int, stream: bool):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.session_id = session_id
+        self.priority = priority
+        self.stream = stream
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+        self._done = threading.Event()
+        self._result = None
+        self._error: Optional[BaseException] = None
+        self._events: "queue.Queue" = queue.Queue() if stream else None
+
+    def cancel(self):
+        """Request cancellation; streaming jobs stop at the next token."""
+        if not self.cancelled and not self._done.is_set():
+            self.cancelled = True
+            logger.info(f"✋ Inference job cancelled (session={self.session_id})")
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        if not self._done.wait(timeout):
+            raise TimeoutError("Inference job did not finish in time")
+        if self.cancelled and self._error is None and self._result is None:
+            raise JobCancelled("Inference job was cancelled")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def __iter__(self):
+        try:
+            while True:
+                item = self._events.get()
+                if item is _STREAM_END:
+                    break
+                yield item
+            if self._error is not None:
+                raise self._error
+        finally:
+            # Reached on normal completion and on consumer close() (client disconnect)
+            self.cancel()
+
+
+class InferenceScheduler:
+    """
+    Serializes LLM calls onto one worker thread with priority and per-session fairness.
+    Use `bind()` to wrap a model so existing call sites go through the scheduler transparently.
+    """
+
+    def __init__(self, max_queue: int = 64, name: str = "llm"):
+        self.max_queue = max_queue
+        self.name = name
+        self._levels: Dict[int, "OrderedDict[str, deque]"] = {}
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._waits = deque(maxlen=256)
+        self._runs = deque(maxlen=256)
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+
+    def start(self):
+        """Starts the worker thread."""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=f"InferenceScheduler-{self.name}", daemon=True)
+            self._thread.start()
+        logger.info(f"🚦 Inference scheduler '{self.name}' started (max_queue={self.max_queue})")
+
+    def stop(self):
+        """Stops the worker thread after the current job."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+        logger.info(f"🛑 Inference scheduler '{self.name}' stopped.")
+
+    def submit(self, fn: Callable, args: tuple = (), kwargs: Optional[dict] = None, *,
+               session_id: str = "default", priority: int = PRIORITY_INTERACTIVE,
+               stream: bool = False) -> InferenceJob:
+        """
+        Queue an LLM call.
+
+        Args:
+            fn: Callable to run on the worker thread
+            args: Positional arguments for fn
+            kwargs: Keyword arguments for fn
+            session_id: Fairness key; sessions at the same priority are served round-robin
+            priority: Lower runs first (PRIORITY_INTERACTIVE / PRIORITY_BACKGROUND)
+            stream: fn returns an iterator whose items are forwarded as they arrive
+
+        Returns:
+            InferenceJob
+
+        Raises:
+            SchedulerFull: if the queue is at capacity
+        """
+        job = InferenceJob(fn, args, kwargs or {}, session_id, priority, stream)
+
+        # Re-entrant call from inside a running job: execute inline to avoid deadlock
+        if threading.current_thread() is self._thread:
+            self._execute(job)
+            return job
+
+        with self._cond:
+            if self._pending >= self.max_queue:
+                self._counters["rejected"] += 1
+                raise SchedulerFull(f"Inference queue full ({self._pending} pending)")
+            sessions = self._levels.setdefault(priority, OrderedDict())
+            sessions.setdefault(session_id, deque()).append(job)
+            self._pending += 1
+            self._counters["submitted"] += 1
+            self._cond.notify()
+        return job
+
+    def run(self, fn: Callable, args: tuple = (), kwargs: Optional[dict] = None, *,
+            session_id: str = "default", priority: int = PRIORITY_INTERACTIVE,
+            timeout: Optional[float] = None) -> Any:
+        """Submit a blocking call and wait for its result."""
+        job = self.submit(fn, args, kwargs, session_id=session_id, priority=priority)
+        return job.result(timeout)
+
+    def bind(self, llm, priority: int = PRIORITY_INTERACTIVE, session_id: str = "default") -> "ScheduledLLM":
+        """Wrap a model so calls to it are routed through this scheduler."""
+        return ScheduledLLM(self, llm, priority, session_id)
+
+    def _next_job(self) -> Optional[InferenceJob]:
+        for priority in sorted(self._levels):
+            sessions = self._levels[priority]
+            while sessions:
+                session_id, jobs = sessions.popitem(last=False)
+                job = jobs.popleft()
+                if jobs:
+                    sessions[session_id] = jobs  # back of the round-robin line
+                self._pending -= 1
+                return job
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending == 0:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                job = self._next_job()
+            if job is None:
+                continue
+            if job.cancelled:
+                self._finish(job)
+                continue
+            self._execute(job)
+
+    def _execute(self, job: InferenceJob):
+        job.started_at = time.monotonic()
+        self._waits.append(job.started_at - job.submitted_at)
+        try:
+            if job.stream:
+                iterator = job.fn(*job.args, **job.kwargs)
+                try:
+                    for item in iterator:
+                        if job.cancelled:
+                            break
+                        job._events.put(item)
+                finally:
+                    close = getattr(iterator, "close", None)
+                    if close:
+                        close()
+            else:
+                job._result = job.fn(*job.args, **job.kwargs)
+        except Exception as e:
+            logger.error(f"❌ Inference job failed (session={job.session_id}): {e}", exc_info=True)
+            job._error = e
+        finally:
+            job.finished_at = time.monotonic()
+            self._runs.append(job.finished_at - job.started_at)
+            self._finish(job)
+
+    def _finish(self, job: InferenceJob):
+        with self._cond:
+            if job._error is not None:
+                self._counters["failed"] += 1
+            elif job.cancelled:
+                self._counters["cancelled"] += 1
+            else:
+                self._counters["completed"] += 1
+        job._done.set()
+        if job.stream:
+            job._events.put(_STREAM_END)
+
+    def metrics(self) -> dict:
+        """Queue depth, wait/run time and outcome counters."""
+        with self._cond:
+            depth = {
+                str(priority): sum(len(jobs) for jobs in sessions.values())
+                for priority, sessions in self._levels.items()
+            }
+            waits = sorted(self._waits)
+            runs = sorted(self._runs)
+            counters = dict(self._counters)
+
+        def pct(values, q):
+            return round(values[min(len(values) - 1, int(q * len(values)))], 3) if values else 0.0
+
+        return dict(
+            counters,
+            queue_depth=sum(depth.values()),
+            queue_depth_by_priority=depth,
+            wait_seconds_p50=pct(waits, 0.50),
+            wait_seconds_p95=pct(waits, 0.95),
+            run_seconds_p50=pct(runs, 0.50),
+            run_seconds_p95=pct(runs, 0.95),
+        )
+
+
+class ScheduledLLM:
+    """
+    Drop-in proxy for a llama_cpp.Llama whose completion calls go through an InferenceScheduler.
+    Non-completion attributes (tokenize, metadata, ...) are forwarded unchanged.
+    """
+
+    def __init__(self, scheduler: InferenceScheduler, llm, priority: int, session_id: str = "default"):
+        self.scheduler = scheduler
+        self.llm = llm
+        self.priority = priority
+        self.session_id = session_id
+
+    def for_session(self, session_id: str) -> "ScheduledLLM":
+        return ScheduledLLM(self.scheduler, self.llm, self.priority, session_id)
+
+    def with_priority(self, priority: int) -> "ScheduledLLM":
+        return ScheduledLLM(self.scheduler, self.llm, priority, self.session_id)
+
+    def _dispatch(self, fn: Callable, args: tuple, kwargs: dict):
+        if kwargs.get("stream"):
+            job = self.scheduler.submit(fn, args, kwargs, session_id=self.session_id,
+                                        priority=self.priority, stream=True)
+            return iter(job)
+        return self.scheduler.run(fn, args, kwargs, session_id=self.session_id, priority=self.priority)
+
+    def __call__(self, *args, **kwargs):
+        return self._dispatch(self.llm, args, kwargs)
+
+    def create_completion(self, *args, **kwargs):
+        return self._dispatch(self.llm.create_completion, args, kwargs)
+
+    def create_chat_completion(self, *args, **kwargs):
+        return self._dispatch(self.llm.create_chat_completion, args, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
@@ -0,0 +1,251 @@
+"""
+models/lexical_index.py
+
+In-memory BM25 inverted index kept alongside the Chroma collection.
+Dense embeddings blur rare proper nouns ("Brænēage", "BlueShot"); exact
+term matching catches them. Results are combined with dense hits through
+reciprocal-rank fusion (see reciprocal_rank_fusion).
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("GAIA.LexicalIndex")
+
+# Posting lists shorter than this are cheap to walk in full, however common the term
+MIN_COMMON_DF = 1000
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_CAMEL_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+# Letters NFKD does not decompose
+_LIGATURES = str.maketrans({"æ": "ae", "œ": "oe", "ø": "o", "ß": "ss", "ð": "d", "þ": "th", "ł": "l"})
+
+
+def _fold(token: str) -> str:
+    """Casefold and strip diacritics so "Brænēage" also matches "braeneage"."""
+    decomposed = unicodedata.normalize("NFKD", token.casefold().translate(_LIGATURES))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into folded word tokens; ASCII CamelCase words also yield their parts."""
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        tokens.append(_fold(word))
+        parts = _CAMEL_RE.findall(word) if word.isascii() else []
+        if len(parts) > 1:
+            tokens.extend(_fold(part) for part in parts)
+    return tokens
+
+
+def matches_where(metadata: Optional[dict], where: Optional[dict]) -> bool:
+    """Evaluate a Chroma-style `where` filter against one metadata dict."""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_where(metadata, sub) for sub in condition):
+                return False
+            continue
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, operand in condition.items():
+            if op == "$eq" and value != operand:
+                return False
+            if op == "$ne" and value == operand:
+                return False
+            if op == "$in" and value not in operand:
+                return False
+            if op == "$nin" and value in operand:
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if op == "$gt" and not value > operand:
+                    return False
+                if op == "$gte" and not value >= operand:
+                    return False
+                if op == "$lt" and not value < operand:
+                    return False
+                if op == "$lte" and not value <= operand:
+                    return False
+    return True
+
+
+def rrf_scores(rankings: Iterable[Sequence[str]], k: int = 60) -> Dict[str, float]:
+    """Fused scores for ranked ID lists: score(id) = sum(1 / (k + rank)) over the lists containing it."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[str]:
+    """
+    Fuse ranked ID lists with reciprocal-rank fusion (see rrf_scores).
+
+    Returns:
+        List[str]: IDs ordered by fused score, best first
+    """
+    scores = rrf_scores(rankings, k)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class LexicalIndex:
+    """
+    BM25 (Okapi) index over document IDs, supporting upsert and delete.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75, common_ratio: float = 0.1):
+        """
+        Args:
+            path: JSON file used by save()/load() (optional)
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+            common_ratio: Document frequency (fraction of documents) above which a term
+                only re-scores documents rarer query terms already matched
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.common_ratio = common_ratio
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.metadata: Dict[str, dict] = {}
+        self.total_len = 0
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], metadatas: Optional[Sequence[Optional[dict]]] = None):
+        """Index (or re-index) documents by ID."""
+        metadatas = metadatas or [None] * len(ids)
+        with self._lock:
+            self.remove([doc_id for doc_id in ids if doc_id in self.doc_len])
+            for doc_id, text, meta in zip(ids, texts, metadatas):
+                counts = Counter(tokenize(text))
+                for term, tf in counts.items():
+                    self.postings.setdefault(term, {})[doc_id] = tf
+                length = sum(counts.values())
+                self.doc_len[doc_id] = length
+                self.doc_terms[doc_id] = list(counts)
+                self.metadata[doc_id] = meta or {}
+                self.total_len += length
+            self._dirty = True
+
+    def remove(self, ids: Iterable[str]):
+        """Drop documents by ID; unknown IDs are ignored."""
+        with self._lock:
+            for doc_id in ids:
+                if doc_id not in self.doc_len:
+                    continue
+                for term in self.doc_terms.pop(doc_id):
+                    posting = self.postings.get(term)
+                    if posting is not None:
+                        posting.pop(doc_id, None)
+                        if not posting:
+                            del self.postings[term]
+                self.total_len -= self.doc_len.pop(doc_id)
+                self.metadata.pop(doc_id, None)
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self.postings.clear()
+            self.doc_len.clear()
+            self.doc_terms.clear()
+            self.metadata.clear()
+            self.total_len = 0
+            self._dirty = True
+
+    def search(self, query: str, k: int = 5, where: Optional[dict] = None) -> List[Tuple[str, float]]:
+        """
+        Return the top `k` (id, bm25_score) pairs for a query, optionally filtered by metadata.
+
+        Query terms are scored rarest first. Once rarer terms have matched some
+        documents, a common term (see `common_ratio`) is not walked: it only adds
+        to the scores of those candidates, so "the" never touches most of the
+        index. Documents failing `where` are skipped before they are scored.
+        """
+        with self._lock:
+            n_docs = len(self.doc_len)
+            if not n_docs:
+                return []
+            avg_len = self.total_len / n_docs or 1.0
+            common_df = max(self.common_ratio * n_docs, MIN_COMMON_DF)
+            postings = sorted(filter(None, (self.postings.get(term) for term in set(tokenize(query)))), key=len)
+            allowed: Dict[str, bool] = {}
+            scores: Dict[str, float] = {}
+            for posting in postings:
+                idf = math.log(1.0 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                if scores and len(posting) > common_df:
+                    matches = [(doc_id, posting[doc_id]) for doc_id in scores if doc_id in posting]
+                else:
+                    matches = posting.items()
+                for doc_id, tf in matches:
+                    if where:
+                        if doc_id not in allowed:
+                            allowed[doc_id] = matches_where(self.metadata.get(doc_id), where)
+                        if not allowed[doc_id]:
+                            continue
+                    norm = self.k1 * (1.0 - self.b + self.b * self.doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+            return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"documents": len(self.doc_len), "terms": len(self.postings)}
+
+    def save(self):
+        """Write the index to `path` (atomic replace) if it changed since the last save/load."""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            payload = {
+                "doc_len": self.doc_len,
+                "doc_terms": self.doc_terms,
+                "metadata": self.metadata,
+                "postings": self.postings,
+            }
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def load(self) -> bool:
+        """Load the index from `path`; returns False if there is nothing usable on disk."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load lexical index: {e}")
+            return False
+        with self._lock:
+            self.doc_len = payload["doc_len"]
+            self.doc_terms = payload["doc_terms"]
+            self.metadata = payload["metadata"]
+            self.postings = payload["postings"]
+            self.total_len = sum(self.doc_len.values())
+            self._dirty = False
+        return True
@@ -0,0 +1,252 @@
+"""
+models/model_pool.py
+
+Warm pool of llama.cpp models (Prime and Lite) with a RAM budget.
+Models are memory-mapped and loaded on demand; when loading one would exceed the
+budget, the least recently used idle model is unloaded first. Cheap tasks are
+routed to Lite, chat goes to Prime, and per-model latency histograms are kept.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("GAIA.ModelPool")
+
+# Task type -> preferred model
+TASK_ROUTES = {
+    "chat": "prime",
+    "correction": "prime",
+    "reflection": "lite",
+    "observer": "lite",
+    "intent": "lite",
+    "summarize": "lite",
+    "code_summary": "lite",
+}
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+# Rough allowance on top of the weights for the KV cache, scratch buffers, etc.
+OVERHEAD_FACTOR = 1.15
+
+
+def _default_loader(spec: dict):
+    from llama_cpp import Llama
+
+    return Llama(
+        model_path=spec["model_path"],
+        n_gpu_layers=spec.get("n_gpu_layers", 0),
+        n_ctx=spec.get("n_ctx", 512),
+        n_batch=spec.get("n_batch", 512),
+        n_threads=spec.get("n_threads"),
+        use_mmap=True,
+        use_mlock=spec.get("use_mlock", False),
+        verbose=False,
+    )
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.total,
+            "mean_seconds": round(self.sum / self.total, 3) if self.total else 0.0,
+            "buckets": {("+Inf" if b == float("inf") else str(b)): c for b, c in zip(LATENCY_BUCKETS, self.counts)},
+        }
+
+
+class ModelPool:
+    """
+    Loads and unloads GGUF models within a RAM budget.
+    `get(name)` returns a PooledModel handle that can be passed anywhere a Llama is expected.
+    """
+
+    def __init__(self, specs: Dict[str, dict], ram_budget_mb: int = 8192,
+                 loader: Optional[Callable[[dict], object]] = None):
+        """
+        Args:
+            specs: model name -> llama.cpp settings (must include model_path)
+            ram_budget_mb: Maximum estimated resident size of all loaded models
+            loader: Factory building a model from a spec (defaults to llama_cpp.Llama)
+        """
+        self.specs = {name: spec for name, spec in specs.items() if spec.get("model_path")}
+        self.ram_budget_mb = ram_budget_mb
+        self.loader = loader or _default_loader
+        self._loaded: "OrderedDict[str, object]" = OrderedDict()
+        self._in_use: Dict[str, int] = {}
+        self._latency: Dict[str, LatencyHistogram] = {name: LatencyHistogram() for name in self.specs}
+        self._loads = {name: 0 for name in self.specs}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls, config) -> "ModelPool":
+        common = {
+            "n_gpu_layers": config.n_gpu_layers,
+            "n_ctx": config.max_tokens,
+            "n_batch": getattr(config, "n_batch", 512),
+            "n_threads": config.n_threads,
+            "use_mlock": getattr(config, "use_mlock", False),
+        }
+        specs = {
+            "prime": dict(common, model_path=config.model_path),
+            "lite": dict(common, model_path=config.lite_model_path),
+        }
+        return cls(specs, ram_budget_mb=getattr(config, "model_ram_budget_mb", 8192))
+
+    def estimate_mb(self, name: str) -> float:
+        try:
+            size = os.path.getsize(self.specs[name]["model_path"])
+        except OSError:
+            size = 0
+        return size / (1024 * 1024) * OVERHEAD_FACTOR
+
+    def loaded_mb(self) -> float:
+        return sum(self.estimate_mb(name) for name in self._loaded)
+
+    def has(self, name: str) -> bool:
+        return name in self.specs
+
+    def route(self, task_type: str) -> str:
+        """Pick the model for a task type, falling back to Prime when Lite is unavailable."""
+        name = TASK_ROUTES.get(task_type, "prime")
+        if name not in self.specs:
+            name = "prime" if "prime" in self.specs else next(iter(self.specs), name)
+        return name
+
+    def _make_room(self, name: str):
+        needed = self.estimate_mb(name)
+        for victim in list(self._loaded):
+            if self.loaded_mb() + needed <= self.ram_budget_mb:
+                return
+            if victim != name and not self._in_use.get(victim):
+                self.unload(victim)
+        if self.loaded_mb() + needed > self.ram_budget_mb:
+            logger.warning(f"⚠️ Loading '{name}' exceeds RAM budget ({self.loaded_mb() + needed:.0f}/{self.ram_budget_mb} MB)")
+
+    def acquire(self, name: str):
+        """Return the loaded model, loading it (and evicting LRU idle models) if needed."""
+        with self._lock:
+            model = self._loaded.get(name)
+            if model is not None:
+                self._loaded.move_to_end(name)
+                return model
+            if name not in self.specs:
+                raise KeyError(f"Unknown model '{name}'")
+            self._make_room(name)
+            start = time.perf_counter()
+            model = self.loader(self.specs[name])
+            self._loaded[name] = model
+            self._loads[name] += 1
+            logger.info(f"🧠 Model '{name}' loaded in {time.perf_counter() - start:.2f}s (~{self.estimate_mb(name):.0f} MB)")
+            return model
+
+    def unload(self, name: str):
+        with self._lock:
+            model = self._loaded.pop(name, None)
+            if model is None:
+                return
+            close = getattr(model, "close", None)
+            if close:
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"⚠️ Error closing model '{name}': {e}")
+            logger.info(f"📤 Model '{name}' unloaded to stay within RAM budget")
+
+    def warm(self, *names: str):
+        """Preload models that fit in the budget (all configured models by default)."""
+        for name in names or tuple(self.specs):
+            if self.loaded_mb() + self.estimate_mb(name) <= self.ram_budget_mb or not self._loaded:
+                self.acquire(name)
+
+    def get(self, name: str, default=None):
+        """Dict-style accessor used by AgentCore's model_pool."""
+        return PooledModel(self, name) if name in self.specs else default
+
+    def _mark(self, name: str, delta: int):
+        with self._lock:
+            self._in_use[name] = self._in_use.get(name, 0) + delta
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self._latency[name].observe(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ram_budget_mb": self.ram_budget_mb,
+                "loaded_mb": round(self.loaded_mb(), 1),
+                "loaded": list(self._loaded),
+                "models": {
+                    name: {
+                        "loaded": name in self._loaded,
+                        "estimated_mb": round(self.estimate_mb(name), 1),
+                        "loads": self._loads[name],
+                        "latency": self._latency[name].as_dict(),
+                    }
+                    for name in self.specs
+                },
+            }
+
+    def close(self):
+        for name in list(self._loaded):
+            self.unload(name)
+
+
+class PooledModel:
+    """Llama-like handle that resolves its model from the pool on every call and records latency."""
+
+    def __init__(self, pool: ModelPool, name: str):
+        self.pool = pool
+        self.name = name
+
+    def _timed(self, method: str, args: tuple, kwargs: dict):
+        model = self.pool.acquire(self.name)
+        self.pool._mark(self.name, 1)
+        start = time.perf_counter()
+        try:
+            result = getattr(model, method)(*args, **kwargs) if method else model(*args, **kwargs)
+        except Exception:
+            self.pool._mark(self.name, -1)
+            raise
+        if kwargs.get("stream"):
+            return self._timed_stream(result, start)
+        self.pool._mark(self.name, -1)
+        self.pool.observe(self.name, time.perf_counter() - start)
+        return result
+
+    def _timed_stream(self, iterator, start: float):
+        try:
+            yield from iterator
+        finally:
+            self.pool._mark(self.name, -1)
+            self.pool.observe(self.name, time.perf_counter() - start)
+
+    def __call__(self, *args, **kwargs):
+        return self._timed(None, args, kwargs)
+
+    def create_completion(self, *args, **kwargs):
+        return self._timed("create_completion", args, kwargs)
+
+    def create_chat_completion(self, *args, **kwargs):
+        return self._timed("create_chat_completion", args, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.pool.acquire(self.name), name)
@@ -0,0 +1,119 @@
+"""
+models/prefix_cache.py
+
+Prompt-prefix state caching for llama.cpp.
+The identity preamble and persona instructions open every chat prompt. Once that
+prefix has been evaluated we snapshot the llama state; later prompts with the same
+prefix restore the snapshot so llama.cpp only evaluates the new suffix.
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple, Union
+
+logger = logging.getLogger("GAIA.PrefixCache")
+
+
+def build_persona_prefix(identity_intro: str, instructions: Union[str, Iterable[str], None]) -> str:
+    """Compose the stable prompt head shared by every turn for one persona."""
+    if instructions and not isinstance(instructions, str):
+        instructions = "\n".join(str(line) for line in instructions)
+    return "\n\n".join(part.strip() for part in (identity_intro or "", instructions or "") if part and part.strip())
+
+
+def prefix_key(persona: str, project: str, prefix_text: str) -> Tuple[str, str, str]:
+    return (persona or "unknown", project or "global", hashlib.sha256(prefix_text.encode("utf-8")).hexdigest()[:16])
+
+
+class PrefixCachedLLM:
+    """
+    Wraps a llama_cpp.Llama and restores a cached KV state before completions whose
+    prompt starts with the active prefix. Must be called from the thread that owns the
+    model (i.e. behind the InferenceScheduler).
+    """
+
+    def __init__(self, llm, max_states: int = 4):
+        self.llm = llm
+        self.max_states = max(1, max_states)
+        self._states: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (prefix_text, tokens, state)
+        self._active: Optional[tuple] = None
+        self._prefixes = {}  # key -> prefix_text
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "warm": 0, "misses": 0, "primes": 0, "prime_seconds": 0.0}
+
+    def register(self, key: tuple, prefix_text: str):
+        """Make `key` the active prefix. Evaluation is deferred until it is needed."""
+        with self._lock:
+            self._prefixes[key] = prefix_text
+            self._active = key
+
+    def activate(self, key: tuple, prefix_text: str):
+        """Register `key` and load (or build) its state right away, e.g. after a persona switch."""
+        self.register(key, prefix_text)
+        self._ensure(key, prefix_text)
+
+    def _prime(self, key: tuple, prefix_text: str) -> tuple:
+        start = time.perf_counter()
+        tokens = self.llm.tokenize(prefix_text.encode("utf-8"), add_bos=True)
+        self.llm.reset()
+        self.llm.eval(tokens)
+        state = self.llm.save_state()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._states[key] = (prefix_text, tokens, state)
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_states:
+                self._states.popitem(last=False)
+            self._counters["primes"] += 1
+            self._counters["prime_seconds"] += elapsed
+        logger.info(f"🧠 Prefix state cached for {key[0]}/{key[1]} ({len(tokens)} tokens, {elapsed:.2f}s)")
+        return self._states[key]
+
+    def _ensure(self, key: tuple, prefix_text: str):
+        with self._lock:
+            entry = self._states.get(key)
+            if entry:
+                self._states.move_to_end(key)
+        if entry is None:
+            self._counters["misses"] += 1
+            self._prime(key, prefix_text)
+            return
+
+        _, tokens, state = entry
+        current = list(self.llm.input_ids[: self.llm.n_tokens])
+        if current[: len(tokens)] == list(tokens):
+            self._counters["warm"] += 1  # KV cache already holds the prefix
+            return
+        self.llm.load_state(state)
+        self._counters["hits"] += 1
+
+    def _prepare(self, prompt):
+        if not isinstance(prompt, str):
+            return
+        with self._lock:
+            key = self._active
+            prefix_text = self._prefixes.get(key) if key else None
+        if prefix_text and prompt.startswith(prefix_text):
+            try:
+                self._ensure(key, prefix_text)
+            except Exception as e:
+                logger.warning(f"⚠️ Prefix state restore failed, evaluating full prompt: {e}")
+
+    def __call__(self, prompt, *args, **kwargs):
+        self._prepare(prompt)
+        return self.llm(prompt, *args, **kwargs)
+
+    def create_completion(self, prompt, *args, **kwargs):
+        self._prepare(prompt)
+        return self.llm.create_completion(prompt, *args, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters, cached_states=len(self._states),
+                        prime_seconds=round(self._counters["prime_seconds"], 3))
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
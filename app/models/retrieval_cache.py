@@ -0,0 +1,114 @@
+"""
+models/retrieval_cache.py
+
+Two-level cache for the chat retrieval path:
+  1. LRU of normalized query text -> query embedding
+  2. TTL cache of (query embedding, project, k, filter) -> result IDs
+
+The result level is tied to a collection generation counter; any write to the
+collection bumps the generation and drops every cached result.
+"""
+
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("GAIA.RetrievalCache")
+
+_TRAILING_PUNCT = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Casefold, collapse whitespace and drop trailing punctuation."""
+    return _TRAILING_PUNCT.sub("", " ".join(query.split()).casefold())
+
+
+class RetrievalCache:
+    """Query-embedding LRU plus a TTL cache of search results, with hit/miss counters."""
+
+    def __init__(self, max_queries: int = 512, max_results: int = 1024, ttl_seconds: float = 300.0):
+        """
+        Args:
+            max_queries: Maximum number of cached query embeddings
+            max_results: Maximum number of cached result lists
+            ttl_seconds: Lifetime of a cached result list
+        """
+        self.max_queries = max_queries
+        self.max_results = max_results
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._results: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._counters = {"query_hits": 0, "query_misses": 0, "result_hits": 0, "result_misses": 0}
+        self._lock = threading.Lock()
+
+    def get_vector(self, query: str) -> Optional[np.ndarray]:
+        key = normalize_query(query)
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is None:
+                self._counters["query_misses"] += 1
+                return None
+            self._vectors.move_to_end(key)
+            self._counters["query_hits"] += 1
+            return vector
+
+    def put_vector(self, query: str, vector: np.ndarray):
+        key = normalize_query(query)
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_queries:
+                self._vectors.popitem(last=False)
+
+    def _result_key(self, vector: np.ndarray, project: str, k: int, search_filter: Optional[dict]) -> tuple:
+        digest = hashlib.sha1(np.asarray(vector, dtype=np.float32).tobytes()).hexdigest()
+        filter_key = json.dumps(search_filter, sort_keys=True) if search_filter else ""
+        return (digest, project, k, filter_key)
+
+    def get_results(self, vector: np.ndarray, project: str, k: int,
+                    search_filter: Optional[dict] = None) -> Optional[List[str]]:
+        key = self._result_key(vector, project, k, search_filter)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None:
+                ids, generation, stored_at = entry
+                if generation == self.generation and time.monotonic() - stored_at < self.ttl_seconds:
+                    self._results.move_to_end(key)
+                    self._counters["result_hits"] += 1
+                    return list(ids)
+                del self._results[key]
+            self._counters["result_misses"] += 1
+            return None
+
+    def put_results(self, vector: np.ndarray, project: str, k: int,
+                    search_filter: Optional[dict], ids: List[str]):
+        key = self._result_key(vector, project, k, search_filter)
+        with self._lock:
+            self._results[key] = (tuple(ids), self.generation, time.monotonic())
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def invalidate(self):
+        """Drop all cached results after the collection changed."""
+        with self._lock:
+            self.generation += 1
+            self._results.clear()
+        logger.debug(f"♻️ Retrieval result cache invalidated (generation {self.generation})")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                self._counters,
+                cached_queries=len(self._vectors),
+                cached_results=len(self._results),
+                generation=self.generation,
+            )
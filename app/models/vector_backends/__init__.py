@@ -0,0 +1,46 @@
+"""
+Pluggable vector storage for VectorStoreManager.
+
+Select the backend with "vector_backend" in gaia_constants.json:
+"chroma" (default) or "numpy" (memory-mapped, no SQLite). The numpy backend
+can store quantised vectors via "vector_dtype": "float16" or "int8".
+"""
+
+from .base import VectorBackend
+
+BACKENDS = ("chroma", "numpy")
+
+
+def create_backend(name: str, path: str, embeddings=None, config=None) -> VectorBackend:
+    """
+    Build the named backend for one project directory.
+
+    Raises:
+        ValueError: for unknown backend names
+    """
+    if name == "chroma":
+        from .chroma_backend import ChromaBackend
+
+        return ChromaBackend(path, embeddings=embeddings)
+    if name == "numpy":
+        options = dict(
+            index=getattr(config, "vector_index", "ivf"),
+            nlist=getattr(config, "ivf_nlist", None),
+            nprobe=getattr(config, "ivf_nprobe", 8),
+            ivf_min_rows=getattr(config, "ivf_min_rows", 4096),
+        )
+        dtype = getattr(config, "vector_dtype", "float32")
+        if dtype != "float32":
+            from .quantized_backend import QuantizedNumpyBackend
+
+            return QuantizedNumpyBackend(
+                path,
+                dtype=dtype,
+                rerank=getattr(config, "vector_keep_float32", True),
+                rerank_factor=getattr(config, "vector_rerank_factor", 4),
+                **options,
+            )
+        from .numpy_backend import NumpyBackend
+
+        return NumpyBackend(path, **options)
+    raise ValueError(f"Unknown vector backend: {name} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,55 @@
+"""
+models/vector_backends/base.py
+
+Interface every vector backend implements for VectorStoreManager.
+Results use Chroma's column layout ({"ids": [...], "documents": [...],
+"metadatas": [...]}) so the manager does not care which backend is active.
+"""
+
+from typing import List, Optional, Sequence
+
+
+class VectorBackend:
+    """
+    Storage for (id, vector, document text, metadata) rows of one project.
+    """
+
+    name = "base"
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+               documents: Sequence[str], metadatas: Sequence[Optional[dict]]):
+        """Insert or replace rows by ID."""
+        raise NotImplementedError
+
+    def query(self, embedding: Sequence[float], n_results: int, where: Optional[dict] = None) -> dict:
+        """
+        Nearest neighbours of one query vector.
+
+        Returns:
+            dict: {"ids", "documents", "metadatas"} lists, best match first
+        """
+        raise NotImplementedError
+
+    def get(self, ids: Optional[List[str]] = None, limit: Optional[int] = None, offset: int = 0) -> dict:
+        """Rows by ID, or a page of all rows when `ids` is None."""
+        raise NotImplementedError
+
+    def delete(self, ids: Optional[List[str]] = None):
+        """Delete rows by ID, or every row when `ids` is None."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def persist(self):
+        """Flush pending writes to disk."""
+
+    def wait_for_index(self, timeout: Optional[float] = None) -> bool:
+        """Block until background index maintenance finishes; False if it is still running."""
+        return True
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "count": self.count()}
+
+    def close(self):
+        self.persist()
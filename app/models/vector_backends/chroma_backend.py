@@ -0,0 +1,56 @@
+"""
+models/vector_backends/chroma_backend.py
+
+VectorBackend over a persistent Chroma collection (the original storage).
+"""
+
+from typing import List, Optional, Sequence
+
+from langchain_community.vectorstores import Chroma
+
+from app.models.vector_backends.base import VectorBackend
+
+
+class ChromaBackend(VectorBackend):
+    """Wraps the "gaia-documents" Chroma collection in `path`."""
+
+    name = "chroma"
+
+    def __init__(self, path: str, embeddings=None, collection_name: str = "gaia-documents"):
+        self.store = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=path
+        )
+        self.collection = self.store._collection
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+               documents: Sequence[str], metadatas: Sequence[Optional[dict]]):
+        self.collection.upsert(ids=list(ids), embeddings=embeddings, documents=list(documents),
+                               metadatas=[meta or None for meta in metadatas])
+
+    def query(self, embedding: Sequence[float], n_results: int, where: Optional[dict] = None) -> dict:
+        result = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            where=where or None,
+            include=["documents", "metadatas"],
+        )
+        return {"ids": result["ids"][0], "documents": result["documents"][0], "metadatas": result["metadatas"][0]}
+
+    def get(self, ids: Optional[List[str]] = None, limit: Optional[int] = None, offset: int = 0) -> dict:
+        if ids is not None:
+            return self.collection.get(ids=ids, include=["documents", "metadatas"])
+        return self.collection.get(include=["documents", "metadatas"], limit=limit, offset=offset)
+
+    def delete(self, ids: Optional[List[str]] = None):
+        self.store.delete(ids=ids)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def persist(self):
+        # Chroma >= 0.4 persists automatically and deprecates persist()
+        persist = getattr(self.store, "persist", None)
+        if persist:
+            persist()
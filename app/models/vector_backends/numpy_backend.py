@@ -0,0 +1,614 @@
+"""
+models/vector_backends/numpy_backend.py
+
+Lightweight in-process vector backend with no SQLite/Chroma dependency:
+
+- vectors: float32 matrix in a memory-mapped file (vectors.f32), unit-normalized
+  so inner product = cosine similarity (see quantized_backend.py for float16/int8)
+- metadata: columnar, dictionary-encoded sidecar (metadata.<gen>.json); `where`
+  filters are evaluated column-wise into a row mask before scoring
+- index: exact scan, or an IVF (k-means inverted file) index that limits the
+  scan to the `nprobe` closest clusters once the store is large enough; it is
+  trained on a background thread so queries never wait for k-means
+- persistence: rows.json names the current snapshot generation; rows changed
+  since that snapshot are appended to journal.<gen>.jsonl, and a new full
+  snapshot is only written once the journal outgrows the store
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from app.models.vector_backends.base import VectorBackend
+
+logger = logging.getLogger("GAIA.NumpyBackend")
+
+MIN_CAPACITY = 1024
+# Vector files of every storage mode; those the committed mode does not use are removed
+STORAGE_FILES = ("vectors.f32", "vectors.f16", "vectors.i8", "scales.f32")
+
+
+def _atomic_json(path: str, payload):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class IVFIndex:
+    """Inverted-file index: spherical k-means centroids plus a cluster id per row (-1 = unassigned)."""
+
+    def __init__(self, nlist: int, nprobe: int):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.assign = np.empty(0, dtype=np.int32)
+        self.trained_rows = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray, rows: np.ndarray, iterations: int = 10, seed: int = 0):
+        """Fit centroids on a sample of `rows` and assign every row."""
+        rng = np.random.default_rng(seed)
+        nlist = min(self.nlist, len(rows))
+        sample = rows if len(rows) <= nlist * 64 else rng.choice(rows, nlist * 64, replace=False)
+        data = np.asarray(vectors[np.sort(sample)], dtype=np.float32)
+        centroids = data[rng.choice(len(data), nlist, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = data[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        self.centroids = centroids.astype(np.float32)
+        self.assign = np.full(len(vectors), -1, dtype=np.int32)
+        self.add(vectors, rows)
+        self.trained_rows = len(rows)
+
+    def add(self, vectors: np.ndarray, rows: np.ndarray, block: int = 65536):
+        if not self.trained or not len(rows):
+            return
+        if len(self.assign) < len(vectors):
+            self.assign = np.concatenate([self.assign, np.full(len(vectors) - len(self.assign), -1, dtype=np.int32)])
+        rows = np.sort(rows)
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            self.assign[chunk] = np.argmax(np.asarray(vectors[chunk], dtype=np.float32) @ self.centroids.T, axis=1)
+
+    def remove(self, rows: Sequence[int]):
+        if self.trained:
+            rows = [row for row in rows if row < len(self.assign)]
+            self.assign[rows] = -1
+
+    def probe(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Rows in the `nprobe` clusters closest to the query."""
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(self.assign, closest))
+
+    def save(self, path: str, suffix: str = ""):
+        if self.trained:
+            np.save(os.path.join(path, f"ivf_centroids{suffix}.npy"), self.centroids)
+            np.save(os.path.join(path, f"ivf_assign{suffix}.npy"), self.assign)
+
+    def load(self, path: str, suffix: str = "") -> bool:
+        centroids_path = os.path.join(path, f"ivf_centroids{suffix}.npy")
+        assign_path = os.path.join(path, f"ivf_assign{suffix}.npy")
+        if not (os.path.exists(centroids_path) and os.path.exists(assign_path)):
+            return False
+        self.centroids = np.load(centroids_path)
+        self.assign = np.load(assign_path)
+        self.trained_rows = int(np.count_nonzero(self.assign >= 0))
+        return True
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Memory-mapped float32 vector store with columnar metadata and optional IVF index.
+    """
+
+    name = "numpy"
+
+    def __init__(self, path: str, index: str = "ivf", nlist: Optional[int] = None,
+                 nprobe: int = 8, ivf_min_rows: int = 4096):
+        """
+        Args:
+            path: Directory for vectors.f32 and the sidecar files
+            index: "ivf" or "flat" (exact scan)
+            nlist: IVF clusters (defaults to ~sqrt(rows))
+            nprobe: IVF clusters scanned per query
+            ivf_min_rows: Below this many rows the exact scan is used
+        """
+        self.path = path
+        self.index_type = index
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+        self.dim: Optional[int] = None
+        self.capacity = 0
+        self.vectors: Optional[np.memmap] = None
+        self.ids: List[Optional[str]] = []
+        self.documents: List[Optional[str]] = []
+        self.columns: Dict[str, List] = {}
+        self.rows: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.ivf: Optional[IVFIndex] = None
+        self.generation: Optional[int] = None
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._changed: Set[int] = set()
+        self._released: List[int] = []
+        self._journal_rows = 0
+        self._snapshot_due = False
+        self._trainer: Optional[threading.Thread] = None
+        self._retrain_rows: Optional[Set[int]] = None
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # ---- storage (overridden by QuantizedNumpyBackend) -------------------
+
+    storage_name = "float32"
+    keeps_float32 = True
+    storage_files = ("vectors.f32",)
+
+    def _memmap(self, filename: str, dtype, columns: Optional[int] = None) -> np.memmap:
+        """Open a memmap of `capacity` rows, creating or growing the file as needed."""
+        path = os.path.join(self.path, filename)
+        shape = (self.capacity, columns) if columns else (self.capacity,)
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, "ab") as f:
+            if f.tell() < nbytes:
+                f.truncate(nbytes)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _open_storage(self):
+        self.vectors = self._memmap("vectors.f32", np.float32, self.dim)
+
+    def _flush_storage(self):
+        if self.vectors is not None:
+            self.vectors.flush()
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self.capacity:
+            return
+        self._flush_storage()
+        self.capacity = max(MIN_CAPACITY, self.capacity * 2, rows)
+        self._open_storage()
+        self._snapshot_due = True
+
+    def _dense(self):
+        """Row-indexable float32 vectors used to train and fill the IVF index."""
+        return self.vectors
+
+    def _store_rows(self, rows: np.ndarray, matrix: np.ndarray):
+        """Write unit-normalized vectors into `rows`."""
+        self.vectors[rows] = _normalize(matrix)
+
+    def _scores(self, rows: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """Cosine scores for `rows` (all used rows when None)."""
+        if rows is None:
+            return np.asarray(self.vectors[:len(self.ids)]) @ query
+        return np.asarray(self.vectors[rows]) @ query
+
+    def _shortlist(self, n_results: int) -> int:
+        """How many first-pass candidates to keep before _rerank."""
+        return n_results
+
+    def _rerank(self, rows: np.ndarray, query: np.ndarray, n_results: int) -> np.ndarray:
+        """Final ordering of shortlisted rows (already sorted by first-pass score)."""
+        return rows[:n_results]
+
+    def _convert_storage(self, stored: str, had_float32: bool):
+        """Adopt rows written under another storage mode; vectors.f32 is already in place."""
+        logger.info(f"🗜️ Switched {len(self.rows)} vectors from {stored} to {self.storage_name}")
+
+    def _cleanup_storage(self):
+        """Remove vector files the storage mode committed in rows.json no longer uses."""
+        for name in STORAGE_FILES:
+            path = os.path.join(self.path, name)
+            if name not in self.storage_files and os.path.exists(path):
+                os.remove(path)
+                logger.info(f"🗑️ Removed unused {name} from {self.path}")
+
+    # ---- persistence ---------------------------------------------------
+
+    def _sidecar(self, stem: str, ext: str, generation: Optional[int]) -> str:
+        """Path of a snapshot file; generation None is the unversioned layout of older stores."""
+        suffix = "" if generation is None else f".{generation}"
+        return os.path.join(self.path, f"{stem}{suffix}.{ext}")
+
+    def _load(self):
+        meta_path = os.path.join(self.path, "rows.json")
+        if not os.path.exists(meta_path):
+            return
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            generation = meta.get("generation")
+            with open(self._sidecar("documents", "json", generation), "r", encoding="utf-8") as f:
+                self.documents = json.load(f)
+            with open(self._sidecar("metadata", "json", generation), "r", encoding="utf-8") as f:
+                encoded = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load numpy vector store at {self.path}: {e}")
+            return
+        self.generation = generation
+        # Older stores have no generation to journal against; rewrite them on load
+        self._snapshot_due = generation is None
+        self.dim = meta["dim"]
+        self.capacity = meta["capacity"]
+        self.ids = meta["ids"]
+        self.columns = {
+            key: [column["values"][code] if code >= 0 else None for code in column["codes"]]
+            for key, column in encoded.items()
+        }
+        touched = self._replay_journal()
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids) if doc_id is not None}
+        self.free = [row for row, doc_id in enumerate(self.ids) if doc_id is None]
+        if self.index_type == "ivf":
+            ivf = IVFIndex(self.nlist or 1, self.nprobe)
+            if ivf.load(self.path, "" if generation is None else f".{generation}"):
+                ivf.nlist = len(ivf.centroids)
+                self.ivf = ivf
+        if self.dim:
+            self._open_storage()
+            stored = meta.get("storage", "float32")
+            had_float32 = meta.get("float32", True)
+            if stored != self.storage_name and not had_float32:
+                raise ValueError(
+                    f"Vector store at {self.path} holds {stored} vectors without float32 copies; "
+                    f"re-embed the documents to switch to {self.storage_name}"
+                )
+            if stored != self.storage_name or had_float32 != self.keeps_float32:
+                self._convert_storage(stored, had_float32)
+                self._snapshot_due = True
+            if self.ivf and touched:
+                self._reindex(self.ivf, touched)
+            if self._snapshot_due:
+                self._write_snapshot()
+            # Files of the previous storage mode go only once rows.json no longer refers to them
+            self._cleanup_storage()
+        self._maybe_train()
+        logger.info(f"📦 Numpy vector store loaded: {len(self.rows)} vectors from {self.path}")
+
+    def _replay_journal(self) -> List[int]:
+        """Apply the rows appended since the snapshot and return the rows they touched."""
+        if self.generation is None:
+            return []
+        path = self._sidecar("journal", "jsonl", self.generation)
+        touched: List[int] = []
+        if not os.path.exists(path):
+            return touched
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A write cut short by a crash; anything appended after it would be lost on replay
+                    logger.warning(f"⚠️ Ignoring a truncated record at the end of {path}")
+                    self._snapshot_due = True
+                    break
+                self._set_row(record["row"], record["id"], record["document"], record["metadata"])
+                touched.append(record["row"])
+        self._journal_rows = len(touched)
+        return touched
+
+    def persist(self):
+        """
+        Make every change durable: append the changed rows to the journal, or
+        write a new full snapshot when the layout changed or the journal has
+        grown larger than the store.
+        """
+        with self._lock:
+            self._flush_storage()
+            if self._snapshot_due or self._journal_rows + len(self._changed) > max(MIN_CAPACITY, len(self.rows)):
+                self._write_snapshot()
+            elif self._changed:
+                self._append_journal()
+            # Deleted rows are only reused once their deletion is on disk
+            self.free.extend(self._released)
+            self._released = []
+
+    def _append_journal(self):
+        path = self._sidecar("journal", "jsonl", self.generation)
+        with open(path, "a", encoding="utf-8") as f:
+            for row in sorted(self._changed):
+                f.write(json.dumps({"row": row, "id": self.ids[row], "document": self.documents[row],
+                                    "metadata": self._row_metadata(row)}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_rows += len(self._changed)
+        self._changed.clear()
+
+    def _write_snapshot(self):
+        """Write all sidecars as the next generation; replacing rows.json commits it."""
+        self._flush_storage()
+        previous = self.generation
+        generation = (previous or 0) + 1
+        encoded = {}
+        for key, values in self.columns.items():
+            lookup: Dict = {}
+            codes = []
+            for value in values:
+                if value is None:
+                    codes.append(-1)
+                    continue
+                marker = json.dumps(value)
+                if marker not in lookup:
+                    lookup[marker] = (len(lookup), value)
+                codes.append(lookup[marker][0])
+            encoded[key] = {"values": [value for _, value in lookup.values()], "codes": codes}
+        _atomic_json(self._sidecar("documents", "json", generation), self.documents)
+        _atomic_json(self._sidecar("metadata", "json", generation), encoded)
+        if self.ivf:
+            self.ivf.save(self.path, f".{generation}")
+        _atomic_json(os.path.join(self.path, "rows.json"), {
+            "dim": self.dim, "capacity": self.capacity, "ids": self.ids, "generation": generation,
+            "storage": self.storage_name, "float32": self.keeps_float32,
+        })
+        self.generation = generation
+        for stem, ext in (("documents", "json"), ("metadata", "json"), ("journal", "jsonl"),
+                          ("ivf_centroids", "npy"), ("ivf_assign", "npy")):
+            stale = self._sidecar(stem, ext, previous)
+            if os.path.exists(stale):
+                os.remove(stale)
+        self._cleanup_storage()
+        self._changed.clear()
+        self._journal_rows = 0
+        self._snapshot_due = False
+        logger.debug(f"💾 Numpy vector store snapshot {generation} written: {len(self.rows)} vectors")
+
+    # ---- writes --------------------------------------------------------
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+               documents: Sequence[str], metadatas: Sequence[Optional[dict]]):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if not len(ids):
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match store dimension {self.dim}")
+
+            rows = []
+            for doc_id in ids:
+                row = self.rows.get(doc_id)
+                if row is None:
+                    row = self.free.pop() if self.free else len(self.ids)
+                    self._set_row(row, doc_id, None, None)
+                    self.rows[doc_id] = row
+                rows.append(row)
+            self._ensure_capacity(len(self.ids))
+
+            for doc_id, row, text, meta in zip(ids, rows, documents, metadatas):
+                self._set_row(row, doc_id, text, meta)
+
+            row_array = np.asarray(rows, dtype=np.int64)
+            self._store_rows(row_array, matrix)
+            if self.ivf:
+                self.ivf.add(self._dense(), row_array)
+            self._touch(rows)
+            self._maybe_train()
+
+    def delete(self, ids: Optional[List[str]] = None):
+        with self._lock:
+            if ids is None:
+                ids = list(self.rows)
+            rows = [self.rows.pop(doc_id) for doc_id in ids if doc_id in self.rows]
+            for row in rows:
+                self._set_row(row, None, None, None)
+            self._released.extend(rows)
+            if self.ivf:
+                self.ivf.remove(rows)
+            self._touch(rows)
+
+    def _set_row(self, row: int, doc_id: Optional[str], text: Optional[str], meta: Optional[dict]):
+        while len(self.ids) <= row:
+            self.ids.append(None)
+            self.documents.append(None)
+            for column in self.columns.values():
+                column.append(None)
+        self.ids[row] = doc_id
+        self.documents[row] = text
+        meta = meta or {}
+        for key in meta:
+            if key not in self.columns:
+                self.columns[key] = [None] * len(self.ids)
+        for key, column in self.columns.items():
+            column[row] = meta.get(key)
+
+    def _touch(self, rows: Sequence[int]):
+        """Mark rows for the next persist (and for re-assignment if an index is being trained)."""
+        self._changed.update(rows)
+        if self._retrain_rows is not None:
+            self._retrain_rows.update(rows)
+        self._arrays.clear()
+
+    # ---- reads ---------------------------------------------------------
+
+    def count(self) -> int:
+        return len(self.rows)
+
+    def _column(self, key: str) -> np.ndarray:
+        array = self._arrays.get(key)
+        if array is None:
+            values = self.columns.get(key)
+            array = np.empty(len(self.ids), dtype=object)
+            if values is not None:
+                array[:] = values
+            self._arrays[key] = array
+        return array
+
+    def _alive(self) -> np.ndarray:
+        array = self._arrays.get("\0alive")
+        if array is None:
+            array = np.fromiter((doc_id is not None for doc_id in self.ids), dtype=bool, count=len(self.ids))
+            self._arrays["\0alive"] = array
+        return array
+
+    def _mask(self, where: Optional[dict]) -> np.ndarray:
+        """Row mask for a Chroma-style `where` filter, evaluated column by column."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, condition in (where or {}).items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self._mask(sub)
+                continue
+            if key == "$or":
+                any_mask = np.zeros(len(self.ids), dtype=bool)
+                for sub in condition:
+                    any_mask |= self._mask(sub)
+                mask &= any_mask
+                continue
+            column = self._column(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, operand in condition.items():
+                if op == "$eq":
+                    mask &= column == operand
+                elif op == "$ne":
+                    mask &= column != operand
+                elif op in ("$in", "$nin"):
+                    members = set(operand)
+                    hit = np.fromiter((value in members for value in column), dtype=bool, count=len(column))
+                    mask &= hit if op == "$in" else ~hit
+                elif op in ("$gt", "$gte", "$lt", "$lte"):
+                    compare = {
+                        "$gt": lambda v: v > operand, "$gte": lambda v: v >= operand,
+                        "$lt": lambda v: v < operand, "$lte": lambda v: v <= operand,
+                    }[op]
+                    mask &= np.fromiter((value is not None and compare(value) for value in column),
+                                        dtype=bool, count=len(column))
+                else:
+                    raise ValueError(f"Unsupported where operator: {op}")
+        return mask
+
+    def _maybe_train(self):
+        """Start training an IVF index in the background once the store outgrows the current one."""
+        if self.index_type != "ivf" or self._trainer is not None or len(self.rows) < self.ivf_min_rows:
+            return
+        if self.ivf and len(self.rows) <= 2 * self.ivf.trained_rows:
+            return
+        rows = np.asarray(sorted(self.rows.values()), dtype=np.int64)
+        self._retrain_rows = set()
+        self._trainer = threading.Thread(target=self._train_ivf, args=(rows,), name="gaia-ivf-train", daemon=True)
+        self._trainer.start()
+
+    def _train_ivf(self, rows: np.ndarray):
+        """Fit centroids without holding the lock, then swap the index in and re-assign rows written meanwhile."""
+        nlist = self.nlist or int(min(4096, max(16, np.sqrt(len(rows)))))
+        ivf = IVFIndex(nlist, self.nprobe)
+        try:
+            ivf.train(self._dense(), rows)
+        except Exception as e:
+            logger.error(f"❌ IVF training failed for {self.path}: {e}", exc_info=True)
+            ivf = None
+        with self._lock:
+            touched, self._retrain_rows = self._retrain_rows, None
+            self._trainer = None
+            if ivf is None:
+                return
+            if touched:
+                self._reindex(ivf, touched)
+            self.ivf = ivf
+            # The new centroids and assignments are saved with the next snapshot
+            self._snapshot_due = True
+        logger.info(f"🧭 IVF index trained: {ivf.nlist} lists over {ivf.trained_rows} vectors")
+
+    def _reindex(self, ivf: IVFIndex, rows: Sequence[int]):
+        """Re-assign rows to the IVF lists after they were written or deleted."""
+        rows = np.asarray(sorted(set(rows)), dtype=np.int64)
+        alive = np.fromiter((self.ids[row] is not None for row in rows), dtype=bool, count=len(rows))
+        ivf.remove(rows[~alive].tolist())
+        ivf.add(self._dense(), rows[alive])
+
+    def wait_for_index(self, timeout: Optional[float] = None) -> bool:
+        trainer = self._trainer
+        if trainer is not None:
+            trainer.join(timeout)
+        return self._trainer is None
+
+    def _row_metadata(self, row: int) -> dict:
+        return {key: column[row] for key, column in self.columns.items() if column[row] is not None}
+
+    def _rows_payload(self, rows: Sequence[int]) -> dict:
+        return {
+            "ids": [self.ids[row] for row in rows],
+            "documents": [self.documents[row] for row in rows],
+            "metadatas": [self._row_metadata(row) for row in rows],
+        }
+
+    def _candidate_rows(self, query: np.ndarray, n_results: int, mask: np.ndarray) -> Optional[np.ndarray]:
+        """Rows to score, or None for a full scan."""
+        if self.ivf and self.ivf.trained:
+            rows = self.ivf.probe(query)
+            rows = rows[mask[rows]]
+            if len(rows) >= n_results:
+                return rows
+        return None
+
+    def query(self, embedding: Sequence[float], n_results: int, where: Optional[dict] = None) -> dict:
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            if not self.rows:
+                return {"ids": [], "documents": [], "metadatas": []}
+            mask = self._alive() & self._mask(where)
+            shortlist = self._shortlist(n_results)
+            rows = self._candidate_rows(query, shortlist, mask)
+            if rows is None:
+                rows = np.flatnonzero(mask)
+                # Scoring the whole contiguous matrix avoids gathering most of it into a copy
+                scores = self._scores(None, query)[rows] if len(rows) > len(self.ids) // 4 else self._scores(rows, query)
+            else:
+                scores = self._scores(rows, query)
+            if not len(rows):
+                return {"ids": [], "documents": [], "metadatas": []}
+            n = min(shortlist, len(rows))
+            top = np.argpartition(-scores, n - 1)[:n]
+            top = top[np.argsort(-scores[top])]
+            return self._rows_payload(self._rerank(rows[top], query, n_results).tolist())
+
+    def get(self, ids: Optional[List[str]] = None, limit: Optional[int] = None, offset: int = 0) -> dict:
+        with self._lock:
+            if ids is not None:
+                rows = [self.rows[doc_id] for doc_id in ids if doc_id in self.rows]
+            else:
+                rows = sorted(self.rows.values())
+                rows = rows[offset:offset + limit] if limit is not None else rows[offset:]
+            return self._rows_payload(rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "count": len(self.rows),
+                "dim": self.dim,
+                "dtype": self.storage_name,
+                "capacity": self.capacity,
+                "vector_bytes": sum(
+                    os.path.getsize(os.path.join(self.path, name))
+                    for name in self.storage_files if os.path.exists(os.path.join(self.path, name))
+                ),
+                "index": self.index_type,
+                "ivf_lists": self.ivf.nlist if self.ivf else 0,
+                "ivf_training": self._trainer is not None,
+                "journal_rows": self._journal_rows,
+            }
+
+    def close(self):
+        self.wait_for_index()
+        self.persist()
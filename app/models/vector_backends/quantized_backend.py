@@ -0,0 +1,161 @@
+"""
+models/vector_backends/quantized_backend.py
+
+Quantised variant of the NumPy backend. Vectors are stored as float16 or int8
+(with a per-vector float32 scale) and the first-pass similarity scan runs on
+the compressed codes. Optionally the top `rerank_factor * k` candidates are
+re-scored against a float32 copy kept on disk; only those rows are paged in,
+so resident memory stays at the compressed size.
+"""
+
+import os
+import logging
+from typing import Optional
+
+import numpy as np
+
+from app.models.vector_backends.numpy_backend import NumpyBackend, _normalize
+
+logger = logging.getLogger("GAIA.QuantizedBackend")
+
+QUANTIZED_DTYPES = {"float16": (np.float16, "vectors.f16"), "int8": (np.int8, "vectors.i8")}
+# Rows decoded per step of a full scan; small blocks keep the float32 buffer in cache
+SCAN_BLOCK = 2048
+
+
+class _DequantizedView:
+    """Row-indexable float32 view over quantised codes (used to train the IVF index)."""
+
+    def __init__(self, backend: "QuantizedNumpyBackend"):
+        self.backend = backend
+
+    def __len__(self):
+        return self.backend.capacity
+
+    def __getitem__(self, rows):
+        return self.backend._decode(rows)
+
+
+class QuantizedNumpyBackend(NumpyBackend):
+    """
+    NumpyBackend storing float16 or int8 codes, with optional float32 re-ranking.
+    """
+
+    def __init__(self, path: str, dtype: str = "int8", rerank: bool = True, rerank_factor: int = 4, **kwargs):
+        """
+        Args:
+            path: Store directory
+            dtype: "float16" or "int8"
+            rerank: Keep float32 copies on disk and re-score the shortlist with them
+            rerank_factor: Shortlist size as a multiple of the requested results
+            **kwargs: NumpyBackend index options
+        """
+        if dtype not in QUANTIZED_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype} (expected one of {', '.join(QUANTIZED_DTYPES)})")
+        self.storage_name = dtype
+        self.keeps_float32 = rerank
+        self.rerank_factor = max(1, rerank_factor)
+        self.code_dtype, self.code_file = QUANTIZED_DTYPES[dtype]
+        self.codes: Optional[np.memmap] = None
+        self.scales: Optional[np.memmap] = None
+        super().__init__(path, **kwargs)
+
+    @property
+    def storage_files(self):
+        files = [self.code_file]
+        if self.storage_name == "int8":
+            files.append("scales.f32")
+        if self.keeps_float32:
+            files.append("vectors.f32")
+        return tuple(files)
+
+    def _open_storage(self):
+        self.codes = self._memmap(self.code_file, self.code_dtype, self.dim)
+        if self.storage_name == "int8":
+            self.scales = self._memmap("scales.f32", np.float32)
+        if self.keeps_float32:
+            self.vectors = self._memmap("vectors.f32", np.float32, self.dim)
+
+    def _flush_storage(self):
+        for array in (self.codes, self.scales, self.vectors):
+            if array is not None:
+                array.flush()
+
+    def _encode(self, unit: np.ndarray):
+        if self.storage_name == "float16":
+            return unit.astype(np.float16), None
+        scales = np.abs(unit).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(unit / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def _decode(self, rows) -> np.ndarray:
+        codes = np.asarray(self.codes[rows], dtype=np.float32)
+        if self.scales is not None:
+            codes *= np.asarray(self.scales[rows])[..., None]
+        return codes
+
+    def _dense(self):
+        return self.vectors if self.keeps_float32 else _DequantizedView(self)
+
+    def _store_rows(self, rows: np.ndarray, matrix: np.ndarray):
+        unit = _normalize(matrix)
+        codes, scales = self._encode(unit)
+        self.codes[rows] = codes
+        if scales is not None:
+            self.scales[rows] = scales
+        if self.keeps_float32:
+            self.vectors[rows] = unit
+
+    def _scores(self, rows: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """Approximate cosine scores computed on the codes, one block at a time."""
+        if rows is None:
+            n_rows = len(self.ids)
+            scores = np.empty(n_rows, dtype=np.float32)
+            buffer = np.empty((SCAN_BLOCK, self.dim), dtype=np.float32)
+            for start in range(0, n_rows, SCAN_BLOCK):
+                stop = min(n_rows, start + SCAN_BLOCK)
+                decoded = buffer[:stop - start]
+                np.copyto(decoded, self.codes[start:stop])
+                block = decoded @ query
+                if self.scales is not None:
+                    block *= self.scales[start:stop]
+                scores[start:stop] = block
+            return scores
+        return self._decode(rows) @ query
+
+    def _shortlist(self, n_results: int) -> int:
+        return n_results * self.rerank_factor if self.keeps_float32 else n_results
+
+    def _rerank(self, rows: np.ndarray, query: np.ndarray, n_results: int) -> np.ndarray:
+        if not self.keeps_float32:
+            return rows[:n_results]
+        exact = np.asarray(self.vectors[rows]) @ query
+        return rows[np.argsort(-exact)[:n_results]]
+
+    def _convert_storage(self, stored: str, had_float32: bool):
+        """
+        Re-encode every row from the float32 copy written by the previous storage
+        mode, or rebuild missing float32 copies from the codes when re-ranking was
+        just enabled. vectors.f32 is left in place; _cleanup_storage removes it once
+        the new mode is committed to rows.json.
+        """
+        used = len(self.ids)
+        if stored != self.storage_name:
+            source = np.memmap(os.path.join(self.path, "vectors.f32"), dtype=np.float32, mode="r",
+                               shape=(self.capacity, self.dim))
+            for start in range(0, used, SCAN_BLOCK):
+                stop = min(used, start + SCAN_BLOCK)
+                codes, scales = self._encode(np.asarray(source[start:stop]))
+                self.codes[start:stop] = codes
+                if scales is not None:
+                    self.scales[start:stop] = scales
+            del source
+            logger.info(f"🗜️ Converted {len(self.rows)} vectors from {stored} to {self.storage_name}")
+        elif self.keeps_float32 and not had_float32:
+            for start in range(0, used, SCAN_BLOCK):
+                stop = min(used, start + SCAN_BLOCK)
+                self.vectors[start:stop] = _normalize(self._decode(slice(start, stop)))
+            logger.warning(f"⚠️ Re-ranking enabled for {self.path}: float32 copies rebuilt from {stored} codes; "
+                           f"re-embed the documents for exact re-ranking")
+        self._flush_storage()
@@ -1,78 +1,575 @@
 import os
+import time
+import uuid
 import logging
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
-from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import numpy as np
 from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
 
 from app.utils.knowledge_index import KnowledgeIndex
+from app.models.embedding_engine import EmbeddingEngine
+from app.models.retrieval_cache import RetrievalCache
+from app.models.vector_backends import VectorBackend, create_backend
+from app.models.lexical_index import LexicalIndex, rrf_scores
+from app.models.bulk_ingest import IngestCheckpoint, document_id, iter_batches, skip_committed
+from app.models.embedding_manifest import EmbeddingManifest, hash_content
+from app.utils.markdown_chunker import MarkdownChunker
+from app.utils.text_splitting import approx_token_count
+from app.utils.helpers import get_tier_from_path
 
 logger = logging.getLogger("GAIA.VectorStore")
 
+# Tier number -> score multiplier: system_reference > identity/conversations > structured > raw
+DEFAULT_TIER_WEIGHTS = {"0": 1.0, "1": 0.9, "2": 0.8, "3": 0.6}
+UNKNOWN_TIER_WEIGHT = 0.7
+
+
+def tier_key(tier: Optional[str]) -> Optional[str]:
+    """Normalize a tier tag ("0_system_reference", "2", "structured") to its tier number."""
+    if tier is None:
+        return None
+    tier = str(tier)
+    prefix = tier.split("_", 1)[0]
+    if prefix.isdigit():
+        return prefix
+    return get_tier_from_path(tier)
+
+
+def build_where(project: Optional[str] = None, tiers: Optional[List[str]] = None) -> Optional[dict]:
+    """Chroma `where` filter for a project and/or a set of tier tags."""
+    clauses = []
+    if project:
+        clauses.append({"project": project})
+    if tiers:
+        clauses.append({"tier": {"$in": list(tiers)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class CachedRetriever(BaseRetriever):
+    """LangChain retriever that routes queries through VectorStoreManager.search and its caches."""
+
+    manager: Any
+    k: int = 5
+    search_filter: Optional[dict] = None
+    tiers: Optional[List[str]] = None
+    token_budget: Optional[int] = None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        if self.tiers or self.token_budget:
+            return self.manager.retrieve(query, k=self.k, tiers=self.tiers, token_budget=self.token_budget)
+        return self.manager.search(query, k=self.k, search_filter=self.search_filter)
+
+
 class VectorStoreManager:
+    """
+    One vector backend (plus BM25 index) per project, opened lazily.
+    The backend ("chroma" or "numpy") is chosen with the `vector_backend` constant.
+
+    `vector_store` and `lexical_index` always point at the active project's
+    handles. Up to `vector_store_max_open` projects stay open in an LRU, so
+    switching back to a recent project is just a pointer swap; the embedding
+    model is shared by all of them.
+    """
+
     def __init__(self, config):
         self.config = config
-        self.embeddings = HuggingFaceEmbeddings(model_name="all-mpnet-base-v2")
-        self.vector_store = None
+        self.embeddings = EmbeddingEngine.from_config(config)
+        self.vector_store: Optional[VectorBackend] = None
+        self.backend_name = getattr(config, "vector_backend", "chroma")
+        self.active_project = "global"
+        self.max_open = max(1, getattr(config, "vector_store_max_open", 4))
+        self._handles: "OrderedDict[str, Tuple[VectorBackend, LexicalIndex]]" = OrderedDict()
+        self._handles_lock = threading.RLock()
+        self.retrieval_cache = RetrievalCache(
+            max_queries=getattr(config, "query_cache_size", 512),
+            ttl_seconds=getattr(config, "retrieval_cache_ttl", 300),
+        )
+        self.lexical_index = LexicalIndex()
+        self.hybrid_search = getattr(config, "hybrid_search", True)
+        self.rrf_k = getattr(config, "rrf_k", 60)
+        self.hybrid_candidates = getattr(config, "hybrid_candidates", 4)
+        self.tier_weights = dict(DEFAULT_TIER_WEIGHTS, **(getattr(config, "tier_weights", None) or {}))
+        self.retrieval_token_budget = getattr(config, "retrieval_token_budget", 1024)
+
+    def store_path(self, project: Optional[str] = None) -> str:
+        """Directory holding a project's vectors, lexical index and embedding manifest."""
+        project = project or self.active_project
+        if project == "global":
+            path = self.config.vectordb_path
+        elif getattr(self.config, "projects_path", None):
+            # Same layout as ProjectManager.get_vector_store_path()
+            path = os.path.join(self.config.projects_path, project, "vector_store")
+        else:
+            path = os.path.join(self.config.vectordb_path, "projects", project)
+        # Non-default backends get their own subdirectory so manifests never describe the wrong store
+        return path if self.backend_name == "chroma" else os.path.join(path, self.backend_name)
+
+    def manifest_path(self, project: Optional[str] = None) -> str:
+        """Embedding manifest describing which files a project's collection holds."""
+        return os.path.join(self.store_path(project), "embedding_manifest.json")
 
     def initialize_store(self):
-        """Initializes or loads the Chroma vector store."""
+        """Initializes or loads the vector store for the active project."""
+        self.use_project(self.active_project)
+
+    def use_project(self, project: str):
+        """
+        Make `project` the active collection, opening it if needed.
+
+        Already-open projects are switched to without touching disk; opening a new
+        one may close the least recently used project beyond `vector_store_max_open`.
+        """
+        start = time.perf_counter()
+        with self._handles_lock:
+            handle = self._handles.get(project)
+            if handle is None:
+                handle = self._open_project(project)
+                self._handles[project] = handle
+                while len(self._handles) > self.max_open:
+                    victim, (victim_store, victim_index) = self._handles.popitem(last=False)
+                    self._save_handle(victim_store, victim_index)
+                    logger.info(f"📤 Closed vector store for project '{victim}'")
+            self._handles.move_to_end(project)
+            self.vector_store, self.lexical_index = handle
+            self.active_project = project
+        logger.info(f"📦 Vector store switched to project '{project}' in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def _open_project(self, project: str) -> Tuple[VectorBackend, LexicalIndex]:
+        path = self.store_path(project)
         try:
-            os.makedirs(self.config.vectordb_path, exist_ok=True)
-            self.vector_store = Chroma(
-                collection_name="gaia-documents",
-                embedding_function=self.embeddings,
-                persist_directory=self.config.vectordb_path
-            )
-            logger.info("📦 Vector store initialized.")
+            os.makedirs(path, exist_ok=True)
+            store = create_backend(self.backend_name, path, embeddings=self.embeddings, config=self.config)
+            index = self._sync_lexical_index(store, path)
+            logger.info(f"📦 Vector store initialized for project '{project}'.")
+            return store, index
         except Exception as e:
-            logger.error(f"❌ Failed to initialize vector store: {e}", exc_info=True)
+            logger.error(f"❌ Failed to initialize vector store for project '{project}': {e}", exc_info=True)
             raise
 
-    def persist(self):
-        """Persists the current state of the vector store."""
-        if self.vector_store:
+    def _sync_lexical_index(self, store: VectorBackend, path: str, batch_size: int = 1000) -> LexicalIndex:
+        """Load the BM25 index from disk, rebuilding it from the backend if it is missing or stale."""
+        index = LexicalIndex(os.path.join(path, "lexical_index.json"),
+                             common_ratio=getattr(self.config, "lexical_common_term_ratio", 0.1))
+        if index.load() and len(index) == store.count():
+            return index
+
+        index.clear()
+        offset = 0
+        while True:
+            page = store.get(limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            index.add(page["ids"], [text or "" for text in page["documents"]], page["metadatas"])
+            offset += len(page["ids"])
+        index.save()
+        logger.info(f"🔤 Lexical index rebuilt from {len(index)} stored documents.")
+        return index
+
+    def open_projects(self) -> List[str]:
+        """Open project collections, least recently used first."""
+        return list(self._handles)
+
+    def embedding_stats(self) -> dict:
+        """Returns embedding throughput statistics."""
+        return self.embeddings.stats()
+
+    def cache_stats(self) -> dict:
+        """Returns query-embedding and retrieval result cache counters."""
+        return self.retrieval_cache.stats()
+
+    def backend_stats(self) -> dict:
+        """Returns size and layout of the active project's vector backend."""
+        return self.vector_store.stats() if self.vector_store else {"backend": self.backend_name, "count": 0}
+
+    def lexical_stats(self) -> dict:
+        """Returns BM25 index size for the active project and the open project handles."""
+        return dict(self.lexical_index.stats(), hybrid=self.hybrid_search,
+                    project=self.active_project, open_projects=self.open_projects())
+
+    @staticmethod
+    def _save_handle(store: Optional[VectorBackend], index: LexicalIndex, save_index: bool = True):
+        if save_index:
+            try:
+                index.save()
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to save lexical index: {e}", exc_info=True)
+        if store:
             try:
-                self.vector_store.persist()
-                logger.info("💾 Vector store changes persisted to disk.")
+                store.persist()
             except Exception as e:
                 logger.warning(f"⚠️ Failed to persist vector store: {e}", exc_info=True)
 
+    def persist(self):
+        """Persists every open project's vector store and lexical index."""
+        with self._handles_lock:
+            handles = list(self._handles.values()) or [(self.vector_store, self.lexical_index)]
+        for store, index in handles:
+            self._save_handle(store, index)
+        logger.info("💾 Vector store changes persisted to disk.")
+
     def delete_all_documents(self):
         """Deletes all documents from the vector store."""
         if self.vector_store:
             try:
                 self.vector_store.delete(ids=None)  # Deletes all documents
+                self.lexical_index.clear()
+                self.retrieval_cache.invalidate()
                 logger.info("🗑️ All documents deleted from vector store.")
             except Exception as e:
                 logger.warning(f"⚠️ Failed to delete documents: {e}", exc_info=True)
 
-    def as_retriever(self):
-        """Returns a retriever interface from the vector store."""
-        return self.vector_store.as_retriever(search_kwargs={"k": 5})
+    def as_retriever(self, k: int = 5, search_filter: Optional[dict] = None,
+                     tiers: Optional[List[str]] = None, token_budget: Optional[int] = None):
+        """
+        Returns a cached retriever interface over the vector store.
+        Passing `tiers` or `token_budget` switches it to tier-weighted `retrieve`.
+        """
+        return CachedRetriever(manager=self, k=k, search_filter=search_filter,
+                               tiers=tiers, token_budget=token_budget)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embeds a query, reusing the vector for repeated (normalized) query text."""
+        vector = self.retrieval_cache.get_vector(query)
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+            self.retrieval_cache.put_vector(query, vector)
+        return vector
+
+    def _fetch(self, ids: List[str]) -> dict:
+        """Load stored documents by ID."""
+        if not ids:
+            return {}
+        found = self.vector_store.get(ids=ids)
+        return {
+            doc_id: Document(page_content=text, metadata=meta or {})
+            for doc_id, text, meta in zip(found["ids"], found["documents"], found["metadatas"])
+        }
+
+    def search(self, query: str, k: int = 5, search_filter: Optional[dict] = None) -> List[Document]:
+        """
+        Hybrid search with query-embedding and result caching.
+
+        Dense (vector backend) and lexical (BM25) candidates are fused with reciprocal-rank
+        fusion, so exact matches on rare names rank alongside semantic matches.
+        Set `hybrid_search` to False in the constants for dense-only search.
+
+        Args:
+            query: Natural language query
+            k: Number of results
+            search_filter: Optional Chroma-style `where` metadata filter
+
+        Returns:
+            List[Document]: Matching documents, best first
+        """
+        vector = self.embed_query(query)
+
+        ids = self.retrieval_cache.get_results(vector, self.active_project, k, search_filter)
+        if ids is not None:
+            by_id = self._fetch(ids)
+            return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
 
-    def add_documents(self, documents: List[Document]):
-        """Adds pre-chunked documents to the vector store."""
+        scores, by_id = self._candidates(query, vector, k, search_filter)
+        ids = sorted(scores, key=scores.get, reverse=True)[:k]
+        by_id.update(self._fetch([doc_id for doc_id in ids if doc_id not in by_id]))
+
+        self.retrieval_cache.put_results(vector, self.active_project, k, search_filter, ids)
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+    def _candidates(self, query: str, vector: np.ndarray, k: int,
+                    where: Optional[dict]) -> Tuple[dict, dict]:
+        """
+        Fused dense + lexical candidates, with `where` applied inside both scans.
+
+        Returns:
+            (scores, by_id): RRF score per candidate ID, and the documents already
+            loaded by the dense query (lexical-only hits still need _fetch)
+        """
+        hybrid = self.hybrid_search and len(self.lexical_index) > 0
+        n_candidates = k * self.hybrid_candidates if hybrid else k
+        result = self.vector_store.query(vector, n_results=n_candidates, where=where)
+        dense_ids = result["ids"]
+        by_id = {
+            doc_id: Document(page_content=text, metadata=meta or {})
+            for doc_id, text, meta in zip(dense_ids, result["documents"], result["metadatas"])
+        }
+        rankings = [dense_ids]
+        if hybrid:
+            rankings.append([doc_id for doc_id, _ in self.lexical_index.search(query, n_candidates, where=where)])
+        return rrf_scores(rankings, k=self.rrf_k), by_id
+
+    def tier_weight(self, tier: Optional[str]) -> float:
+        return self.tier_weights.get(tier_key(tier), UNKNOWN_TIER_WEIGHT)
+
+    def retrieve(self, query: str, k: int = 5, project: Optional[str] = None,
+                 tiers: Optional[List[str]] = None, token_budget: Optional[int] = None) -> List[Document]:
+        """
+        Tier-aware retrieval of prompt context.
+
+        Candidates are pre-filtered by project/tier metadata inside the similarity
+        and BM25 scans, re-scored by tier weight (system_reference > structured > raw),
+        de-duplicated by chunk hash, and packed greedily until `token_budget` is used.
+
+        Args:
+            query: Natural language query
+            k: Maximum number of chunks
+            project: Only chunks tagged with this project (the collection is already per project)
+            tiers: Only chunks whose `tier` tag is in this list
+            token_budget: Maximum combined tokens of the returned chunks
+                          (defaults to config.retrieval_token_budget; 0 disables the limit)
+
+        Returns:
+            List[Document]: Selected chunks, best first
+        """
+        where = build_where(project, tiers)
+        budget = self.retrieval_token_budget if token_budget is None else token_budget
+        vector = self.embed_query(query)
+        cache_filter = {"where": where, "token_budget": budget, "tier_weights": self.tier_weights}
+
+        ids = self.retrieval_cache.get_results(vector, self.active_project, k, cache_filter)
+        if ids is not None:
+            by_id = self._fetch(ids)
+            return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+        scores, by_id = self._candidates(query, vector, k, where)
+        by_id.update(self._fetch([doc_id for doc_id in scores if doc_id not in by_id]))
+        weighted = {
+            doc_id: score * self.tier_weight(by_id[doc_id].metadata.get("tier"))
+            for doc_id, score in scores.items()
+            if doc_id in by_id
+        }
+
+        ids, used, seen = [], 0, set()
+        for doc_id in sorted(weighted, key=weighted.get, reverse=True):
+            doc = by_id[doc_id]
+            digest = doc.metadata.get("chunk_hash")
+            if digest and digest in seen:
+                continue
+            tokens = approx_token_count(doc.page_content)
+            if budget and used + tokens > budget:
+                continue  # a smaller, lower-ranked chunk may still fit
+            ids.append(doc_id)
+            used += tokens
+            if digest:
+                seen.add(digest)
+            if len(ids) >= k:
+                break
+
+        self.retrieval_cache.put_results(vector, self.active_project, k, cache_filter, ids)
+        logger.debug(f"🎯 Retrieved {len(ids)} chunks (~{used} tokens) for tiered query")
+        return [by_id[doc_id] for doc_id in ids]
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> bool:
+        """
+        Adds pre-chunked documents to the vector store.
+
+        Args:
+            documents: Documents to embed and store
+            ids: Optional stable vector IDs (one per document)
+
+        Returns:
+            bool: True if the documents were stored
+        """
+        if not documents:
+            return True
         try:
-            self.vector_store.add_documents(documents)
+            ids = ids or [str(uuid.uuid4()) for _ in documents]
+            texts = [doc.page_content for doc in documents]
+            vectors = self.embeddings.encode(texts)
+            self.vector_store.upsert(
+                ids=ids,
+                embeddings=vectors,
+                documents=texts,
+                metadatas=[doc.metadata or None for doc in documents],
+            )
+            self.lexical_index.add(ids, texts, [doc.metadata for doc in documents])
+            self.retrieval_cache.invalidate()
             logger.info(f"➕ Added {len(documents)} documents to vector store.")
+            return True
         except Exception as e:
             logger.error(f"❌ Error adding documents to vector store: {e}", exc_info=True)
+            return False
+
+    def bulk_ingest(self, documents: Iterable[Document], job: str = "bulk",
+                    batch_size: Optional[int] = None, id_fn: Callable[[Document], str] = document_id,
+                    total: Optional[int] = None, progress: Optional[Callable[[dict], None]] = None,
+                    restart: bool = False) -> dict:
+        """
+        Stream documents into the active project in committed batches.
+
+        Each batch is embedded and upserted under stable IDs (`id_fn`), so a retried
+        or replayed batch overwrites rather than duplicates. Every
+        `bulk_ingest_checkpoint_batches` batches the store is persisted and the
+        checkpoint advanced; a crashed job re-run with the same `job` name and the
+        same document order skips what was already committed. Markdown source
+        files whose chunks are all committed are recorded in the embedding
+        manifest at the same point, so a later embed_documents pass skips them.
+
+        Args:
+            documents: Iterable of chunked Documents, consumed lazily
+            job: Checkpoint name
+            batch_size: Documents per batch (default: config bulk_ingest_batch_size)
+            id_fn: Vector ID for a document
+            total: Expected document count, for progress reporting only
+            progress: Called with a status dict after every batch
+            restart: Ignore an existing checkpoint
+
+        Returns:
+            dict: Final job status ("complete" or "failed", counts, rate)
+        """
+        batch_size = batch_size or getattr(self.config, "bulk_ingest_batch_size", 256)
+        checkpoint_every = max(1, getattr(self.config, "bulk_ingest_checkpoint_batches", 8))
+        # The lexical index is rewritten whole on save; a stale copy on disk is rebuilt from the store on open
+        index_every = max(1, getattr(self.config, "bulk_ingest_index_save_checkpoints", 8))
+        retries = getattr(self.config, "bulk_ingest_retries", 2)
+        checkpoint = IngestCheckpoint(os.path.join(self.store_path(), "ingest_checkpoints", f"{job}.json"), job)
+        if restart:
+            checkpoint.clear()
+        manifest = EmbeddingManifest(self.manifest_path())
+
+        status = dict(checkpoint.to_dict(), status="running", total=total, ingested=0,
+                      resumed_from=checkpoint.committed, project=self.active_project)
+        start = time.perf_counter()
+
+        def report(**changes):
+            status.update(changes, committed=checkpoint.committed, batches=checkpoint.batches)
+            elapsed = time.perf_counter() - start
+            status["elapsed_s"] = round(elapsed, 2)
+            status["docs_per_s"] = round(status["ingested"] / elapsed, 1) if elapsed else 0.0
+            if progress:
+                progress(dict(status))
+            return dict(status)
+
+        stream = iter(documents)
+        if not skip_committed(stream, checkpoint, id_fn):
+            logger.error(f"❌ Ingest job '{job}' input no longer matches its checkpoint; re-run with restart=True")
+            return report(status="failed", error="document stream does not match checkpoint")
+
+        pending = 0
+        commits = 0
+        # File of the last committed document; it may continue in the next batch
+        open_source = next(iter(checkpoint.files), None)
+        for batch in iter_batches(stream, batch_size):
+            ids = [id_fn(doc) for doc in batch]
+            for doc in batch:
+                # Tag chunks with the collection they are written into, so project-filtered retrieval finds them
+                doc.metadata["project"] = self.active_project
+            for attempt in range(retries + 1):
+                if self.add_documents(batch, ids=ids):
+                    break
+                logger.warning(f"⚠️ Ingest job '{job}' batch {checkpoint.batches + 1} failed (attempt {attempt + 1})")
+            else:
+                self._commit_checkpoint(checkpoint, pending, manifest, open_source)
+                return report(status="failed", error=f"batch {checkpoint.batches + 1} failed after {retries + 1} attempts")
+
+            status["ingested"] += len(batch)
+            checkpoint.committed += len(batch)
+            checkpoint.batches += 1
+            checkpoint.last_id = ids[-1]
+            for doc, doc_id in zip(batch, ids):
+                self._track_source(checkpoint.files, doc, doc_id)
+            open_source = (batch[-1].metadata or {}).get("source_path")
+            pending += 1
+            if pending >= checkpoint_every:
+                commits += 1
+                pending = self._commit_checkpoint(checkpoint, pending, manifest, open_source,
+                                                  save_index=commits % index_every == 0)
+            report()
+
+        self._commit_checkpoint(checkpoint, pending, manifest, None)
+        final = report(status="complete")
+        checkpoint.clear()
+        logger.info(f"📚 Ingest job '{job}' complete: {final['ingested']} documents in {final['elapsed_s']}s")
+        return final
+
+    def _commit_checkpoint(self, checkpoint: IngestCheckpoint, pending: int,
+                           manifest: EmbeddingManifest, open_source: Optional[str], save_index: bool = True) -> int:
+        """
+        Persist the active store, record every finished source file except `open_source`
+        in the embedding manifest, then advance the checkpoint past the persisted batches.
+        The lexical index is only written when `save_index` is set.
+        """
+        if not pending and all(source == open_source for source in checkpoint.files):
+            return 0
+        stale_ids = self._record_sources(manifest, checkpoint.files, open_source)
+        if stale_ids:
+            self.delete_documents(stale_ids)
+        self._save_handle(self.vector_store, self.lexical_index, save_index)
+        manifest.save()
+        checkpoint.save()
+        return 0
+
+    @staticmethod
+    def _track_source(files: dict, doc: Document, doc_id: str):
+        """Collect a committed chunk's ID under its markdown source file, stat-ing the file on first sight."""
+        source = (doc.metadata or {}).get("source_path")
+        if not source or not source.endswith(".md"):
+            return
+        entry = files.get(source)
+        if entry is None:
+            try:
+                stat = os.stat(source)
+            except OSError:
+                return
+            entry = files[source] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "ids": []}
+        entry["ids"].append(doc_id)
+
+    @staticmethod
+    def _record_sources(manifest: EmbeddingManifest, files: dict, open_source: Optional[str]) -> List[str]:
+        """
+        Move finished files from `files` into the manifest.
+
+        The stat recorded is the one taken when the file was first chunked; the content
+        hash is only taken if the file is still unchanged, so a file edited mid-ingest
+        is re-embedded by the next embed_documents pass.
+
+        Returns:
+            List[str]: IDs a previous embedding of these files produced that are no longer present
+        """
+        stale_ids = []
+        for source in [s for s in files if s != open_source]:
+            entry = files.pop(source)
+            content_hash = None
+            try:
+                stat = os.stat(source)
+                if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+                    with open(source, "r", encoding="utf-8") as f:
+                        content_hash = hash_content(f.read())
+            except (OSError, UnicodeDecodeError) as e:
+                logger.debug(f"Could not hash ingested file {source}: {e}")
+            old_ids = set(manifest.forget(source))
+            manifest.record_entry(source, entry["size"], entry["mtime_ns"], content_hash, entry["ids"])
+            stale_ids.extend(old_ids - set(entry["ids"]))
+        return stale_ids
+
+    def delete_documents(self, ids: List[str]) -> bool:
+        """Deletes specific documents from the vector store by ID."""
+        if not self.vector_store or not ids:
+            return False
+        try:
+            self.vector_store.delete(ids=ids)
+            self.lexical_index.remove(ids)
+            self.retrieval_cache.invalidate()
+            logger.info(f"🗑️ Deleted {len(ids)} documents from vector store.")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to delete documents by ID: {e}", exc_info=True)
+            return False
 
     def split_and_embed_documents(self, raw_documents: List[str], source: Optional[str] = None):
-        """Splits raw strings into chunks and embeds them as Documents."""
+        """Splits raw strings into heading-aware chunks and embeds them as Documents."""
         try:
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200,
-                separators=["\n\n", "\n", " ", ""]
-            )
-            documents = splitter.create_documents(raw_documents)
-            for doc in documents:
-                if source:
-                    doc.metadata["source"] = source
+            chunker = MarkdownChunker.from_config(self.config)
+            metadata = {"source": source} if source else {}
+            documents = []
+            for raw in raw_documents:
+                documents.extend(chunker.create_documents(raw, metadata, project=self.active_project))
             self.add_documents(documents)
         except Exception as e:
             logger.error(f"❌ Failed to split and embed documents: {e}", exc_info=True)
@@ -6,6 +6,7 @@ Processes conversation summarization, document embedding, LoRA fine-tuning, and
 """
 
 import logging
+import threading
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger("GAIA.BackgroundTasks")
@@ -23,6 +24,9 @@ class BackgroundTask:
         self.vector_store_manager = getattr(ai_manager, 'vector_store_manager', None) if ai_manager else None
         self.vector_store = getattr(ai_manager, 'vector_store', None) if ai_manager else None
         self.doc_processor = getattr(ai_manager, 'doc_processor', None) if ai_manager else None
+        self.code_analyzer = getattr(ai_manager, 'code_analyzer', None) if ai_manager else None
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._jobs_lock = threading.Lock()
 
     def process_conversation_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -46,13 +50,31 @@ class BackgroundTask:
 
             elif task_type == "embed_documents" and self.doc_processor:
                 logger.info("🧬 Embedding all documents from processor queue...")
-                embedded_count = self.doc_processor.embed_documents()
+                embedded_count = self.doc_processor.embed_documents(task.get("path"), files=task.get("files"))
                 result.update({"status": "success", "embedded": embedded_count})
 
+            elif task_type == "bulk_ingest" and self.doc_processor and self.vector_store_manager:
+                status = self.run_bulk_ingest(task)
+                result.update({"status": "success" if status["status"] == "complete" else "error", "ingest": status})
+
+            elif task_type == "review_code" and self.code_analyzer:
+                files = task.get("files")
+                logger.info(f"🧠 Reviewing {'all' if files is None else len(files)} changed code files...")
+                review = self.code_analyzer.review_files(files)
+                result.update({"status": "success", "reviewed": len(review.get("written", []))})
+
+            elif task_type == "reload_persona" and self.ai_manager:
+                logger.info("🎭 Persona files changed; reloading active persona...")
+                result.update({"status": "success" if self.ai_manager.reload_persona() else "error"})
+
             elif task_type == "generate_artifacts" and self.doc_processor:
                 logger.info("🔧 Generating structured artifacts from document base...")
-                artifact_count = self.doc_processor.generate_artifacts()
-                result.update({"status": "success", "artifacts": artifact_count})
+                artifact_count = self.doc_processor.generate_artifacts(files=task.get("files"))
+                result.update({
+                    "status": "success",
+                    "artifacts": artifact_count,
+                    "pipeline": self.doc_processor.last_conversion_stats
+                })
 
             else:
                 logger.warning(f"⚠️ Unknown or unsupported background task type: {task_type}")
@@ -64,8 +86,40 @@ class BackgroundTask:
 
         return result
     
+    def run_bulk_ingest(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Streams the chunks of a markdown directory into the vector store in checkpointed batches.
+
+        Args:
+            task (dict): "path" (default structured_path), optional "job", "tier",
+                "project", "batch_size" and "restart"
+
+        Returns:
+            dict: Final job status from VectorStoreManager.bulk_ingest
+        """
+        path = task.get("path") or self.doc_processor.config.structured_path
+        job = task.get("job") or task.get("tag") or "bulk"
+        logger.info(f"📚 Bulk ingesting {path} as job '{job}'...")
+        project = task.get("project") or self.vector_store_manager.active_project
+        documents = self.doc_processor.iter_chunk_documents(path, task.get("tier", "2_semantic"), project)
+        return self.vector_store_manager.bulk_ingest(
+            documents,
+            job=job,
+            batch_size=task.get("batch_size"),
+            restart=task.get("restart", False),
+            progress=lambda status: self._update_job(job, status),
+        )
+
+    def _update_job(self, job: str, status: Dict[str, Any]):
+        with self._jobs_lock:
+            self.jobs[job] = status
+
     def get_status(self):
+        with self._jobs_lock:
+            jobs = {name: dict(status) for name, status in self.jobs.items()}
         return {
-            "tasks": ["summarize_conversation", "embed_documents", "generate_artifacts"],
-            "enabled": True
+            "tasks": ["summarize_conversation", "embed_documents", "bulk_ingest", "review_code",
+                      "reload_persona", "generate_artifacts"],
+            "enabled": True,
+            "jobs": jobs
         }
\ No newline at end of file
@@ -0,0 +1,397 @@
+"""
+background/file_watcher.py
+
+Live change detection for the code tree and knowledge directories.
+
+Uses inotify on Linux (through libc, no extra dependency) and falls back to
+polling (mtime/size) elsewhere. Changed paths collect in an in-memory dirty
+set per watched root; once events stop for `debounce_seconds` (or after
+`max_delay_seconds` of continuous churn) the set is flushed as re-analysis or
+re-embedding tasks on a TaskQueue.
+
+A directory deleted or moved out of a root is queued as its path with a
+trailing separator; the task handlers expand it to the files they know under it.
+"""
+
+import os
+import time
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.utils.code_analyzer.file_scanner import EXCLUDED_DIRS
+from app.utils.code_analyzer.language_detector import EXTENSION_LANGUAGE_MAP
+
+logger = logging.getLogger("GAIA.FileWatcher")
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Marker in a dirty set meaning "events were lost; treat the whole root as changed"
+FULL_RESCAN = "*"
+
+
+def _walk_dirs(root: str) -> Iterator[str]:
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        yield dirpath
+
+
+def _list_files(dirpath: str) -> List[str]:
+    """Files directly inside `dirpath`."""
+    try:
+        with os.scandir(dirpath) as entries:
+            return [entry.path for entry in entries if entry.is_file(follow_symlinks=False)]
+    except OSError:
+        return []
+
+
+def _walk_files(root: str) -> Iterator[str]:
+    for dirpath in _walk_dirs(root):
+        yield from _list_files(dirpath)
+
+
+class InotifySource:
+    """Recursive inotify watches over a set of directories."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}
+
+    def add_tree(self, root: str, report_files: bool = True) -> List[str]:
+        """
+        Watch `root` and its subdirectories. With `report_files` (a directory created
+        or moved into the tree), also return the files already inside them.
+        """
+        found = []
+        for dirpath in _walk_dirs(root):
+            wd = self._add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    logger.warning("⚠️ inotify watch limit reached (fs.inotify.max_user_watches); some changes will be missed")
+                    break
+                continue
+            self.dirs[wd] = dirpath
+            if report_files:
+                found.extend(_list_files(dirpath))
+        return found
+
+    def remove_tree(self, root: str):
+        """Drop the watches under a directory that left the tree, so its later events are not misreported."""
+        prefix = os.path.join(root, "")
+        for wd, dirpath in list(self.dirs.items()):
+            if dirpath == root or dirpath.startswith(prefix):
+                del self.dirs[wd]
+                self._rm_watch(self.fd, wd)
+
+    def read(self, timeout: float) -> List[Tuple[Optional[str], int]]:
+        """Wait up to `timeout` seconds and return (path, mask) events; path None means queue overflow."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.append((None, mask))
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    events.extend((found, IN_CREATE) for found in self.add_tree(path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.remove_tree(path)
+                    events.append((path, mask))
+                continue
+            events.append((path, mask))
+        return events
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class PollingSource:
+    """Portable fallback: rescans the roots every `interval` seconds and diffs (mtime_ns, size)."""
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.roots: List[str] = []
+        self.state: Dict[str, Tuple[int, int]] = {}
+        self._last_scan = time.monotonic()
+
+    def _scan(self, root: str) -> Dict[str, Tuple[int, int]]:
+        state = {}
+        for path in _walk_files(root):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def add_tree(self, root: str, report_files: bool = True) -> List[str]:
+        self.roots.append(root)
+        self.state.update(self._scan(root))
+        return []
+
+    def read(self, timeout: float) -> List[Tuple[Optional[str], int]]:
+        wait = self._last_scan + self.interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, wait))
+        self._last_scan = time.monotonic()
+        current: Dict[str, Tuple[int, int]] = {}
+        for root in self.roots:
+            current.update(self._scan(root))
+        events = [(path, IN_CLOSE_WRITE) for path, state in current.items() if self.state.get(path) != state]
+        events.extend((path, IN_DELETE) for path in self.state if path not in current)
+        self.state = current
+        return events
+
+    def close(self):
+        pass
+
+
+def _code_filter(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in EXTENSION_LANGUAGE_MAP
+
+
+def _markdown_filter(path: str) -> bool:
+    return path.endswith(".md")
+
+
+def _relative(root: str, path: str) -> str:
+    relative = os.path.relpath(path, root)
+    return os.path.join(relative, "") if path.endswith(os.sep) else relative
+
+
+def _review_code_task(root: str, paths: Optional[List[str]]) -> Dict:
+    files = None if paths is None else [_relative(root, path) for path in paths]
+    return {"type": "review_code", "tag": "watcher", "files": files}
+
+
+def _embed_task(root: str, paths: Optional[List[str]]) -> Dict:
+    return {"type": "embed_documents", "tag": "watcher", "path": root, "files": paths}
+
+
+def _artifacts_task(root: str, paths: Optional[List[str]]) -> Dict:
+    return {"type": "generate_artifacts", "tag": "watcher", "files": paths}
+
+
+def _persona_task(root: str, paths: Optional[List[str]]) -> Dict:
+    return {"type": "reload_persona", "tag": "watcher", "files": paths}
+
+
+# kind -> (which files count as changes, task built from the dirty paths)
+WATCH_KINDS: Dict[str, Tuple[Callable[[str], bool], Callable[[str, Optional[List[str]]], Dict]]] = {
+    "code": (_code_filter, _review_code_task),
+    "structured": (_markdown_filter, _embed_task),
+    "raw": (lambda path: True, _artifacts_task),
+    "persona": (lambda path: True, _persona_task),
+}
+
+
+class FileWatcher:
+    """
+    Watches named roots and turns debounced bursts of changes into TaskQueue tasks.
+    """
+
+    def __init__(self, task_queue, roots: Dict[str, str], backend: str = "auto",
+                 debounce_seconds: float = 2.0, max_delay_seconds: float = 30.0, poll_seconds: float = 5.0):
+        """
+        Args:
+            task_queue: TaskQueue receiving review/embedding tasks
+            roots: Watch kind ("code", "structured", "raw", "persona") -> directory
+            backend: "inotify", "poll" or "auto" (inotify when available)
+            debounce_seconds: Quiet period after the last event before flushing
+            max_delay_seconds: Flush at the latest this long after the first pending event
+            poll_seconds: Rescan interval of the polling fallback
+        """
+        self.task_queue = task_queue
+        self.roots = {kind: os.path.abspath(path) for kind, path in roots.items()
+                      if path and kind in WATCH_KINDS and os.path.isdir(path)}
+        # Longest root first, so a knowledge dir nested under the code root is classified as knowledge
+        self._by_depth = sorted(self.roots.items(), key=lambda item: len(item[1]), reverse=True)
+        self.backend = backend
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.poll_seconds = poll_seconds
+        self.source = None
+        self.dirty: Dict[str, Set[str]] = {kind: set() for kind in self.roots}
+        self.counters = {"events": 0, "flushes": 0, "tasks": 0}
+        self._first_event: Optional[float] = None
+        self._last_event: Optional[float] = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config, task_queue) -> "FileWatcher":
+        roots = {
+            "code": getattr(config, "codebase_path", None) or "/app",
+            "structured": getattr(config, "structured_path", None),
+            "raw": getattr(config, "raw_data_path", None),
+            "persona": getattr(config, "personas_dir", None),
+        }
+        return cls(
+            task_queue,
+            roots,
+            backend=getattr(config, "file_watcher_backend", "auto"),
+            debounce_seconds=getattr(config, "file_watcher_debounce_seconds", 2.0),
+            max_delay_seconds=getattr(config, "file_watcher_max_delay_seconds", 30.0),
+            poll_seconds=getattr(config, "file_watcher_poll_seconds", 5.0),
+        )
+
+    def _open_source(self):
+        if self.backend in ("auto", "inotify"):
+            try:
+                return InotifySource()
+            except (OSError, AttributeError) as e:
+                if self.backend == "inotify":
+                    raise
+                logger.info(f"ℹ️ inotify unavailable ({e}); polling every {self.poll_seconds}s")
+        return PollingSource(self.poll_seconds)
+
+    def start(self):
+        """Install watches and start the watcher thread."""
+        if self._thread or not self.roots:
+            return
+        self.source = self._open_source()
+        for root in self.roots.values():
+            self.source.add_tree(root, report_files=False)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="gaia-file-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"👀 File watcher ({type(self.source).__name__}) started for {', '.join(self.roots)}")
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.poll_seconds + 2)
+        self._thread = None
+        if self.source:
+            self.source.close()
+            self.source = None
+        logger.info("🛑 File watcher stopped.")
+
+    def _classify(self, path: str) -> Optional[str]:
+        for kind, root in self._by_depth:
+            if path == root or path.startswith(root + os.sep):
+                return kind
+        return None
+
+    def mark(self, path: Optional[str], is_dir: bool = False):
+        """
+        Add a changed path to the dirty set (None = events lost, rescan everything).
+        A removed directory is kept with a trailing separator.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if path is None:
+                for paths in self.dirty.values():
+                    paths.add(FULL_RESCAN)
+            else:
+                kind = self._classify(path)
+                if kind is None or not (is_dir or WATCH_KINDS[kind][0](path)):
+                    return
+                self.dirty[kind].add(os.path.join(path, "") if is_dir else path)
+            self.counters["events"] += 1
+            self._first_event = self._first_event or now
+            self._last_event = now
+
+    def _due(self, now: float) -> bool:
+        if self._last_event is None:
+            return False
+        return (now - self._last_event >= self.debounce_seconds
+                or now - self._first_event >= self.max_delay_seconds)
+
+    def flush(self) -> List[Dict]:
+        """Turn the dirty set into tasks on the queue; returns the queued tasks."""
+        with self._lock:
+            dirty = {kind: paths for kind, paths in self.dirty.items() if paths}
+            self.dirty = {kind: set() for kind in self.roots}
+            self._first_event = self._last_event = None
+        tasks = []
+        for kind, paths in dirty.items():
+            build = WATCH_KINDS[kind][1]
+            tasks.append(build(self.roots[kind], None if FULL_RESCAN in paths else sorted(paths)))
+        for task in tasks:
+            self.task_queue.add_task(task)
+        if tasks:
+            self.counters["flushes"] += 1
+            self.counters["tasks"] += len(tasks)
+        return tasks
+
+    def _run(self):
+        while self._running:
+            try:
+                for path, mask in self.source.read(timeout=min(self.debounce_seconds, 1.0)):
+                    self.mark(path, bool(mask & IN_ISDIR))
+                if self._due(time.monotonic()):
+                    self.flush()
+            except Exception as e:
+                logger.error(f"❌ File watcher error: {e}", exc_info=True)
+                time.sleep(1.0)
+
+    def pending(self) -> Dict[str, List[str]]:
+        """Current dirty set per watched root."""
+        with self._lock:
+            return {kind: sorted(paths) for kind, paths in self.dirty.items()}
+
+    def get_status(self) -> Dict:
+        return {
+            "backend": type(self.source).__name__ if self.source else None,
+            "roots": dict(self.roots),
+            "watched_dirs": len(getattr(self.source, "dirs", {})) if self.source else 0,
+            "pending": {kind: len(paths) for kind, paths in self.pending().items()},
+            **self.counters,
+        }
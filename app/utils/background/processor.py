@@ -11,6 +11,7 @@ import logging
 from app.utils.background.task_queue import TaskQueue
 from app.utils.background.background_tasks import BackgroundTask
 from app.utils.background.idle_monitor import IdleMonitor
+from app.utils.background.file_watcher import FileWatcher
 from app.cognition.initiative_handler import gil_check_and_generate
 
 logger = logging.getLogger("GAIA.BackgroundProcessor")
@@ -19,13 +20,22 @@ class BackgroundProcessor:
     """
     Runs in the background and monitors idle conditions to process queued tasks.
     Coordinates summarization, embedding, artifact generation, code analysis, and initiative prompting.
+    A FileWatcher feeds re-analysis/re-embedding tasks for changed files into the same queue.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, task_queue=None, task_handler=None):
+        """
+        Args:
+            config: Configuration object
+            task_queue: Queue to drain and to feed from the file watcher (default: a new TaskQueue)
+            task_handler: BackgroundTask running the tasks, so its job status is shared with the caller
+        """
         self.config = config
-        self.task_queue = TaskQueue()
-        self.task_handler = BackgroundTask()
+        self.task_queue = task_queue or TaskQueue()
+        self.task_handler = task_handler or BackgroundTask()
         self.idle_monitor = IdleMonitor()
+        self.file_watcher = FileWatcher.from_config(config, self.task_queue) \
+            if getattr(config, "file_watcher_enabled", True) else None
         self.thread = None
         self.running = False
 
@@ -39,6 +49,11 @@ class BackgroundProcessor:
     def start(self):
         """Starts the background processor in a new thread."""
         if not self.thread:
+            if self.ai_manager and not self.task_handler.ai_manager:
+                # Handlers need the injected managers (code analyzer, document processor, ...)
+                self.task_handler = BackgroundTask(self.ai_manager)
+            if self.file_watcher:
+                self.file_watcher.start()
             self.running = True
             self.thread = threading.Thread(target=self.run, daemon=True)
             self.thread.start()
@@ -47,9 +62,20 @@ class BackgroundProcessor:
     def stop(self):
         """Signals the thread to stop gracefully."""
         self.running = False
+        if self.file_watcher:
+            self.file_watcher.stop()
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=5)
             logger.info("🛑 Background thread stopped.")
+        self.thread = None
+
+    def get_status(self) -> dict:
+        """Thread, queue and file watcher state for /api/status."""
+        return {
+            "running": self.running,
+            "queued": self.task_queue.size(),
+            "file_watcher": self.file_watcher.get_status() if self.file_watcher else None,
+        }
 
     def run(self):
         """
@@ -75,7 +101,7 @@ class BackgroundProcessor:
 
                     # Initiative prompt check using config-based pathing
                     idle_minutes = self.idle_monitor.get_idle_minutes()
-                    gil_check_and_generate(user_idle_minutes=idle_minutes, config=self.config)
+                    initiative_message = gil_check_and_generate(user_idle_minutes=idle_minutes, config=self.config)
                     if initiative_message and self.conversation_manager:
                         self.conversation_manager.post_ai_message(initiative_message)
 
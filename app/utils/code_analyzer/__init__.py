@@ -2,6 +2,7 @@ from .base_analyzer import CodeAnalyzer
 from .file_loader import load_file_safely
 from .docstring_extractor import extract_docstrings
 from .structure_extractor import extract_structure
+from .ast_extractor import extract_code_info
 from .chunk_creator import create_chunks
 from .llm_analysis import summarize_chunks
 from .language_detector import detect_language
\ No newline at end of file
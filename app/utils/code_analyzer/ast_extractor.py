@@ -0,0 +1,133 @@
+"""
+ast_extractor.py
+
+Single-pass extraction of Python code structure: functions, classes, methods
+(with qualified names), imports, decorators and docstrings from one ast.parse.
+Line ranges come from the AST's end_lineno and include decorators.
+"""
+
+import ast
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("GAIA.ASTExtractor")
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def empty_code_info() -> Dict:
+    return {
+        "structure": {"functions": [], "classes": [], "methods": [], "imports": []},
+        "docstrings": {"module": None, "functions": [], "classes": []},
+    }
+
+
+def _decorator_names(node) -> List[str]:
+    names = []
+    for decorator in node.decorator_list:
+        try:
+            names.append(ast.unparse(decorator))
+        except Exception:
+            names.append(type(decorator).__name__)
+    return names
+
+
+class _Collector:
+    """Walks the tree once, tracking the enclosing class/function scope for qualified names."""
+
+    def __init__(self, info: Dict):
+        self.structure = info["structure"]
+        self.docstrings = info["docstrings"]
+
+    def visit_body(self, body: List[ast.stmt], scope: List[str], parent: Optional[Dict]):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                self._record_import(node, scope)
+            elif isinstance(node, _FUNCTION_NODES):
+                self._record_function(node, scope, parent)
+            elif isinstance(node, ast.ClassDef):
+                self._record_class(node, scope, parent)
+            else:
+                # Definitions nested in if/try/with/for blocks still belong to this scope
+                for field in ("body", "orelse", "finalbody", "handlers"):
+                    nested = getattr(node, field, None)
+                    if nested:
+                        self.visit_body(nested, scope, parent)
+
+    def _item(self, node, kind: str, scope: List[str], parent: Optional[Dict]) -> Dict:
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        return {
+            "type": kind,
+            "name": node.name,
+            "qualname": ".".join(scope + [node.name]),
+            "parent": parent["qualname"] if parent else None,
+            "line_start": start - 1,
+            "line_end": node.end_lineno,
+            "decorators": _decorator_names(node),
+            "doc": ast.get_docstring(node),
+        }
+
+    def _record_import(self, node, scope: List[str]):
+        if scope:
+            return
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                self.structure["imports"].append({"module": alias.name, "name": None,
+                                                  "alias": alias.asname, "line": node.lineno})
+        else:
+            module = "." * node.level + (node.module or "")
+            for alias in node.names:
+                self.structure["imports"].append({"module": module, "name": alias.name,
+                                                  "alias": alias.asname, "line": node.lineno})
+
+    def _record_function(self, node, scope: List[str], parent: Optional[Dict]):
+        in_class = parent is not None and parent["type"] == "class"
+        item = self._item(node, "method" if in_class else "function", scope, parent)
+        item["async"] = isinstance(node, ast.AsyncFunctionDef)
+        self.docstrings["functions"].append({"name": node.name, "qualname": item["qualname"], "doc": item["doc"]})
+        if in_class:
+            self.structure["methods"].append(item)
+        elif parent is None:
+            self.structure["functions"].append(item)
+        # Functions nested in functions are part of their parent's chunk and only get docstrings
+        self.visit_body(node.body, scope + [node.name, "<locals>"], item)
+
+    def _record_class(self, node: ast.ClassDef, scope: List[str], parent: Optional[Dict]):
+        item = self._item(node, "class", scope, parent)
+        item["bases"] = [ast.unparse(base) for base in node.bases]
+        self.docstrings["classes"].append({"name": node.name, "qualname": item["qualname"], "doc": item["doc"]})
+        self.structure["classes"].append(item)
+        self.visit_body(node.body, scope + [node.name], item)
+
+
+def extract_code_info(code: str, language: str = "python") -> Dict[str, Dict]:
+    """
+    Parse source once and return its structure and docstrings together.
+
+    Args:
+        code (str): Source code text
+        language (str): Programming language (default: python)
+
+    Returns:
+        dict: {"structure": {"functions", "classes", "methods", "imports"},
+               "docstrings": {"module", "functions", "classes"}}
+        Line ranges are 0-based starts (first decorator line) and exclusive ends.
+    """
+    info = empty_code_info()
+    if language.lower() != "python":
+        logger.warning("⚠️ Structure extraction not implemented for non-Python.")
+        return info
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        logger.warning(f"⚠️ Could not parse code: {e}")
+        return info
+    except Exception as e:
+        logger.error(f"❌ Failed to parse code: {e}", exc_info=True)
+        return info
+
+    info["docstrings"]["module"] = ast.get_docstring(tree)
+    _Collector(info).visit_body(tree.body, [], None)
+    logger.debug("🧱 Structure and docstrings extracted in one pass.")
+    return info
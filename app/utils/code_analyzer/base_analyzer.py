@@ -1,25 +1,60 @@
 import os
+import json
+import time
+import queue
 import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 from app.config import Config
+from app.models.conversion_pipeline import StageStats
 from app.utils.code_analyzer.language_detector import detect_language
-from app.utils.code_analyzer.docstring_extractor import extract_docstrings
-from app.utils.code_analyzer.structure_extractor import extract_structure
+from app.utils.code_analyzer.ast_extractor import extract_code_info
 from app.utils.code_analyzer.chunk_creator import create_chunks
-from app.utils.code_analyzer.llm_analysis import summarize_chunks
+from app.utils.code_analyzer.llm_analysis import summarize_file
+from app.utils.code_analyzer.summary_cache import ChunkSummaryCache
 from app.utils.code_analyzer.snapshot_manager import SnapshotManager
 from app.utils.code_analyzer.file_loader import load_file_safely
 from app.utils.code_analyzer.file_scanner import scan_code_directory
 
 logger = logging.getLogger("GAIA.CodeAnalyzer")
 
+_DONE = object()
+
+
+def _analyze_file(code_root: str, file_path: str) -> Optional[Dict]:
+    """
+    Process-pool entry point: the CPU-bound part of reviewing one file
+    (load, detect language, one-pass structure/docstring extraction, chunk).
+    """
+    code = load_file_safely(os.path.join(code_root, file_path))
+    if not code:
+        return None
+
+    language = detect_language(file_path, code)
+    info = extract_code_info(code, language)
+    return {
+        "file": file_path,
+        "language": language,
+        "docstrings": info["docstrings"],
+        "structure": info["structure"],
+        "chunks": create_chunks(file_path, code, info["structure"]),
+    }
+
+
 class CodeAnalyzer:
     """
     Coordinates the code analysis pipeline.
     Tracks modified files, extracts structural data, summarizes with LLM,
     and prepares data for vector storage or knowledge tier elevation.
+
+    Reviews run as a staged pipeline:
+
+        parse (process pool) -> bounded queue -> LLM summarize (threads) -> bounded queue -> writer
     """
 
     def __init__(self, config: Config, llm=None, doc_processor=None):
@@ -29,7 +64,17 @@ class CodeAnalyzer:
         self.snapshot_manager = SnapshotManager(self.config)
         self.code_root = self.config.codebase_path or "/app"
         self.summary_output_path = self.config.system_reference_path("code_summaries")
+        self.parse_workers = getattr(config, "code_analysis_workers", None) or multiprocessing.cpu_count()
+        self.summary_workers = max(1, getattr(config, "code_summary_workers", 1))
+        self.queue_size = max(1, getattr(config, "code_analysis_queue_size", 8))
+        self.pool_min_files = getattr(config, "code_analysis_pool_min_files", 64)
+        self.ordered_output = getattr(config, "code_analysis_ordered", False)
+        self.last_review_stats: Dict = {}
         os.makedirs(self.summary_output_path, exist_ok=True)
+        self.summary_cache = ChunkSummaryCache(
+            os.path.join(self.summary_output_path, "chunk_summaries.sqlite"),
+            max_entries=getattr(config, "code_summary_cache_size", 50000),
+        )
 
     def refresh_code_tree(self, root_dir: str = None):
         """
@@ -37,48 +82,188 @@ class CodeAnalyzer:
         """
         root = root_dir or self.code_root
         file_list = scan_code_directory(root)
-        self.snapshot_manager.update_snapshot(file_list)
+        self.snapshot_manager.update_snapshot(file_list, base_path=root)
+
+    def _summarize_loop(self, summarize_queue: "queue.Queue", write_queue: "queue.Queue", stats: Dict[str, StageStats]):
+        while True:
+            item = summarize_queue.get()
+            if item is _DONE:
+                break
+            index, analysis = item
+            if analysis is not None:
+                start = time.perf_counter()
+                chunks = analysis.pop("chunks")
+                if self.llm:
+                    analysis["summary"], analysis["unit_summaries"] = summarize_file(chunks, self.llm, self.summary_cache)
+                else:
+                    analysis["summary"] = "(No LLM summary)"
+                analysis["analyzed_at"] = datetime.utcnow().isoformat()
+                stats["summarize"].record(time.perf_counter() - start)
+            write_queue.put((index, analysis))
+
+    def _summary_path(self, file_path: str) -> str:
+        return os.path.join(self.summary_output_path, file_path.replace("/", "__") + ".json")
+
+    def _write_summary(self, summary_data: Dict) -> bool:
+        file_path = summary_data["file"]
+        try:
+            output_file = self._summary_path(file_path)
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(summary_data, f, indent=2)
+            logger.info(f"📄 Code summary saved: {file_path}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error writing summary for {file_path}: {e}", exc_info=True)
+            return False
 
-    def review_codebase(self):
+    def _write_loop(self, write_queue: "queue.Queue", ordered: bool, written: List[str], stats: Dict[str, StageStats]):
+        """Write summaries as they arrive, or in file order when `ordered` (holding early finishers back)."""
+        held: Dict[int, Optional[Dict]] = {}
+        next_index = 0
+        while True:
+            item = write_queue.get()
+            if item is _DONE:
+                break
+            index, summary_data = item
+            ready: List[Tuple[int, Optional[Dict]]] = [(index, summary_data)]
+            if ordered:
+                held[index] = summary_data
+                ready = []
+                while next_index in held:
+                    ready.append((next_index, held.pop(next_index)))
+                    next_index += 1
+            for _, data in ready:
+                if data is None:
+                    continue
+                start = time.perf_counter()
+                ok = self._write_summary(data)
+                stats["write"].record(time.perf_counter() - start, ok=ok)
+                if ok:
+                    written.append(data["file"])
+
+    def review_files(self, files: Optional[List[str]] = None) -> Dict:
         """
-        Perform full reanalysis of changed files and write updated summaries.
+        Re-review specific files (paths relative to the code root), e.g. ones reported
+        by the file watcher. Files whose content did not actually change are skipped
+        and summaries of deleted files are removed. `None` rescans the whole tree.
+        A path ending in a separator stands for every known file under that directory.
         """
-        logger.info("🧠 Starting codebase review cycle...")
+        if files is None:
+            self.refresh_code_tree()
+            return self.review_codebase()
+        expanded = []
+        for file_path in files:
+            if file_path.endswith(os.sep):
+                expanded.extend(self.snapshot_manager.files_under(file_path))
+            else:
+                expanded.append(file_path)
+        changed = self.snapshot_manager.refresh_files(expanded, base_path=self.code_root)
+        present = []
+        for file_path in changed:
+            if os.path.exists(os.path.join(self.code_root, file_path)):
+                present.append(file_path)
+            elif os.path.exists(self._summary_path(file_path)):
+                os.remove(self._summary_path(file_path))
+                logger.info(f"🗑️ Code summary removed: {file_path}")
+        return self.review_codebase(files=present)
 
-        changed_files = self.snapshot_manager.get_modified_files()
-        logger.info(f"🔍 {len(changed_files)} changed files to analyze.")
+    def review_codebase(self, ordered: Optional[bool] = None, files: Optional[List[str]] = None) -> Dict:
+        """
+        Perform full reanalysis of changed files and write updated summaries.
 
-        for file_path in changed_files:
-            try:
-                abs_path = os.path.join(self.code_root, file_path)
-                code = load_file_safely(abs_path)
-                if not code:
-                    continue
+        Parsing runs in a process pool while the LLM summarizes files that are
+        already parsed; each summary is written as soon as it is ready.
 
-                language = detect_language(file_path, code)
-                doc_info = extract_docstrings(code, language)
-                structure = extract_structure(code, language)
-                chunks = create_chunks(file_path, code, structure)
+        Args:
+            ordered: Write summaries in sorted file order instead of completion order
+                (defaults to the code_analysis_ordered constant)
+            files: Review these files instead of the snapshot's modified files
 
-                summary = summarize_chunks(chunks, self.llm) if self.llm else "(No LLM summary)"
+        Returns:
+            dict: Per-stage statistics and the list of written files
+        """
+        logger.info("🧠 Starting codebase review cycle...")
+        started = time.perf_counter()
+        ordered = self.ordered_output if ordered is None else ordered
 
-                summary_data = {
-                    "file": file_path,
-                    "language": language,
-                    "docstrings": doc_info,
-                    "structure": structure,
-                    "summary": summary,
-                    "analyzed_at": datetime.utcnow().isoformat()
-                }
+        changed_files = sorted(self.snapshot_manager.get_modified_files() if files is None else files)
+        logger.info(f"🔍 {len(changed_files)} changed files to analyze.")
 
-                output_file = os.path.join(self.summary_output_path, file_path.replace("/", "__") + ".json")
-                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        stats = {name: StageStats() for name in ("parse", "summarize", "write")}
+        written: List[str] = []
+        summarize_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        write_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        summarizers = [
+            threading.Thread(target=self._summarize_loop, args=(summarize_queue, write_queue, stats),
+                             name=f"gaia-code-summary-{i}", daemon=True)
+            for i in range(self.summary_workers)
+        ]
+        writer = threading.Thread(target=self._write_loop, args=(write_queue, ordered, written, stats),
+                                  name="gaia-code-writer", daemon=True)
+        for thread in summarizers + [writer]:
+            thread.start()
 
-                with open(output_file, "w", encoding="utf-8") as f:
-                    import json
-                    json.dump(summary_data, f, indent=2)
+        workers = min(self.parse_workers, len(changed_files))
+        try:
+            # Spawning workers costs about a second; small change sets parse faster inline
+            if workers <= 1 or len(changed_files) < self.pool_min_files:
+                for index, file_path in enumerate(changed_files):
+                    start = time.perf_counter()
+                    try:
+                        analysis = _analyze_file(self.code_root, file_path)
+                    except Exception as e:
+                        logger.error(f"❌ Error analyzing {file_path}: {e}", exc_info=True)
+                        analysis = None
+                    stats["parse"].record(time.perf_counter() - start, ok=analysis is not None)
+                    summarize_queue.put((index, analysis))
+            else:
+                self._parse_in_pool(changed_files, workers, summarize_queue, stats)
+        finally:
+            for _ in summarizers:
+                summarize_queue.put(_DONE)
+            for thread in summarizers:
+                thread.join()
+            write_queue.put(_DONE)
+            writer.join()
 
-                logger.info(f"📄 Code summary saved: {file_path}")
+        self.summary_cache.save()
+        wall = time.perf_counter() - started
+        report = {name: stage.as_dict(wall) for name, stage in stats.items()}
+        report.update({"files": len(changed_files), "written": written, "ordered": ordered,
+                       "summary_cache": self.summary_cache.stats(), "wall_seconds": round(wall, 3)})
+        self.last_review_stats = report
+        logger.info(f"📊 Code review finished: {len(written)}/{len(changed_files)} files in {wall:.1f}s")
+        return report
 
-            except Exception as e:
-                logger.error(f"❌ Error analyzing {file_path}: {e}", exc_info=True)
+    def _parse_in_pool(self, changed_files: List[str], workers: int, summarize_queue: "queue.Queue",
+                       stats: Dict[str, StageStats]):
+        """Fan parsing out to worker processes, keeping at most workers + queue_size files in flight."""
+        max_inflight = workers + self.queue_size
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            inflight = deque()
+            submitted = {}
+            files = iter(enumerate(changed_files))
+            exhausted = False
+            while inflight or not exhausted:
+                while not exhausted and len(inflight) < max_inflight:
+                    item = next(files, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    future = pool.submit(_analyze_file, self.code_root, item[1])
+                    submitted[future] = (item[0], item[1], time.perf_counter())
+                    inflight.append(future)
+                if not inflight:
+                    break
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    inflight.remove(future)
+                    index, file_path, start = submitted.pop(future)
+                    try:
+                        analysis = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ Error analyzing {file_path}: {e}", exc_info=True)
+                        analysis = None
+                    stats["parse"].record(time.perf_counter() - start, ok=analysis is not None)
+                    summarize_queue.put((index, analysis))  # blocks when the LLM falls behind
@@ -26,7 +26,12 @@ def create_chunks(file_path: str, code: str, structure: Dict) -> List[Dict]:
 
     try:
         lines = code.splitlines()
-        for item in structure.get("functions", []) + structure.get("classes", []):
+        # Top-level definitions, plus methods of top-level classes so they can be summarized
+        # one by one (the class chunk still spans its methods)
+        top_level_classes = {item["qualname"] for item in structure.get("classes", []) if not item.get("parent")}
+        items = [item for item in structure.get("functions", []) + structure.get("classes", []) if not item.get("parent")]
+        items += [item for item in structure.get("methods", []) if item.get("parent") in top_level_classes]
+        for item in items:
             start = item.get("line_start", 0)
             end = item.get("line_end", len(lines))
             snippet = "\n".join(lines[start:end])
@@ -35,6 +40,8 @@ def create_chunks(file_path: str, code: str, structure: Dict) -> List[Dict]:
                 "file_path": file_path,
                 "type": item.get("type"),
                 "name": item.get("name"),
+                "qualname": item.get("qualname", item.get("name")),
+                "parent": item.get("parent"),
                 "lines": f"{start+1}-{end}",
                 "content": snippet,
                 "hash": hashlib.md5(snippet.encode("utf-8")).hexdigest()
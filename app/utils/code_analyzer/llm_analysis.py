@@ -4,13 +4,22 @@ llm_analysis.py
 Handles code analysis using an LLM (Large Language Model).
 """
 
+import hashlib
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from app.cognition.inner_monologue import process_thought
 from app.config import Config
 
 logger = logging.getLogger("GAIA.LLMAnalysis")
 
+# Bump when prompts change so cached summaries are regenerated
+SUMMARY_VERSION = "1"
+
+CHUNK_INSTRUCTIONS = "Summarize the purpose of this code unit in one or two plain English sentences."
+ROLLUP_INSTRUCTIONS = "Combine these summaries of code units into a short plain English summary of the whole."
+FILE_INSTRUCTIONS = "Review the provided code functions and summarize their purpose in plain English."
+FAILED_SUMMARY = "(Failed to summarize code.)"
+
 def summarize_chunks(chunks: List[Dict], llm, reflect: bool = True) -> str:
     """
     Generate a natural language summary of code chunks using the provided LLM.
@@ -40,3 +49,102 @@ def summarize_chunks(chunks: List[Dict], llm, reflect: bool = True) -> str:
     except Exception as e:
         logger.error(f"❌ LLM summarization failed: {e}", exc_info=True)
         return "(Failed to summarize code.)"
+
+
+def _ask(llm, instructions: str, payload: str, reflect: bool = False) -> Optional[str]:
+    """One summarization call; None on failure so nothing bad gets cached."""
+    try:
+        summary = process_thought(
+            task_type="code_summary",
+            persona="technical summarizer",
+            instructions=instructions,
+            payload=payload,
+            llm=llm,
+            reflect=reflect
+        )
+        return summary.strip() if summary and summary.strip() else None
+    except Exception as e:
+        logger.error(f"❌ LLM summarization failed: {e}", exc_info=True)
+        return None
+
+
+def _rollup_key(kind: str, hashes: List[str]) -> str:
+    joined = "\0".join([kind] + hashes)
+    return f"{kind}:{hashlib.md5(joined.encode('utf-8')).hexdigest()}:{SUMMARY_VERSION}"
+
+
+def _cached(cache, key: str, name: str, produce, store: bool = True) -> Optional[str]:
+    """Cached summary for `key`, produced on a miss; roll-ups over failed parts are not stored."""
+    summary = cache.get(key)
+    if summary is None:
+        summary = produce()
+        if summary and store:
+            cache.put(key, summary, name)
+    return summary
+
+
+def summarize_file(chunks: List[Dict], llm, cache, reflect: bool = True) -> Tuple[str, Dict[str, str]]:
+    """
+    Summarize a file hierarchically: functions and methods are summarized one at a
+    time, classes from their method summaries, and the file from its top-level
+    summaries. Every level is cached on content hashes, so an edit to one function
+    costs one function summary plus the (short) class and file roll-ups above it.
+
+    Args:
+        chunks: Output of create_chunks
+        llm: Model passed to process_thought
+        cache: ChunkSummaryCache
+        reflect: Reflect on the final file summary
+
+    Returns:
+        tuple: (file summary, {qualname: summary} for every function, method and class)
+    """
+    units = [chunk for chunk in chunks if chunk["type"] in ("function", "method", "class")]
+    if not units:
+        logger.warning("LLMAnalysis received an empty code chunk payload. Skipping summarization.")
+        return "(Empty prompt — no summary generated.)", {}
+
+    summaries: Dict[str, str] = {}
+    failed = set()
+    methods: Dict[str, List[Dict]] = {}
+    for chunk in units:
+        if chunk["type"] == "method":
+            methods.setdefault(chunk.get("parent"), []).append(chunk)
+
+    def leaf(chunk: Dict) -> Optional[str]:
+        key = f"chunk:{chunk['hash']}:{SUMMARY_VERSION}"
+        return _cached(cache, key, chunk.get("qualname"), lambda: _ask(llm, CHUNK_INSTRUCTIONS, chunk["content"]))
+
+    top_level = []
+    for chunk in units:
+        qualname = chunk.get("qualname") or chunk.get("name")
+        if chunk["type"] == "method":
+            continue
+        members = methods.get(qualname, []) if chunk["type"] == "class" else []
+        if members:
+            for method in members:
+                method_summary = leaf(method)
+                if not method_summary:
+                    failed.add(qualname)
+                summaries[method["qualname"]] = method_summary or FAILED_SUMMARY
+            payload = f"class {chunk['name']}:\n" + "\n".join(
+                f"- {method['name']}: {summaries[method['qualname']]}" for method in members
+            )
+            # Keyed on the class hash, which covers its header and every method body
+            summary = _cached(cache, f"class:{chunk['hash']}:{SUMMARY_VERSION}", qualname,
+                              lambda: _ask(llm, ROLLUP_INSTRUCTIONS, payload), store=qualname not in failed)
+        else:
+            summary = leaf(chunk)
+        if not summary:
+            failed.add(qualname)
+        summaries[qualname] = summary or FAILED_SUMMARY
+        top_level.append((chunk, qualname))
+
+    if len(top_level) == 1:
+        return summaries[top_level[0][1]], summaries
+
+    payload = "\n".join(f"- {chunk['type']} {qualname}: {summaries[qualname]}" for chunk, qualname in top_level)
+    file_key = _rollup_key("file", [chunk["hash"] for chunk, _ in top_level])
+    file_summary = _cached(cache, file_key, chunks[0].get("file_path"),
+                           lambda: _ask(llm, FILE_INSTRUCTIONS, payload, reflect=reflect), store=not failed)
+    return file_summary or FAILED_SUMMARY, summaries
@@ -1,55 +1,164 @@
 import os
-import json
+import sqlite3
 import hashlib
 import logging
-from typing import List
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger("GAIA.SnapshotManager")
 
+HASH_BLOCK_SIZE = 1 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    hash TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+# (size, mtime_ns, inode, hash)
+FileState = Tuple[int, int, int, str]
+
+
+def hash_file(path: str) -> str:
+    """Streamed BLAKE2b digest of a file's contents ("" if unreadable)."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+    except OSError:
+        return ""
+    return digest.hexdigest()
+
+
 class SnapshotManager:
     """
     Tracks file state hashes to detect changes between boots or scan cycles.
     Prevents unnecessary reprocessing of unchanged code.
+
+    Each file's (size, mtime_ns, inode) is stored next to its hash in a SQLite
+    snapshot; a refresh only rehashes files whose stat changed, using a thread
+    pool, so refreshing an unchanged tree costs one stat() per file.
     """
 
     def __init__(self, config):
-        self.snapshot_path = os.path.join(config.system_reference_path("code_summaries"), "snapshot.json")
-        self.current_snapshot = {}
-        self.previous_snapshot = self._load_snapshot()
-
-    def _load_snapshot(self) -> dict:
-        if os.path.exists(self.snapshot_path):
-            try:
-                with open(self.snapshot_path, "r", encoding="utf-8") as f:
-                    logger.debug("🗃️ Previous snapshot loaded.")
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to load previous snapshot: {e}")
-        return {}
-
-    def _hash_file(self, path: str) -> str:
+        self.snapshot_path = os.path.join(config.system_reference_path("code_summaries"), "snapshot.sqlite")
+        self.hash_workers = getattr(config, "snapshot_hash_workers", None) or min(8, (os.cpu_count() or 1) * 2)
+        self.current_snapshot: Dict[str, str] = {}
+        self._states: Dict[str, FileState] = self._load_states()
+        self.previous_snapshot = {path: state[3] for path, state in self._states.items()}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.snapshot_path)
+        conn.execute(SCHEMA)
+        return conn
+
+    def _load_states(self) -> Dict[str, FileState]:
+        if not os.path.exists(self.snapshot_path):
+            return {}
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute("SELECT path, size, mtime_ns, inode, hash FROM files").fetchall()
+            logger.debug(f"🗃️ Previous snapshot loaded: {len(rows)} files.")
+            return {path: (size, mtime_ns, inode, digest) for path, size, mtime_ns, inode, digest in rows}
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load previous snapshot: {e}")
+            return {}
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int, int]]:
         try:
-            with open(path, "rb") as f:
-                return hashlib.md5(f.read()).hexdigest()
-        except Exception:
-            return ""
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
 
     def update_snapshot(self, file_list: List[str], base_path: str = "/app"):
         """
         Generate new hashes and update current snapshot.
+        Files whose (size, mtime_ns, inode) are unchanged keep their stored hash.
         """
-        self.current_snapshot = {
-            file: self._hash_file(os.path.join(base_path, file))
-            for file in file_list
-        }
+        states: Dict[str, FileState] = {}
+        missing: List[str] = []
+        to_hash: List[Tuple[str, Tuple[int, int, int]]] = []
+        for file in file_list:
+            stat = self._stat(os.path.join(base_path, file))
+            if stat is None:
+                missing.append(file)
+                continue
+            known = self._states.get(file)
+            if known and known[:3] == stat:
+                states[file] = known
+            else:
+                to_hash.append((file, stat))
+
+        if to_hash:
+            with ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="gaia-snapshot") as pool:
+                digests = pool.map(hash_file, [os.path.join(base_path, file) for file, _ in to_hash])
+                for (file, stat), digest in zip(to_hash, digests):
+                    states[file] = stat + (digest,)
+
+        removed = [file for file in self._states if file not in states]
+        changed = [(file,) + states[file] for file, _ in to_hash]
+        self._states = states
+        self.current_snapshot = {file: state[3] for file, state in states.items()}
+        self.current_snapshot.update((file, "") for file in missing)
 
         try:
-            with open(self.snapshot_path, "w", encoding="utf-8") as f:
-                json.dump(self.current_snapshot, f, indent=2)
-            logger.info("💾 Snapshot updated.")
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("DELETE FROM files WHERE path = ?", [(file,) for file in removed])
+                conn.executemany("INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, hash) VALUES (?, ?, ?, ?, ?)",
+                                 changed)
+            logger.info(f"💾 Snapshot updated: {len(file_list)} files, {len(to_hash)} rehashed, {len(removed)} removed.")
         except Exception as e:
             logger.error(f"❌ Failed to write snapshot: {e}")
 
+    def refresh_files(self, file_list: List[str], base_path: str = "/app") -> List[str]:
+        """
+        Update the snapshot for specific files (e.g. reported by the file watcher)
+        without touching the rest of the tree.
+
+        Returns:
+            List[str]: Files whose content hash changed or that disappeared
+        """
+        changed, removed, rows = [], [], []
+        for file in file_list:
+            stat = self._stat(os.path.join(base_path, file))
+            known = self._states.get(file)
+            if stat is None:
+                if self._states.pop(file, None) is not None:
+                    removed.append(file)
+                self.current_snapshot.pop(file, None)
+                self.previous_snapshot.pop(file, None)
+                continue
+            if known and known[:3] == stat:
+                continue
+            digest = hash_file(os.path.join(base_path, file))
+            self._states[file] = stat + (digest,)
+            rows.append((file,) + self._states[file])
+            self.current_snapshot[file] = digest
+            if not known or known[3] != digest:
+                changed.append(file)
+                self.previous_snapshot[file] = digest
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("DELETE FROM files WHERE path = ?", [(file,) for file in removed])
+                conn.executemany("INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, hash) VALUES (?, ?, ?, ?, ?)",
+                                 rows)
+        except Exception as e:
+            logger.error(f"❌ Failed to write snapshot: {e}")
+        return changed + removed
+
+    def files_under(self, prefix: str) -> List[str]:
+        """Known files whose path starts with `prefix` (e.g. a directory that was removed)."""
+        return [file for file in self._states if file.startswith(prefix)]
+
     def get_modified_files(self) -> List[str]:
         """
         Compare current vs previous and return only changed file paths.
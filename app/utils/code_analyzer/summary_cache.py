@@ -0,0 +1,76 @@
+"""
+summary_cache.py
+
+Persistent cache of LLM code summaries keyed on chunk content hash, so
+unchanged functions, classes and files are never summarized twice.
+"""
+
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger("GAIA.SummaryCache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    key TEXT PRIMARY KEY,
+    name TEXT,
+    summary TEXT NOT NULL,
+    used REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+class ChunkSummaryCache:
+    """
+    SQLite-backed map of content hash -> summary, shared by the summarizer threads.
+    Least recently used entries beyond `max_entries` are pruned on save.
+    """
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE summaries SET used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, summary: str, name: Optional[str] = None):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO summaries (key, name, summary, used) VALUES (?, ?, ?, ?)",
+                               (key, name, summary, time.time()))
+
+    def save(self):
+        """Commit pending writes and prune the least recently used entries."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM summaries WHERE key IN (SELECT key FROM summaries ORDER BY used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self.save()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,170 @@
+"""
+utils/markdown_chunker.py
+
+Structure-aware chunking for markdown documents.
+Text is split by heading hierarchy first, then packed to a token budget, so
+each chunk stays within one section and carries its heading path (e.g.
+"Campaign > Factions > The Silver Hand") in metadata alongside tier and project.
+Every chunk gets a content hash so re-ingestion can skip unchanged chunks.
+"""
+
+import hashlib
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from app.utils.text_splitting import HEADING_RE, approx_token_count, iter_paragraphs, split_by_tokens
+
+logger = logging.getLogger("GAIA.MarkdownChunker")
+
+HEADING_PATH_SEPARATOR = " > "
+
+
+def chunk_hash(text: str) -> str:
+    """Content hash of a chunk, insensitive to whitespace differences."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def iter_sections(text: str) -> Iterable[Tuple[List[str], str]]:
+    """
+    Yield (heading_path, body) for each section of a markdown document.
+
+    The body includes the section's own heading line. Lines inside fenced code
+    blocks are never treated as headings.
+    """
+    stack: List[Tuple[int, str]] = []
+    lines: List[str] = []
+    in_fence = False
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(stripped)
+        if match:
+            if "\n".join(lines).strip():
+                yield [title for _, title in stack], "\n".join(lines).strip()
+            lines = []
+            level = len(match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, match.group(2).strip()))
+        lines.append(line)
+
+    if "\n".join(lines).strip():
+        yield [title for _, title in stack], "\n".join(lines).strip()
+
+
+def _common_prefix(a: List[str], b: List[str]) -> List[str]:
+    prefix = []
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        prefix.append(x)
+    return prefix
+
+
+class MarkdownChunker:
+    """
+    Splits markdown into section-aligned chunks of at most `max_tokens` tokens.
+
+    Small neighbouring sections under the same parent are merged into one chunk;
+    oversized sections are split on paragraph boundaries and every piece is
+    prefixed with the section heading so it stands on its own.
+    """
+
+    def __init__(self, max_tokens: int = 256, count: Optional[Callable[[str], int]] = None):
+        """
+        Args:
+            max_tokens: Token budget per chunk
+            count: Token counting function (defaults to a character-based estimate)
+        """
+        self.max_tokens = max(16, max_tokens)
+        self.count = count or approx_token_count
+
+    @classmethod
+    def from_config(cls, config) -> "MarkdownChunker":
+        return cls(max_tokens=getattr(config, "chunk_max_tokens", 256))
+
+    def split(self, text: str) -> List[Tuple[str, List[str]]]:
+        """
+        Split markdown text into chunks.
+
+        Returns:
+            List of (chunk_text, heading_path) tuples in document order
+        """
+        chunks: List[Tuple[str, List[str]]] = []
+        pending: List[str] = []
+        pending_path: Optional[List[str]] = None
+        pending_tokens = 0
+
+        def flush():
+            nonlocal pending, pending_path, pending_tokens
+            if pending:
+                chunks.append(("\n\n".join(pending), pending_path or []))
+            pending, pending_path, pending_tokens = [], None, 0
+
+        for path, body in iter_sections(text):
+            tokens = self.count(body)
+            if tokens > self.max_tokens:
+                flush()
+                chunks.extend((piece, path) for piece in self._split_section(body))
+                continue
+
+            if pending:
+                shared = _common_prefix(pending_path, path)
+                # Merge only siblings/children under a shared heading; the preamble stays on its own
+                if pending_tokens + tokens > self.max_tokens or not shared:
+                    flush()
+                else:
+                    pending_path = shared
+            if not pending:
+                pending_path = path
+            pending.append(body)
+            pending_tokens += tokens
+
+        flush()
+        return chunks
+
+    def _split_section(self, body: str) -> List[str]:
+        first_line, _, rest = body.partition("\n")
+        if not HEADING_RE.match(first_line.strip()):
+            return list(split_by_tokens(iter_paragraphs(body), self.max_tokens, self.count))
+        heading = first_line.strip()
+        budget = max(8, self.max_tokens - self.count(heading))
+        return [f"{heading}\n\n{piece}" for piece in split_by_tokens(iter_paragraphs(rest), budget, self.count)]
+
+    def create_documents(self, text: str, metadata: Optional[Dict] = None,
+                         tier: Optional[str] = None, project: Optional[str] = None) -> List[Document]:
+        """
+        Chunk markdown text into Documents with heading path, tier, project and hash metadata.
+
+        Chunks with identical content within the same text are emitted once.
+
+        Args:
+            text: Markdown text
+            metadata: Base metadata copied onto every chunk (e.g. filename, source_path)
+            tier: Knowledge tier (defaults to metadata["tier"] or "unspecified")
+            project: Project name (defaults to metadata["project"] or "global")
+        """
+        base = dict(metadata or {})
+        base["tier"] = tier or base.get("tier") or "unspecified"
+        base["project"] = project or base.get("project") or "global"
+
+        documents = []
+        seen = set()
+        for content, path in self.split(text):
+            digest = chunk_hash(content)
+            if digest in seen:
+                continue
+            seen.add(digest)
+            documents.append(Document(page_content=content, metadata=dict(
+                base,
+                heading_path=HEADING_PATH_SEPARATOR.join(path),
+                heading_level=len(path),
+                chunk_index=len(documents),
+                chunk_hash=digest,
+            )))
+        return documents
+
@@ -0,0 +1,174 @@
+"""
+utils/startup.py
+
+Staged, concurrent startup for heavy GAIA components.
+Each stage runs on a shared thread pool and exposes its result through a
+LazyComponent proxy. Touching a component that is still loading raises
+ComponentLoading, which the web layer turns into a 503 with Retry-After.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("GAIA.Startup")
+
+
+class ComponentLoading(RuntimeError):
+    """Raised when a component is requested before its startup stage finished."""
+
+    def __init__(self, stage: str, status: str = "loading", retry_after: int = 5):
+        super().__init__(f"Component '{stage}' is {status}")
+        self.stage = stage
+        self.status = status
+        self.retry_after = retry_after
+
+
+class StartupStage:
+    """Bookkeeping for one startup stage."""
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.status = "pending"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.value: Any = None
+        self.future: Optional[Future] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        end = self.finished_at or time.perf_counter()
+        return round(end - self.started_at, 3)
+
+
+class LazyComponent:
+    """Proxy that forwards attribute access to a stage result once it is ready."""
+
+    def __init__(self, manager: "StartupManager", name: str):
+        object.__setattr__(self, "_manager", manager)
+        object.__setattr__(self, "_name", name)
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Return the component, optionally blocking up to `timeout` seconds for it."""
+        return self._manager.get(self._name, timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._manager.stages[self._name].ready
+
+    def __getattr__(self, name):
+        return getattr(self._manager.get(self._name), name)
+
+    def __bool__(self):
+        return self.ready
+
+
+class StartupManager:
+    """
+    Runs named loaders concurrently and reports per-stage readiness and timings.
+    """
+
+    def __init__(self, max_workers: int = 4, retry_after: int = 5):
+        self.stages: Dict[str, StartupStage] = {}
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gaia-startup")
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+
+    def add(self, name: str, loader: Callable[[], Any]) -> LazyComponent:
+        """Register and immediately schedule a stage; returns a proxy to its result."""
+        stage = StartupStage(name, loader)
+        with self._lock:
+            self.stages[name] = stage
+        stage.future = self._executor.submit(self._run, stage)
+        return LazyComponent(self, name)
+
+    def _run(self, stage: StartupStage):
+        stage.status = "loading"
+        stage.started_at = time.perf_counter()
+        logger.info(f"⏳ Startup stage '{stage.name}' loading...")
+        try:
+            stage.value = stage.loader()
+            stage.status = "ready"
+            logger.info(f"✅ Startup stage '{stage.name}' ready in {stage.seconds():.2f}s")
+        except Exception as e:
+            stage.status = "failed"
+            stage.error = str(e)
+            logger.exception(f"❌ Startup stage '{stage.name}' failed: {e}")
+        finally:
+            stage.finished_at = time.perf_counter()
+        return stage.value
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        Return a stage result.
+
+        Raises:
+            ComponentLoading: if the stage is not ready (after waiting `timeout`, if given)
+        """
+        stage = self.stages.get(name)
+        if stage is None:
+            raise ComponentLoading(name, "unknown", self.retry_after)
+        if not stage.ready and timeout and stage.future:
+            try:
+                stage.future.result(timeout)
+            except Exception:
+                pass
+        if not stage.ready:
+            raise ComponentLoading(name, stage.status, self.retry_after)
+        return stage.value
+
+    def require(self, *names: str):
+        """Raise ComponentLoading unless every named stage is ready."""
+        for name in names:
+            self.get(name)
+
+    def is_ready(self, *names: str) -> bool:
+        names = names or tuple(self.stages)
+        return all(name in self.stages and self.stages[name].ready for name in names)
+
+    def wait_for(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Block until one stage has finished; returns True if it is ready."""
+        stage = self.stages.get(name)
+        if stage is None:
+            return False
+        if stage.future:
+            try:
+                stage.future.result(timeout)
+            except Exception:
+                pass
+        return stage.ready
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every stage has finished; returns True if all are ready."""
+        for stage in list(self.stages.values()):
+            if stage.future:
+                try:
+                    stage.future.result(timeout)
+                except Exception:
+                    pass
+        return self.is_ready()
+
+    def report(self) -> dict:
+        """Per-stage status and timings for /api/status."""
+        stages = {
+            name: {"status": stage.status, "seconds": stage.seconds(), "error": stage.error}
+            for name, stage in self.stages.items()
+        }
+        return {
+            "ready": self.is_ready(),
+            "uptime_seconds": round(time.perf_counter() - self._started_at, 3),
+            "stages": stages,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
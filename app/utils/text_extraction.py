@@ -0,0 +1,270 @@
+"""
+utils/text_extraction.py
+
+Streaming text extractors for raw campaign files.
+Each extractor yields paragraphs one at a time so multi-hundred-MB exports can
+be fed to the chunkers without building the full text in memory:
+
+- .txt/.md: encoding sniffed once from a prefix, read line by line
+- .docx: word/document.xml parsed incrementally with iterparse
+- .rtf: a small streaming RTF-to-text tokenizer (replaces striprtf's whole-string pass)
+"""
+
+import os
+import re
+import codecs
+import logging
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, Optional
+
+logger = logging.getLogger("GAIA.TextExtraction")
+
+SNIFF_BYTES = 64 * 1024
+READ_CHUNK = 1024 * 1024
+# Paragraphs longer than this are flushed at the next line boundary
+MAX_PARAGRAPH_CHARS = 64 * 1024
+
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".rtf", ".docx")
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def sniff_encoding(filepath: str, sample_size: int = SNIFF_BYTES) -> str:
+    """
+    Detect a file's encoding from its first `sample_size` bytes.
+
+    Returns the BOM encoding if present, "utf-8" if the prefix decodes as UTF-8,
+    and "latin-1" otherwise (the same fallback the RTF loader always used).
+    """
+    with open(filepath, "rb") as f:
+        prefix = f.read(sample_size)
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        # Incremental decode so a multi-byte character cut at the sample edge is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def iter_text_paragraphs(filepath: str, encoding: Optional[str] = None) -> Iterator[str]:
+    """Yield blank-line separated paragraphs from a plain text or markdown file."""
+    encoding = encoding or sniff_encoding(filepath)
+    lines = []
+    size = 0
+    with open(filepath, "r", encoding=encoding, errors="replace") as f:
+        for line in iter(lambda: f.readline(MAX_PARAGRAPH_CHARS), ""):
+            if not line.strip():
+                if lines:
+                    yield "".join(lines).strip()
+                    lines, size = [], 0
+                continue
+            lines.append(line)
+            size += len(line)
+            if size >= MAX_PARAGRAPH_CHARS:
+                yield "".join(lines).strip()
+                lines, size = [], 0
+    if lines:
+        yield "".join(lines).strip()
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def iter_docx_paragraphs(filepath: str) -> Iterator[str]:
+    """Yield non-empty paragraphs (including table cells) from a .docx file."""
+    with zipfile.ZipFile(filepath) as archive:
+        with archive.open("word/document.xml") as xml:
+            parts = []
+            body = None
+            depth = 0
+            for event, elem in ET.iterparse(xml, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    depth += 1
+                    if tag == _W + "body":
+                        body = elem
+                    continue
+                depth -= 1
+                text = None
+                if tag == _W + "t":
+                    parts.append(elem.text or "")
+                elif tag == _W + "tab":
+                    parts.append("\t")
+                elif tag in (_W + "br", _W + "cr"):
+                    parts.append("\n")
+                elif tag == _W + "p":
+                    text = "".join(parts).strip()
+                    parts = []
+                    elem.clear()
+                if depth == 2 and body is not None:
+                    # Finished top-level paragraphs and tables would otherwise pile up in the tree
+                    body.remove(elem)
+                if text:
+                    yield text
+
+
+# Destinations whose content is never document text
+_RTF_DESTINATIONS = frozenset((
+    "aftncn", "aftnsep", "aftnsepc", "annotation", "atnauthor", "atndate", "atnicn", "atnid",
+    "atnparent", "atnref", "atntime", "atrfend", "atrfstart", "author", "background",
+    "bkmkend", "bkmkstart", "buptim", "category", "colortbl", "comment", "company", "creatim",
+    "datafield", "datastore", "defchp", "defpap", "do", "doccomm", "docvar", "dptxbxtext",
+    "falt", "ffdeftext", "ffentrymcr", "ffexitmcr", "ffformat", "ffhelptext", "ffl", "ffname",
+    "ffstattext", "file", "filetbl", "fldinst", "fldtype", "fname", "fontemb", "fontfile",
+    "fonttbl", "footer", "footerf", "footerl", "footerr", "footnote", "ftncn", "ftnsep",
+    "ftnsepc", "generator", "gridtbl", "header", "headerf", "headerl", "headerr", "hl",
+    "hlfr", "hlinkbase", "hlloc", "hlsrc", "hsv", "info", "keycode", "keywords",
+    "latentstyles", "levelnumbers", "leveltext", "lfolevel", "linkval", "list", "listlevel",
+    "listname", "listoverride", "listoverridetable", "listpicture", "liststylename",
+    "listtable", "listtext", "lsdlockedexcept", "manager", "mmath", "nesttableprops",
+    "nextfile", "nonesttables", "objalias", "objclass", "objdata", "object", "objname",
+    "objsect", "objtime", "oldcprops", "oldpprops", "oldsprops", "oldtprops", "operator",
+    "panose", "password", "passwordhash", "pgptbl", "picprop", "pict", "pn", "pnseclvl",
+    "pntext", "pntxta", "pntxtb", "printim", "private", "propname", "protend", "protstart",
+    "protusertbl", "pxe", "result", "revtbl", "revtim", "rsidtbl", "rxe", "shp", "shpgrp",
+    "shpinst", "shppict", "shprslt", "shptxt", "sn", "sp", "stylesheet", "subject", "sv",
+    "tc", "template", "themedata", "title", "txe", "ud", "upr", "userprops",
+    "wgrffmtfilter", "windowcaption", "writereservation", "writereservhash", "xe", "xform",
+    "xmlattrname", "xmlattrvalue", "xmlclose", "xmlname", "xmlnstbl", "xmlopen",
+))
+
+_RTF_SPECIALS = {
+    "par": "\n\n", "sect": "\n\n", "page": "\n\n", "row": "\n", "line": "\n", "cell": " | ",
+    "tab": "\t", "emdash": "\u2014", "endash": "\u2013", "emspace": "\u2003",
+    "enspace": "\u2002", "qmspace": "\u2005", "bullet": "\u2022", "lquote": "\u2018",
+    "rquote": "\u2019", "ldblquote": "\u201c", "rdblquote": "\u201d", "~": "\u00a0",
+    "-": "", "_": "\u2011", "\n": "\n\n", "\r": "\n\n",
+}
+
+# One RTF token: control word, hex escape, control symbol, group delimiter, or a text run
+_RTF_TOKEN = re.compile(
+    r"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-fA-F]{2})|\\([^a-zA-Z])|([{}])|[\r\n]+|([^\\{}\r\n]{1,4096})"
+)
+# Longest token that can be cut at a chunk boundary, with margin
+_RTF_TAIL = 64
+
+
+def iter_rtf_paragraphs(filepath: str, encoding: Optional[str] = None) -> Iterator[str]:
+    """
+    Yield paragraphs from an RTF file, reading it in fixed-size chunks.
+
+    Handles groups, ignorable destinations, \\uN unicode escapes with \\ucN
+    fallback skipping, and \\'hh bytes in the document's ANSI code page.
+    """
+    encoding = encoding or sniff_encoding(filepath)
+    codepage = "cp1252"
+    stack = []
+    ignorable = False
+    ucskip = 1
+    curskip = 0
+    out = []
+    size = 0
+
+    with open(filepath, "r", encoding=encoding, errors="replace") as f:
+        buffer = ""
+        eof = False
+        while not eof:
+            chunk = f.read(READ_CHUNK)
+            eof = not chunk
+            buffer += chunk
+            limit = len(buffer) if eof else len(buffer) - _RTF_TAIL
+            consumed = 0
+            for match in _RTF_TOKEN.finditer(buffer):
+                if match.end() > limit:
+                    break
+                consumed = match.end()
+                word, arg, hexcode, symbol, brace, text = match.groups()
+                emitted = None
+
+                if brace == "{":
+                    curskip = 0
+                    stack.append((ucskip, ignorable))
+                elif brace == "}":
+                    curskip = 0
+                    if stack:
+                        ucskip, ignorable = stack.pop()
+                elif symbol is not None:
+                    curskip = 0
+                    if symbol == "*":
+                        ignorable = True
+                    elif symbol in "\\{}":
+                        emitted = symbol
+                    elif symbol in _RTF_SPECIALS:
+                        emitted = _RTF_SPECIALS[symbol]
+                elif word is not None:
+                    curskip = 0
+                    if word in _RTF_DESTINATIONS:
+                        ignorable = True
+                    elif ignorable:
+                        pass
+                    elif word == "ansicpg" and arg:
+                        codepage = f"cp{arg}"
+                    elif word == "uc" and arg:
+                        ucskip = int(arg)
+                    elif word == "u" and arg:
+                        value = int(arg)
+                        emitted = chr(value + 0x10000 if value < 0 else value)
+                        curskip = ucskip
+                    elif word in _RTF_SPECIALS:
+                        emitted = _RTF_SPECIALS[word]
+                elif hexcode is not None:
+                    if curskip > 0:
+                        curskip -= 1
+                    elif not ignorable:
+                        try:
+                            emitted = bytes([int(hexcode, 16)]).decode(codepage)
+                        except (LookupError, UnicodeDecodeError):
+                            emitted = bytes([int(hexcode, 16)]).decode("latin-1")
+                elif text is not None:
+                    if curskip > 0:
+                        skipped = min(curskip, len(text))
+                        text = text[skipped:]
+                        curskip -= skipped
+                    if not ignorable:
+                        emitted = text
+
+                if not emitted or ignorable:
+                    continue
+                if emitted == "\n\n":
+                    paragraph = "".join(out).strip()
+                    out, size = [], 0
+                    if paragraph:
+                        yield paragraph
+                    continue
+                out.append(emitted)
+                size += len(emitted)
+                if size >= MAX_PARAGRAPH_CHARS:
+                    yield "".join(out).strip()
+                    out, size = [], 0
+            buffer = buffer[consumed:]
+
+    paragraph = "".join(out).strip()
+    if paragraph:
+        yield paragraph
+
+
+def iter_file_paragraphs(filepath: str) -> Iterator[str]:
+    """
+    Yield paragraphs from any supported raw file.
+
+    Raises:
+        ValueError: for unsupported extensions
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in (".txt", ".md"):
+        return iter_text_paragraphs(filepath)
+    if ext == ".rtf":
+        return iter_rtf_paragraphs(filepath)
+    if ext == ".docx":
+        return iter_docx_paragraphs(filepath)
+    raise ValueError(f"Unsupported file format: {ext}")
@@ -0,0 +1,138 @@
+"""
+Token-aware text splitting helpers.
+
+Splits text on paragraph and heading boundaries into pieces that fit a token
+budget. Works on iterables of paragraphs so large inputs can be processed
+without holding the whole text in memory.
+"""
+
+import re
+import logging
+from typing import Callable, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger("GAIA.TextSplitting")
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Rough average for English prose with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def approx_token_count(text: str) -> int:
+    """Cheap token estimate used when no tokenizer is available."""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def make_token_counter(llm=None) -> Callable[[str], int]:
+    """
+    Return a token counting function, using the model tokenizer when available.
+
+    Args:
+        llm: Optional llama_cpp.Llama-like object with a `tokenize(bytes)` method
+    """
+    tokenize = getattr(llm, "tokenize", None) if llm is not None else None
+    if not callable(tokenize):
+        return approx_token_count
+
+    def count(text: str) -> int:
+        try:
+            return len(tokenize(text.encode("utf-8"), add_bos=False))
+        except Exception:
+            return approx_token_count(text)
+
+    return count
+
+
+def is_heading(paragraph: str) -> bool:
+    """Markdown heading, or a short title-like line (ALL CAPS or ending with ':')."""
+    line = paragraph.strip()
+    if not line or "\n" in line:
+        return False
+    if HEADING_RE.match(line):
+        return True
+    return len(line) <= 80 and (line.isupper() or line.endswith(":"))
+
+
+def iter_paragraphs(text: str) -> Iterator[str]:
+    """Yield blank-line separated paragraphs from a string."""
+    for block in re.split(r"\n\s*\n", text):
+        if block.strip():
+            yield block.strip()
+
+
+def _split_oversized(paragraph: str, max_tokens: int, count: Callable[[str], int]) -> Iterator[str]:
+    """Break a single paragraph that exceeds the budget on lines, sentences, then characters."""
+    joiner = "\n" if "\n" in paragraph else " "
+    units = paragraph.splitlines() if joiner == "\n" else _SENTENCE_RE.split(paragraph)
+    if len(units) == 1:
+        step = max(1, max_tokens * CHARS_PER_TOKEN)
+        for i in range(0, len(paragraph), step):
+            yield paragraph[i:i + step]
+        return
+
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        tokens = count(unit)
+        if tokens > max_tokens:
+            if current:
+                yield joiner.join(current)
+                current, current_tokens = [], 0
+            yield from _split_oversized(unit, max_tokens, count)
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            yield joiner.join(current)
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        yield joiner.join(current)
+
+
+def split_by_tokens(paragraphs: Iterable[str], max_tokens: int,
+                    count: Optional[Callable[[str], int]] = None,
+                    heading_break_ratio: float = 0.5) -> Iterator[str]:
+    """
+    Pack paragraphs into pieces of at most `max_tokens` tokens.
+
+    Pieces are cut at paragraph boundaries; once a piece is at least
+    `heading_break_ratio` full, it is also cut before the next heading so
+    sections stay together.
+
+    Args:
+        paragraphs: Iterable of paragraph strings (consumed lazily)
+        max_tokens: Token budget per piece
+        count: Token counting function (defaults to approx_token_count)
+        heading_break_ratio: Fill ratio after which a heading starts a new piece
+
+    Yields:
+        str: Text pieces joined with blank lines
+    """
+    count = count or approx_token_count
+    current: List[str] = []
+    current_tokens = 0
+
+    for paragraph in paragraphs:
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        tokens = count(paragraph)
+
+        if tokens > max_tokens:
+            if current:
+                yield "\n\n".join(current)
+                current, current_tokens = [], 0
+            yield from _split_oversized(paragraph, max_tokens, count)
+            continue
+
+        starts_section = is_heading(paragraph) and current_tokens >= max_tokens * heading_break_ratio
+        if current and (current_tokens + tokens > max_tokens or starts_section):
+            yield "\n\n".join(current)
+            current, current_tokens = [], 0
+
+        current.append(paragraph)
+        current_tokens += tokens
+
+    if current:
+        yield "\n\n".join(current)
@@ -59,25 +59,16 @@ def switch_project(project_id):
         return jsonify({'error': 'Project manager not initialized'}), 503
     
     try:
-        # Switch project
-        success = ai_manager.project_manager.switch_project(project_id)
+        # Switch project paths and the project's vector collection (kept open in an LRU)
+        success = ai_manager.switch_project(project_id)
         
         if not success:
             return jsonify({'error': f'Failed to switch to project {project_id}'}), 400
         
-        # Reload core instructions for AI manager
-        ai_manager.core_instructions = ai_manager.project_manager.get_project_instructions()
-        
-        # Update vector store path
-        if ai_manager.vector_store:
-            ai_manager.vector_store_manager.config = ai_manager.config
-            # Reload vector store
-            ai_manager.vector_store = ai_manager.vector_store_manager.load_vector_store()
-        
         return jsonify({
             'success': True,
             'message': f'Switched to project {project_id}',
-            'project': ai_manager.project_manager.get_current_project()
+            'project': ai_manager.project_manager.describe()
         })
     except Exception as e:
         logger.error(f"Error switching projects: {e}", exc_info=True)
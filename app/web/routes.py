@@ -1,6 +1,7 @@
 import os
+import json
 import logging
-from flask import Blueprint, request, jsonify, current_app, render_template
+from flask import Blueprint, Response, request, jsonify, current_app, render_template, stream_with_context
 
 from app.models.ai_manager import AIManager
 from app.behavior.intent_detection import detect_intent
@@ -11,6 +12,8 @@ from app.utils.knowledge_index import KnowledgeIndex
 from app.utils.helpers import get_tier_from_path
 from app.utils.verifier import verify_prompt_safety
 from app.memory.status_tracker import GAIAStatus
+from app.models.inference_scheduler import SchedulerFull
+from app.utils.startup import ComponentLoading
 
 
 logger = logging.getLogger("app")
@@ -22,6 +25,13 @@ def set_ai_manager(manager):
     global ai_manager
     ai_manager = manager
 
+@web_bp.errorhandler(ComponentLoading)
+def component_loading(error):
+    logger.info(f"⏳ Request needs '{error.stage}' which is {error.status}")
+    response = jsonify({"error": str(error), "stage": error.stage, "status": error.status})
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, 503
+
 @web_bp.route("/")
 def index():
     return render_template("index.html")
@@ -32,19 +42,83 @@ def status():
         "status": "GAIA running",
         "initialized": ai_manager.status.get("initialized", False),
         "persona": ai_manager.current_persona.name if ai_manager.current_persona else "unknown",
-        "project": ai_manager.project_manager.active_project
+        "project": ai_manager.project_manager.active_project,
+        "embedding": ai_manager.vector_store_manager.embedding_stats(),
+        "retrieval_cache": ai_manager.vector_store_manager.cache_stats(),
+        "lexical_index": ai_manager.vector_store_manager.lexical_stats(),
+        "vector_backend": ai_manager.vector_store_manager.backend_stats(),
+        "scheduler": ai_manager.scheduler.metrics(),
+        "prefix_cache": ai_manager.prefix_llm.stats() if ai_manager.prefix_llm else None,
+        "startup": ai_manager.startup.report(),
+        "background": ai_manager.background_worker.get_status(),
+        "model_pool": ai_manager.model_pool.stats() if ai_manager.model_pool else None
     })
 
 @web_bp.route("/api/status", methods=["GET"])
 def api_status():
     return status()
 
+def _encode_sse(event: dict) -> str:
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+
+def _encode_jsonl(event: dict) -> str:
+    return json.dumps(event) + "\n"
+
+def _session_id() -> str:
+    return (request.json or {}).get("session_id") or request.remote_addr or "default"
+
+def _busy_response():
+    response = jsonify({"error": "GAIA is busy, please retry shortly"})
+    response.headers["Retry-After"] = "5"
+    return response, 503
+
+@web_bp.route("/api/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Stream a chat turn as it is generated.
+    Emits Server-Sent Events by default, or JSON lines with ?format=jsonl.
+    """
+    logger.info("[CHAT] Received /api/chat/stream request")
+    user_input = (request.json or {}).get("message", "").strip()
+    if not user_input:
+        logger.warning("[CHAT] No user input received.")
+        return jsonify({"error": "Empty message"}), 400
+
+    ai_manager.startup.require("llm", "vector_store")
+    if request.args.get("format") == "jsonl":
+        encode, mimetype = _encode_jsonl, "application/x-ndjson"
+    else:
+        encode, mimetype = _encode_sse, "text/event-stream"
+
+    session_id = _session_id()
+
+    def generate():
+        try:
+            for event in ai_manager.stream_response(user_input, session_id=session_id):
+                yield encode(event)
+            yield encode({"type": "done"})
+        except SchedulerFull:
+            logger.warning("[CHAT] Inference queue full; rejecting streamed turn")
+            yield encode({"type": "error", "message": "GAIA is busy, please retry shortly", "retry_after": 5})
+        except Exception as e:
+            logger.exception("[CHAT] Exception while streaming /api/chat/stream")
+            yield encode({"type": "error", "message": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @web_bp.route("/api/chat", methods=["POST"])
 def chat():
     try:
         logger.info("[CHAT] Received /api/chat request")
         logger.debug(f"[CHAT] Request JSON: {request.json}")
 
+        if request.json.get("stream"):
+            return chat_stream()
+
         user_input = request.json.get("message", "").strip()
         context = request.json.get("context", "default")
         history = request.json.get("history", [])
@@ -60,11 +134,16 @@ def chat():
         intent = detect_intent(user_input)
         logger.info(f"[CHAT] Detected intent: {intent}")
 
-        response = ai_manager.generate_response(user_input)
+        response = ai_manager.generate_response(user_input, session_id=_session_id())
         logger.debug(f"[CHAT] Generated response: {response}")
 
         return jsonify({"response": response})
 
+    except SchedulerFull:
+        logger.warning("[CHAT] Inference queue full; rejecting request")
+        return _busy_response()
+    except ComponentLoading as e:
+        return component_loading(e)
     except Exception as e:
         logger.exception("[CHAT] Exception in /api/chat handler")
         return jsonify({"error": str(e)}), 500
@@ -81,7 +160,8 @@ def get_projects_alias():
 @web_bp.route("/api/project/<name>", methods=["POST"])
 def switch_project(name):
     try:
-        ai_manager.project_manager.set_project(name)
+        if not ai_manager.switch_project(name):
+            return jsonify({"error": f"Unknown project: {name}"}), 404
         return jsonify({"status": "ok", "active_project": name})
     except Exception as e:
         logger.error(f"Error switching project: {e}")
@@ -99,8 +179,8 @@ def list_personas():
 @web_bp.route("/api/persona/<name>", methods=["POST"])
 def switch_persona(name):
     try:
-        ai_manager.persona_manager.load_persona(name)
-        ai_manager.session_manager.set_persona(name)
+        if not ai_manager.set_persona(name):
+            return jsonify({"error": f"Unknown persona: {name}"}), 404
         return jsonify({"status": "ok", "current_persona": name})
     except Exception as e:
         logger.error(f"Error switching persona: {e}")
@@ -2,19 +2,47 @@
 """
 GAIA Performance Benchmark
 
-Tests different configurations to find optimal settings for your hardware.
+Benchmarks each stage of the GAIA pipeline separately (document extraction,
+chunking, embedding, vector search, prompt construction, token generation,
+code analysis) with warmup runs, repetitions, p50/p95/p99 latencies and peak RSS.
+
+By default a deterministic stub LLM and stub embedder are used so runs are
+reproducible and comparable; pass --real to benchmark the configured models.
+Results are written as JSON and can be compared against a baseline run to
+catch regressions.
+
+Examples:
+    python benchmark.py                                  # all stages, stubs
+    python benchmark.py --stages embedding vector_search --repeat 20
+    python benchmark.py --real --stages token_generation
+    python benchmark.py --compare benchmark_results/baseline.json
+    python benchmark.py --real --sweep                   # llama.cpp threads/batch/ctx sweep
+    python benchmark.py --backends chroma numpy --backend-docs 50000 --stages chunking
+    python benchmark.py --quantization --backend-docs 100000 --stages chunking
 """
 
 import os
 import sys
 import time
 import json
+import glob
+import random
+import itertools
+import hashlib
 import logging
+import argparse
+import platform
+import resource
+import shutil
+import tempfile
+import subprocess
 from datetime import datetime
 
+os.makedirs("logs", exist_ok=True)
+
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.WARNING,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler("logs/benchmark.log"),
@@ -24,11 +52,15 @@ logging.basicConfig(
 logger = logging.getLogger("GAIA_BENCHMARK")
 
 # Add the app directory to the path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
 
-# Import application components
 from app.config import Config
-from app.models.ai_manager import AIManager
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(REPO_ROOT, "projects", "dnd-campaign", "core-documentation")
+DEFAULT_CODE_ROOT = os.path.join(REPO_ROOT, "app")
 
 # Standard test queries
 TEST_QUERIES = [
@@ -38,258 +70,637 @@ TEST_QUERIES = [
     "Explain the concept of Primordis and Nondis in the cosmic structure."
 ]
 
-def benchmark(threads, batch_size, ctx_size, num_runs=1, query_index=0):
-    """
-    Benchmark a specific configuration.
-    
-    Args:
-        threads: Number of CPU threads
-        batch_size: Batch size for processing
-        ctx_size: Context window size
-        num_runs: Number of test runs to average
-        query_index: Index of the test query to use
-        
-    Returns:
-        Dictionary with benchmark results or None if initialization failed
-    """
-    # Create custom config
-    config = Config()
-    config.n_threads = threads
-    config.n_batch = batch_size
-    config.n_ctx = ctx_size
-    
-    print(f"\nTesting configuration: threads={threads}, batch={batch_size}, ctx={ctx_size}")
-    print("-" * 50)
-    
-    # Use a different query each time
-    query = TEST_QUERIES[query_index % len(TEST_QUERIES)]
-    print(f"Test query: {query[:50]}..." if len(query) > 50 else query)
-    
+STAGES = [
+    "document_extraction",
+    "chunking",
+    "embedding",
+    "vector_search",
+    "lexical_search",
+    "prompt_construction",
+    "token_generation",
+    "code_analysis",
+]
+
+
+# ---------------------------------------------------------------------------
+# Deterministic stubs
+# ---------------------------------------------------------------------------
+
+class StubEmbedder:
+    """Deterministic embedder: vectors are seeded from a hash of the text."""
+
+    def __init__(self, dim=768):
+        self.dim = dim
+        self.model_name = "stub"
+
+    def _vector(self, text):
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def encode(self, texts):
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self._vector(text) for text in texts])
+
+    def embed_documents(self, texts):
+        return self.encode(list(texts)).tolist()
+
+    def embed_query(self, text):
+        return self._vector(text).tolist()
+
+    def stats(self):
+        return {"model": self.model_name}
+
+    def shutdown(self):
+        pass
+
+
+class StubLLM:
+    """Deterministic llama.cpp stand-in that emits a fixed number of tokens per call."""
+
+    def __init__(self, tokens=64, token_delay=0.0):
+        self.tokens = tokens
+        self.token_delay = token_delay
+
+    def tokenize(self, data, add_bos=True):
+        return list(range(len(data.split()) + int(add_bos)))
+
+    def _words(self, prompt):
+        rng = random.Random(hashlib.sha1(prompt.encode("utf-8")).hexdigest())
+        return [f"tok{rng.randint(0, 9999)} " for _ in range(self.tokens)]
+
+    def _stream(self, prompt):
+        for word in self._words(prompt):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield {"choices": [{"text": word}]}
+
+    def __call__(self, prompt, max_tokens=None, stream=False, **kwargs):
+        if stream:
+            return self._stream(prompt)
+        if self.token_delay:
+            time.sleep(self.token_delay * self.tokens)
+        return {"choices": [{"text": "".join(self._words(prompt))}]}
+
+    create_completion = __call__
+
+
+# ---------------------------------------------------------------------------
+# Measurement helpers
+# ---------------------------------------------------------------------------
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if platform.system() != "Darwin" else peak / (1024 * 1024)
+
+
+def current_rss_mb():
+    """Current resident set size in MB (falls back to peak RSS where /proc is unavailable)."""
     try:
-        # Time for initialization
-        init_start = time.time()
-        
-        # Initialize AI Manager
-        ai_manager = AIManager(config)
-        init_success = ai_manager.initialize()
-        
-        init_time = time.time() - init_start
-        
-        if not init_success:
-            print("❌ Initialization failed")
-            return None
-        
-        print(f"✅ Initialization time: {init_time:.2f} seconds")
-        
-        # Run the query multiple times and average results
-        response_times = []
-        memory_usage = []
-        
-        for run in range(num_runs):
-            print(f"Run {run+1}/{num_runs}...")
-            
-            # Run standard test query
-            query_start = time.time()
-            response = ai_manager.query_campaign_world(query)
-            query_time = time.time() - query_start
-            
-            response_times.append(query_time)
-            print(f"  Query time: {query_time:.2f} seconds")
-            
-            # Try to get memory usage
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def dir_size_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total / (1024 * 1024)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def measure(fn, warmup, repeat):
+    """Run fn `warmup` times untimed, then `repeat` times timed. Returns latency summary."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "repeat": repeat,
+        "warmup": warmup,
+        "mean_s": sum(times) / len(times),
+        "min_s": times[0],
+        "max_s": times[-1],
+        "p50_s": percentile(times, 0.50),
+        "p95_s": percentile(times, 0.95),
+        "p99_s": percentile(times, 0.99),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Benchmark context and stages
+# ---------------------------------------------------------------------------
+
+class BenchmarkContext:
+    """Shared, lazily built inputs so each stage times only its own work."""
+
+    def __init__(self, args):
+        self.args = args
+        self.config = Config()
+        self.workdir = tempfile.mkdtemp(prefix="gaia_bench_")
+        self.config.vectordb_path = os.path.join(self.workdir, "vectordb")
+        self.config.embedding_cache_dir = None
+        self.corpus_files = sorted(
+            path for path in glob.glob(os.path.join(args.corpus, "**", "*"), recursive=True)
+            if os.path.splitext(path)[1].lower() in (".md", ".txt", ".rtf", ".docx")
+        )
+        self._texts = None
+        self._chunks = None
+        self._embedder = None
+        self._store = None
+        self._llm = None
+        self._scheduler = None
+
+    @property
+    def doc_processor(self):
+        from app.models.document import DocumentProcessor
+        return DocumentProcessor(self.config)
+
+    @property
+    def texts(self):
+        if self._texts is None:
+            processor = self.doc_processor
+            self._texts = [t for t in (processor.extract_text_from_file(p) for p in self.corpus_files) if t]
+        return self._texts
+
+    @property
+    def chunks(self):
+        if self._chunks is None:
+            self._chunks = chunk_texts(self.texts)
+        return self._chunks
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            if self.args.real:
+                from app.models.embedding_engine import EmbeddingEngine
+                self._embedder = EmbeddingEngine.from_config(self.config)
+            else:
+                self._embedder = StubEmbedder()
+        return self._embedder
+
+    @property
+    def store(self):
+        if self._store is None:
+            from langchain_core.documents import Document
+            from app.models.vector_store import VectorStoreManager
+
+            manager = VectorStoreManager(self.config)
+            manager.embeddings = self.embedder
+            manager.initialize_store()
+            manager.add_documents([Document(page_content=c, metadata={"source": "bench"}) for c in self.chunks])
+            self._store = manager
+        return self._store
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            if self.args.real:
+                from app.models.model_pool import ModelPool
+                self._llm = ModelPool.from_config(self.config).get("prime")
+            else:
+                self._llm = StubLLM(tokens=self.args.tokens)
+        return self._llm
+
+    @property
+    def scheduler(self):
+        """One InferenceScheduler per run, stopped by close()."""
+        if self._scheduler is None:
+            from app.models.inference_scheduler import InferenceScheduler
+
+            self._scheduler = InferenceScheduler(name="benchmark")
+            self._scheduler.start()
+        return self._scheduler
+
+    def close(self):
+        """Stop the run's scheduler and remove its working directory (vector stores, indexes)."""
+        if self._scheduler is not None:
+            self._scheduler.stop()
+            self._scheduler = None
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def chunk_texts(texts):
+    from app.utils.markdown_chunker import MarkdownChunker
+
+    chunker = MarkdownChunker()
+    return [content for text in texts for content, _ in chunker.split(text)]
+
+
+def stage_document_extraction(ctx):
+    processor = ctx.doc_processor
+    files = ctx.corpus_files
+    return lambda: [processor.extract_text_from_file(path) for path in files], {"files": len(files)}
+
+
+def stage_chunking(ctx):
+    texts = ctx.texts
+    return lambda: chunk_texts(texts), {"documents": len(texts), "chunks": len(ctx.chunks)}
+
+
+def stage_embedding(ctx):
+    chunks = ctx.chunks
+    embedder = ctx.embedder
+    return lambda: embedder.encode(chunks), {"chunks": len(chunks), "embedder": getattr(embedder, "model_name", "?")}
+
+
+def stage_vector_search(ctx):
+    store = ctx.store
+    queries = itertools.cycle(TEST_QUERIES)
+
+    def run():
+        store.retrieval_cache.invalidate()
+        store.search(next(queries), k=5)
+
+    return run, {"vectors": len(ctx.chunks), "k": 5}
+
+
+def stage_lexical_search(ctx):
+    index = ctx.store.lexical_index
+    queries = itertools.cycle(TEST_QUERIES)
+
+    def run():
+        index.search(next(queries), k=20)
+
+    return run, {"documents": len(index), "k": 20}
+
+
+def stage_prompt_construction(ctx):
+    from app.models.prefix_cache import build_persona_prefix
+
+    store = ctx.store
+    identity = ctx.config.identity_intro or ctx.config.identity
+    instructions = ctx.config.get_persona_instructions()
+    queries = itertools.cycle(TEST_QUERIES)
+
+    def run():
+        query = next(queries)
+        context = "\n\n".join(doc.page_content for doc in store.search(query, k=5))
+        return f"{build_persona_prefix(identity, instructions)}\n\n{context}\n\nUser: {query}\nGAIA:"
+
+    return run, {"k": 5}
+
+
+def stage_token_generation(ctx):
+    llm = ctx.scheduler.bind(ctx.llm)
+    prompt = TEST_QUERIES[0]
+    tokens = ctx.args.tokens
+
+    def run():
+        for _ in llm(prompt, max_tokens=tokens, stream=True):
+            pass
+
+    return run, {"max_tokens": tokens, "path": "scheduler+stream"}
+
+
+def stage_code_analysis(ctx):
+    from app.utils.code_analyzer.ast_extractor import extract_code_info
+    from app.utils.code_analyzer.chunk_creator import create_chunks
+
+    sources = []
+    for path in sorted(glob.glob(os.path.join(ctx.args.code_root, "**", "*.py"), recursive=True)):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            sources.append((path, f.read()))
+
+    def run():
+        for path, code in sources:
+            structure = extract_code_info(code)["structure"]
+            create_chunks(path, code, structure)
+
+    return run, {"files": len(sources)}
+
+
+STAGE_BUILDERS = {
+    "document_extraction": stage_document_extraction,
+    "chunking": stage_chunking,
+    "embedding": stage_embedding,
+    "vector_search": stage_vector_search,
+    "lexical_search": stage_lexical_search,
+    "prompt_construction": stage_prompt_construction,
+    "token_generation": stage_token_generation,
+    "code_analysis": stage_code_analysis,
+}
+
+
+def run_stages(args):
+    ctx = BenchmarkContext(args)
+    results = {}
+    try:
+        for name in args.stages:
+            print(f"▶ {name} ...", flush=True)
             try:
-                import psutil
-                process = psutil.Process(os.getpid())
-                mem = process.memory_info().rss / (1024 * 1024)  # MB
-                memory_usage.append(mem)
-                print(f"  Memory usage: {mem:.2f} MB")
-            except ImportError:
-                pass
-        
-        # Calculate average times
-        avg_response_time = sum(response_times) / len(response_times)
-        avg_memory = sum(memory_usage) / len(memory_usage) if memory_usage else 0
-        
-        return {
-            "threads": threads,
-            "batch_size": batch_size,
-            "ctx_size": ctx_size,
-            "init_time": init_time,
-            "avg_response_time": avg_response_time,
-            "avg_memory_mb": avg_memory,
-            "success": True
-        }
-    
-    except Exception as e:
-        logger.error(f"Benchmark error: {e}", exc_info=True)
-        print(f"❌ Error: {e}")
-        return None
-
-def quick_benchmark():
-    """Run a quick benchmark with a default set of configurations."""
-    print("Running quick benchmark...")
-    
-    configs = [
-        # Conservative settings
-        (4, 512, 4096),
-        # Balanced settings
-        (6, 768, 4096),
-        # Performance settings
-        (8, 512, 8192),
-        # Memory-intensive settings
-        (8, 768, 8192)
-    ]
-    
-    results = []
-    for i, (threads, batch, ctx) in enumerate(configs):
-        result = benchmark(threads, batch, ctx, num_runs=1, query_index=i)
-        if result:
-            results.append(result)
-    
+                fn, info = STAGE_BUILDERS[name](ctx)
+                summary = measure(fn, args.warmup, args.repeat)
+                summary.update(info)
+                summary["peak_rss_mb"] = round(peak_rss_mb(), 1)
+                results[name] = summary
+                print(f"  p50={summary['p50_s'] * 1000:.2f}ms  p95={summary['p95_s'] * 1000:.2f}ms  "
+                      f"p99={summary['p99_s'] * 1000:.2f}ms  peak_rss={summary['peak_rss_mb']:.0f}MB")
+            except Exception as e:
+                logger.error(f"Stage {name} failed: {e}", exc_info=True)
+                results[name] = {"error": str(e)}
+                print(f"  ❌ {e}")
+    finally:
+        ctx.close()
     return results
 
-def ryzen7_4700u_benchmark():
-    """Run a benchmark optimized for AMD Ryzen 7 4700U."""
-    print("Running benchmark optimized for AMD Ryzen 7 4700U...")
-    
-    configs = [
-        # Thread variations (8 cores on Ryzen 7 4700U)
-        (6, 768, 4096),
-        (7, 768, 4096),
-        (8, 768, 4096),
-        # Batch size variations
-        (8, 512, 4096),
-        (8, 768, 4096),
-        (8, 1024, 4096),
-        # Context size variations
-        (8, 768, 4096),
-        (8, 768, 8192)
-    ]
-    
-    results = []
-    for i, (threads, batch, ctx) in enumerate(configs):
-        result = benchmark(threads, batch, ctx, num_runs=1, query_index=i % len(TEST_QUERIES))
-        if result:
-            results.append(result)
-    
+
+# ---------------------------------------------------------------------------
+# llama.cpp settings sweep (loads only the model, once per configuration)
+# ---------------------------------------------------------------------------
+
+SWEEP_CONFIGS = [
+    # (threads, batch, ctx)
+    (4, 512, 4096),
+    (6, 768, 4096),
+    (8, 512, 8192),
+    (8, 768, 8192),
+]
+
+
+def run_sweep(args):
+    from app.models.model_pool import ModelPool
+
+    base = Config()
+    results = {}
+    for threads, batch, ctx_size in SWEEP_CONFIGS:
+        key = f"threads={threads},batch={batch},ctx={ctx_size}"
+        print(f"▶ sweep {key} ...", flush=True)
+        spec = {"model_path": base.model_path, "n_threads": threads, "n_batch": batch,
+                "n_ctx": ctx_size, "n_gpu_layers": base.n_gpu_layers}
+        pool = ModelPool({"prime": spec}, ram_budget_mb=10 ** 9)
+        try:
+            load_start = time.perf_counter()
+            pool.acquire("prime")
+            load_seconds = time.perf_counter() - load_start
+            llm = pool.get("prime")
+            summary = measure(lambda: llm(TEST_QUERIES[0], max_tokens=args.tokens), args.warmup, args.repeat)
+            summary.update({"load_s": load_seconds, "peak_rss_mb": round(peak_rss_mb(), 1)})
+            results[key] = summary
+            print(f"  load={load_seconds:.2f}s  p50={summary['p50_s']:.2f}s  p95={summary['p95_s']:.2f}s")
+        except Exception as e:
+            logger.error(f"Sweep {key} failed: {e}", exc_info=True)
+            results[key] = {"error": str(e)}
+        finally:
+            pool.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Vector backend comparison (ingest, cold load, query latency, RSS, disk)
+# ---------------------------------------------------------------------------
+
+def backend_corpus(ctx, size):
+    """Corpus chunks, repeated with a suffix until `size` documents exist."""
+    chunks = ctx.chunks or ["empty"]
+    size = size or len(chunks)
+    return [chunks[i % len(chunks)] + ("" if i < len(chunks) else f" [{i}]") for i in range(size)]
+
+
+def run_backends(args):
+    from langchain_core.documents import Document
+    from app.models.vector_store import VectorStoreManager
+
+    ctx = BenchmarkContext(args)
+    results = {}
+    try:
+        corpus = backend_corpus(ctx, args.backend_docs)
+        queries = [np.asarray(ctx.embedder.embed_query(q), dtype=np.float32) for q in TEST_QUERIES]
+        for name in args.backends:
+            print(f"▶ backend {name} ({len(corpus)} documents) ...", flush=True)
+            config = Config()
+            config.vectordb_path = os.path.join(ctx.workdir, f"backend_{name}")
+            config.embedding_cache_dir = None
+            config.vector_backend = name
+            try:
+                manager = VectorStoreManager(config)
+                manager.embeddings = ctx.embedder
+                start = time.perf_counter()
+                manager.initialize_store()
+                for i in range(0, len(corpus), 512):
+                    manager.add_documents([Document(page_content=c, metadata={"source": "bench", "tier": "2_semantic"})
+                                           for c in corpus[i:i + 512]])
+                manager.vector_store.wait_for_index()
+                manager.persist()
+                ingest_s = time.perf_counter() - start
+                del manager
+
+                rss_before = current_rss_mb()
+                start = time.perf_counter()
+                manager = VectorStoreManager(config)
+                manager.embeddings = ctx.embedder
+                manager.initialize_store()
+                load_s = time.perf_counter() - start
+                backend = manager.vector_store
+                backend.wait_for_index()
+                cycle = itertools.cycle(queries)
+                backend.query(queries[0], 5)  # first query may page in the index
+                summary = measure(lambda: backend.query(next(cycle), 5), args.warmup, args.repeat)
+                summary.update({
+                    "documents": len(corpus),
+                    "ingest_s": ingest_s,
+                    "load_s": load_s,
+                    "rss_delta_mb": round(current_rss_mb() - rss_before, 1),
+                    "disk_mb": round(dir_size_mb(config.vectordb_path), 1),
+                    "stats": backend.stats(),
+                })
+                results[name] = summary
+                print(f"  ingest={ingest_s:.2f}s  load={load_s * 1000:.1f}ms  p50={summary['p50_s'] * 1000:.2f}ms  "
+                      f"p95={summary['p95_s'] * 1000:.2f}ms  rss+={summary['rss_delta_mb']}MB  disk={summary['disk_mb']}MB")
+            except Exception as e:
+                logger.error(f"Backend {name} failed: {e}", exc_info=True)
+                results[name] = {"error": str(e)}
+    finally:
+        ctx.close()
     return results
 
-def save_results(results, benchmark_type):
-    """Save benchmark results to a file."""
-    if not results:
-        print("No results to save.")
-        return
-    
-    # Create results directory if it doesn't exist
-    os.makedirs("benchmark_results", exist_ok=True)
-    
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"benchmark_results/{benchmark_type}_{timestamp}.json"
-    
-    with open(filename, 'w') as f:
-        json.dump(results, f, indent=2)
-    
-    print(f"Results saved to {filename}")
-
-def print_results(results):
-    """Print benchmark results in a formatted table."""
-    if not results:
-        print("No results to display.")
-        return
-    
-    # Sort results by response time
-    sorted_results = sorted(results, key=lambda x: x["avg_response_time"])
-    
-    # Print header
-    print("\nResults (sorted by response time):")
-    print("-" * 80)
-    print(f"{'Threads':^10} | {'Batch':^10} | {'Context':^10} | {'Init (s)':^10} | {'Query (s)':^10} | {'Memory (MB)':^15}")
-    print("-" * 80)
-    
-    # Print results
-    for result in sorted_results:
-        print(f"{result['threads']:^10} | {result['batch_size']:^10} | {result['ctx_size']:^10} | "
-              f"{result['init_time']:.2f}s".center(10) + " | " +
-              f"{result['avg_response_time']:.2f}s".center(10) + " | " +
-              f"{result['avg_memory_mb']:.2f} MB".center(15))
-    
-    # Print best configuration
-    best = sorted_results[0]
-    print("\n" + "=" * 40)
-    print("Best configuration:")
-    print(f"Threads: {best['threads']}")
-    print(f"Batch size: {best['batch_size']}")
-    print(f"Context size: {best['ctx_size']}")
-    print(f"Average query time: {best['avg_response_time']:.2f} seconds")
-    print("=" * 40)
-    
-    # Return best config for easy copy-paste
-    return best
-
-def main():
+
+# ---------------------------------------------------------------------------
+# Quantised vectors: recall@k against exact float32 vs. memory per vector
+# ---------------------------------------------------------------------------
+
+QUANTIZATION_VARIANTS = [("float32", True), ("float16", False), ("float16", True), ("int8", False), ("int8", True)]
+
+
+def quantization_vectors(args, ctx, size, dim=384, clusters=64, seed=0):
+    """Corpus embeddings with --real, otherwise clustered synthetic unit vectors."""
+    if args.real:
+        corpus = backend_corpus(ctx, size)
+        return np.asarray(ctx.embedder.embed_documents(corpus), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, size)] + 0.35 * rng.standard_normal((size, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run_quantization(args, k=10, n_queries=100):
+    from app.models.vector_backends.numpy_backend import NumpyBackend
+    from app.models.vector_backends.quantized_backend import QuantizedNumpyBackend
+
+    ctx = BenchmarkContext(args)
+    results = {}
+    try:
+        vectors = quantization_vectors(args, ctx, args.backend_docs or 20000)
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.choice(len(vectors), n_queries, replace=False)]
+        queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+        exact = [set(np.argsort(-(vectors @ q))[:k].tolist()) for q in queries]
+        ids = [str(i) for i in range(len(vectors))]
+        for dtype, keep_float32 in QUANTIZATION_VARIANTS:
+            key = dtype if dtype == "float32" else f"{dtype}{'+rerank' if keep_float32 else ''}"
+            print(f"▶ quantization {key} ({len(vectors)} vectors) ...", flush=True)
+            path = os.path.join(ctx.workdir, f"quant_{key}")
+            if dtype == "float32":
+                backend = NumpyBackend(path, index="flat")
+            else:
+                backend = QuantizedNumpyBackend(path, dtype=dtype, rerank=keep_float32, index="flat")
+            for i in range(0, len(vectors), 4096):
+                backend.upsert(ids[i:i + 4096], vectors[i:i + 4096], [""] * len(ids[i:i + 4096]), [None] * len(ids[i:i + 4096]))
+            backend.persist()
+            recall = np.mean([
+                len(exact[i] & {int(doc_id) for doc_id in backend.query(q, k)["ids"]}) / k
+                for i, q in enumerate(queries)
+            ])
+            cycle = itertools.cycle(queries)
+            summary = measure(lambda: backend.query(next(cycle), k), args.warmup, args.repeat)
+            scan_bytes = vectors.shape[1] * np.dtype(dtype).itemsize + (4 if dtype == "int8" else 0)
+            summary.update({
+                f"recall@{k}": round(float(recall), 4),
+                "scan_bytes_per_vector": scan_bytes,
+                "disk_mb": round(backend.stats()["vector_bytes"] / 2 ** 20, 1),
+            })
+            results[key] = summary
+            backend.close()
+            print(f"  recall@{k}={recall:.3f}  scan={scan_bytes}B/vector  disk={summary['disk_mb']}MB  "
+                  f"p50={summary['p50_s'] * 1000:.2f}ms")
+    finally:
+        ctx.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Output and comparison
+# ---------------------------------------------------------------------------
+
+def run_metadata(args):
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                         stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": commit,
+        "mode": "real" if args.real else "stub",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+    }
+
+
+def save_results(report, output=None):
+    """Save benchmark results to a JSON file and return its path."""
+    if not output:
+        os.makedirs("benchmark_results", exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = f"benchmark_results/{report['meta']['mode']}_{timestamp}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+    return output
+
+
+def compare_results(current, baseline, threshold):
+    """
+    Compare p50/p95 latencies against a baseline report.
+
+    Returns:
+        list: (stage, metric, baseline, current, ratio) for every regression above threshold
+    """
+    regressions = []
+    print(f"\nComparison against baseline {baseline['meta'].get('git_commit')} ({baseline['meta'].get('timestamp')}):")
+    print(f"{'Stage':<22} | {'Metric':<6} | {'Baseline':>10} | {'Current':>10} | {'Change':>8}")
+    print("-" * 68)
+    for stage, result in current["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base or "error" in base or "error" in result:
+            continue
+        for metric in ("p50_s", "p95_s"):
+            old, new = base[metric], result[metric]
+            ratio = (new - old) / old if old else 0.0
+            flag = " ⚠️" if ratio > threshold else ""
+            print(f"{stage:<22} | {metric[:-2]:<6} | {old * 1000:>8.2f}ms | {new * 1000:>8.2f}ms | {ratio:>+7.1%}{flag}")
+            if ratio > threshold:
+                regressions.append((stage, metric, old, new, ratio))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="GAIA per-stage performance benchmark")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Stages to run")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed warmup runs per stage")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per stage")
+    parser.add_argument("--tokens", type=int, default=64, help="Tokens per generation")
+    parser.add_argument("--real", action="store_true", help="Use the configured LLM and embedding model")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory of documents to ingest")
+    parser.add_argument("--code-root", default=DEFAULT_CODE_ROOT, help="Directory of Python code to analyze")
+    parser.add_argument("--sweep", action="store_true", help="Sweep llama.cpp threads/batch/ctx (requires --real)")
+    parser.add_argument("--backends", nargs="+", choices=["chroma", "numpy"], help="Compare vector backends")
+    parser.add_argument("--backend-docs", type=int, default=0, help="Documents per backend (default: corpus chunks)")
+    parser.add_argument("--quantization", action="store_true", help="Report recall vs. memory for float16/int8 vectors")
+    parser.add_argument("--output", help="Output JSON path (default: benchmark_results/<mode>_<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Relative slowdown counted as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main benchmark function."""
-    # Create logs directory if it doesn't exist
-    os.makedirs("logs", exist_ok=True)
-    
+    args = parse_args(argv)
+
     print("=" * 60)
     print("GAIA Performance Benchmark".center(60))
     print("=" * 60)
-    print("\nThis tool will help you find the optimal GAIA configuration for your hardware.")
-    
-    # Menu options
-    print("\nSelect benchmark type:")
-    print("1. Quick benchmark (recommended for first run)")
-    print("2. Ryzen 7 4700U optimized benchmark")
-    print("3. Custom benchmark")
-    print("4. Exit")
-    
-    choice = input("\nEnter your choice (1-4): ")
-    
-    if choice == "1":
-        results = quick_benchmark()
-        best = print_results(results)
-        save_results(results, "quick")
-        
-    elif choice == "2":
-        results = ryzen7_4700u_benchmark()
-        best = print_results(results)
-        save_results(results, "ryzen7_4700u")
-        
-    elif choice == "3":
-        print("\nCustom benchmark configuration:")
-        
-        try:
-            threads = int(input("Number of threads (2-16): "))
-            batch = int(input("Batch size (128-2048): "))
-            ctx = int(input("Context size (2048, 4096, or 8192): "))
-            runs = int(input("Number of test runs (1-5): "))
-            
-            result = benchmark(threads, batch, ctx, num_runs=runs)
-            if result:
-                results = [result]
-                print_results(results)
-                save_results(results, "custom")
-        except ValueError:
-            print("Invalid input. Please enter numeric values.")
-            
-    elif choice == "4":
-        print("Exiting...")
-        return
-        
-    else:
-        print("Invalid choice.")
-        return
-    
-    # Update docker-compose recommendation
-    if 'best' in locals():
-        print("\nFor docker-compose.yml:")
-        print(f"""
-  environment:
-    N_THREADS: {best['threads']}
-    N_BATCH: {best['batch_size']}
-    N_CTX: {best['ctx_size']}
-        """)
+
+    report = {"meta": run_metadata(args)}
+    if args.sweep:
+        if not args.real:
+            print("--sweep requires --real")
+            return 2
+        report["sweep"] = run_sweep(args)
+    if args.backends:
+        report["backends"] = run_backends(args)
+    if args.quantization:
+        report["quantization"] = run_quantization(args)
+    report["stages"] = run_stages(args)
+    save_results(report, args.output)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
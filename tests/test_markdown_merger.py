@@ -0,0 +1,27 @@
+from app.models.document import _MarkdownMerger
+
+
+def _merge(pieces):
+    merger = _MarkdownMerger()
+    return "\n".join(merger.add(piece) for piece in pieces)
+
+
+def test_pieces_restarting_with_title_keep_section_levels():
+    merged = _merge([
+        "# Campaign Notes\n## Section 0\nfirst",
+        "# Campaign Notes\n## Section 1\nsecond",
+        "# Campaign Notes\n## Section 2\nthird",
+    ])
+    assert merged.splitlines() == [
+        "# Campaign Notes", "## Section 0", "first",
+        "## Section 1", "second",
+        "## Section 2", "third",
+    ]
+
+
+def test_piece_restarting_at_title_level_is_demoted():
+    merged = _merge([
+        "# Campaign Notes\n## Section 0\nfirst",
+        "# Section 1\nsecond",
+    ])
+    assert merged.splitlines() == ["# Campaign Notes", "## Section 0", "first", "## Section 1", "second"]